@@ -18,7 +18,7 @@ echo "--- :gradle: Generate license report"
 
 ./gradlew -x generateJooqClasses generateLicenseReport
 
-echo "--- :python: Generate basic list of notifications"
+echo "--- :python: Generate lists of notifications for each locale"
 
 python3 ./.github/scripts/notifications.py
 
@@ -37,7 +37,7 @@ REPO_URL=${BUILDKITE_REPO/github.com/$DEPLOY_USER:$GITHUB_TOKEN@github.com}
 rsync -a --exclude=.git --delete \
     "docs/schema" \
     "docs/license-report" \
-    "docs/notifications.html" \
+    docs/notifications*.html \
     "docs/unreleased.log" \
     "$TEMP_DIR/"
 
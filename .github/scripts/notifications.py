@@ -1,51 +1,43 @@
-def extract_notifications(file_path):
-    notifications = {'app': {}, 'email': {}}
-    ignore_keys = ['buttonIntro', 'linkIntro', 'buttonLabel', 'footer', 'manageSettings', 'html']
-    with open(file_path, 'r', encoding='utf-8') as file:
-        for line in file:
-            line = line.strip()
-            if '=' in line and line[0] != '#':
-                key, value = line.split('=', 1)
-                key_parts = key.split('.')
-                if 'notification' in key_parts[0]:  # Ensure it starts with 'notification'
-                    if not any(ignore in line for ignore in ignore_keys):
-                        if 'app' in key_parts or 'email' in key_parts:
-                            notification_type = 'app' if 'app' in key_parts else 'email'
-                            
-                            if 'email' in key_parts and 'body' in key_parts:
-                                field_type = 'body'
-                                notification_key = '.'.join(key_parts[:key_parts.index('email')])  # Base notification key
-                            elif 'body' in key_parts[-2]:
-                                field_type = 'body'
-                                notification_key = '.'.join(key_parts[:-3])
-                            else:
-                                field_type = key_parts[-1]
-                                notification_key = '.'.join(key_parts[:-2])
-
-                            if notification_key not in notifications[notification_type]:
-                                notifications[notification_type][notification_key] = {'title': None, 'body': '', 'subject': None}
-                            
-                            if field_type == 'body' and notifications[notification_type][notification_key]['body']:
-                                notifications[notification_type][notification_key]['body'] += " " + value.strip()
-                            elif field_type == 'body':
-                                notifications[notification_type][notification_key]['body'] = value.strip()
-                            else:
-                                notifications[notification_type][notification_key][field_type] = value.strip()
-    return notifications
+"""
+Generate an HTML catalog of the in-app and email notifications for each locale's messages
+bundle: docs/notifications.html for English and docs/notifications_<locale>.html for the
+others.
+
+Each catalog ends with a hash of its bundle and of this script, and is only regenerated when
+that hash changes, so rerunning the script when no messages have changed is nearly free.
+Bundles that do need regenerating are processed in parallel.
+"""
+
+import argparse
+import hashlib
+import html
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
 
-def generate_html(notifications, output_file_path):
-    html_content = """
+BUNDLE_GLOB = 'src/main/resources/i18n/Messages_*.properties'
+OUTPUT_DIR = 'docs'
+DEFAULT_LOCALE = 'en'
+
+# Keys containing any of these are boilerplate shared by many notifications.
+IGNORE_KEYS = re.compile('buttonIntro|linkIntro|buttonLabel|footer|manageSettings|html')
+LOCALE_PATTERN = re.compile(r'Messages_(.+)\.properties$')
+HASH_PREFIX = '<!-- source-sha256: '
+
+HTML_START = """
     <!DOCTYPE html>
-    <html lang="en">
+    <html lang="{lang}">
     <head>
     <meta charset="UTF-8">
     <title>Notification Details</title>
     <style>
-        body { font-family: Arial, sans-serif; margin: 40px; }
-        table { width: 100%; border-collapse: collapse; }
-        th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
-        th { background-color: #f2f2f2; }
-        h2 { margin-top: 40px; }
+        body {{ font-family: Arial, sans-serif; margin: 40px; }}
+        table {{ width: 100%; border-collapse: collapse; }}
+        th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
+        th {{ background-color: #f2f2f2; }}
+        h2 {{ margin-top: 40px; }}
     </style>
     </head>
     <body>
@@ -61,11 +53,7 @@ def generate_html(notifications, output_file_path):
         </thead>
         <tbody>
     """
-    row_number = 1
-    for key, details in notifications['app'].items():
-        html_content += f"<tr><td>{row_number}</td><td>{key}</td><td>{details['title']}</td><td>{details['body']}</td></tr>"
-        row_number += 1
-    html_content += """
+HTML_BETWEEN_TABLES = """
         </tbody>
     </table>
     <h2>Email Notification Details</h2>
@@ -81,26 +69,159 @@ def generate_html(notifications, output_file_path):
         </thead>
         <tbody>
     """
-    row_number = 1
-    for key, details in notifications['email'].items():
-        html_content += f"<tr><td>{row_number}</td><td>{key}</td><td>{details['title']}</td><td>{details['body']}</td><td>{details['subject']}</td></tr>"
-        row_number += 1
-    html_content += """
+HTML_END = """
         </tbody>
     </table>
     </body>
     </html>
     """
 
-    with open(output_file_path, 'w', encoding='utf-8') as file:
-        file.write(html_content)
+
+def classify_key(key):
+    """Return the notification type, notification key, and field a message key is for.
+
+    Returns None if the key isn't part of a notification's title, body, or subject.
+    """
+    prefix, _, _ = key.partition('.')
+    if 'notification' not in prefix or IGNORE_KEYS.search(key):
+        return None
+    key_parts = key.split('.')
+    if 'app' in key_parts:
+        notification_type = 'app'
+    elif 'email' in key_parts:
+        notification_type = 'email'
+    else:
+        return None
+
+    if 'email' in key_parts and 'body' in key_parts:
+        # Multi-paragraph email bodies: notification.x.email.body.1, .2, ...
+        return notification_type, '.'.join(key_parts[:key_parts.index('email')]), 'body'
+    if 'body' in key_parts[-2]:
+        return notification_type, '.'.join(key_parts[:-3]), 'body'
+    return notification_type, '.'.join(key_parts[:-2]), key_parts[-1]
+
+
+def extract_notifications(lines):
+    notifications = {'app': {}, 'email': {}}
+    for line in lines:
+        key, separator, value = line.strip().partition('=')
+        if not separator or key.startswith('#'):
+            continue
+        classified = classify_key(key)
+        if not classified:
+            continue
+        notification_type, notification_key, field_type = classified
+        details = notifications[notification_type].get(notification_key)
+        if details is None:
+            details = {'title': None, 'body': '', 'subject': None}
+            notifications[notification_type][notification_key] = details
+
+        value = value.strip()
+        if field_type == 'body' and details['body']:
+            details['body'] += ' ' + value
+        else:
+            details[field_type] = value
+    return notifications
+
+
+def _cell(value):
+    return '<td>' + html.escape(str(value), quote=False) + '</td>'
+
+
+def write_html(notifications, file, lang):
+    file.write(HTML_START.format(lang=lang))
+    for row_number, (key, details) in enumerate(notifications['app'].items(), 1):
+        file.write(
+            '<tr>' + _cell(row_number) + _cell(key) + _cell(details['title'])
+            + _cell(details['body']) + '</tr>'
+        )
+    file.write(HTML_BETWEEN_TABLES)
+    for row_number, (key, details) in enumerate(notifications['email'].items(), 1):
+        file.write(
+            '<tr>' + _cell(row_number) + _cell(key) + _cell(details['title'])
+            + _cell(details['body']) + _cell(details['subject']) + '</tr>'
+        )
+    file.write(HTML_END)
+
+
+def output_path(locale):
+    if locale == DEFAULT_LOCALE:
+        return os.path.join(OUTPUT_DIR, 'notifications.html')
+    return os.path.join(OUTPUT_DIR, f'notifications_{locale}.html')
+
+
+def source_hash(bundle_path):
+    """Hash the bundle along with this script, so changes to either regenerate the output."""
+    digest = hashlib.sha256()
+    with open(__file__, 'rb') as file:
+        digest.update(file.read())
+    with open(bundle_path, 'rb') as file:
+        digest.update(file.read())
+    return digest.hexdigest()
+
+
+def existing_hash(path):
+    """Return the source hash recorded at the end of an existing catalog, if any."""
+    try:
+        with open(path, 'rb') as file:
+            file.seek(0, os.SEEK_END)
+            file.seek(max(0, file.tell() - 200))
+            tail = file.read().decode('utf-8', errors='replace')
+    except FileNotFoundError:
+        return None
+    start = tail.rfind(HASH_PREFIX)
+    if start < 0:
+        return None
+    return tail[start + len(HASH_PREFIX):].split(' ', 1)[0]
+
+
+def generate(locale, bundle_path, path, digest):
+    """Write one locale's catalog, replacing the old one only once it's complete."""
+    with open(bundle_path, 'r', encoding='utf-8') as file:
+        notifications = extract_notifications(file)
+    with tempfile.NamedTemporaryFile(
+        'w', encoding='utf-8', dir=os.path.dirname(path), delete=False
+    ) as file:
+        try:
+            write_html(notifications, file, locale.replace('_', '-'))
+            file.write(f'{HASH_PREFIX}{digest} -->\n')
+        except BaseException:
+            os.unlink(file.name)
+            raise
+    os.chmod(file.name, 0o644)
+    os.replace(file.name, path)
+    return path
+
 
 def main():
-    file_path = 'src/main/resources/i18n/Messages_en.properties'  
-    output_file_path = 'docs/notifications.html'
-    notifications = extract_notifications(file_path)
-    generate_html(notifications, output_file_path)
-    print("HTML file has been generated with notification details.")
+    parser = argparse.ArgumentParser(description='Generate the notifications catalogs.')
+    parser.add_argument(
+        '--force', action='store_true', help='Regenerate catalogs even if they are up to date.'
+    )
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=os.cpu_count(),
+        help='Maximum number of locales to process at once. Default is the number of CPUs.',
+    )
+    args = parser.parse_args()
+
+    pending = []
+    for bundle_path in sorted(glob(BUNDLE_GLOB)):
+        locale = LOCALE_PATTERN.search(bundle_path).group(1)
+        path = output_path(locale)
+        digest = source_hash(bundle_path)
+        if not args.force and existing_hash(path) == digest:
+            print(f'{path} is up to date.')
+        else:
+            pending.append((locale, bundle_path, path, digest))
+
+    if len(pending) > 1 and args.jobs > 1:
+        with ProcessPoolExecutor(min(args.jobs, len(pending))) as executor:
+            paths = list(executor.map(generate, *zip(*pending)))
+    else:
+        paths = [generate(*job) for job in pending]
+    for path in paths:
+        print(f'{path} has been generated with notification details.')
+
 
 if __name__ == "__main__":
     main()
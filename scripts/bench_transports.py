@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Compare the HTTP transports' throughput and latency against a local stand-in server.
+
+For each response size, this starts standin.py in its own process, then runs a fixed number
+of GET requests through each transport at each concurrency level and prints a row of the
+results. The stand-in is a single Python process, so it limits the absolute numbers at high
+concurrency; the comparisons between transports under the same conditions are what matter.
+
+The stand-in only speaks HTTP/1.1, so the http2 transport falls back to HTTP/1.1 here and
+this measures httpx's overhead rather than the benefit of multiplexing. For the same reason
+the h2c transport, which requires HTTP/2 without negotiation, can't be benchmarked here.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import List
+
+from client import TerrawareClient
+from pipeline import Pipeline, Stage
+from transports import TRANSPORTS, create_transport
+
+STANDIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "standin.py")
+
+# Transports that need a server that speaks HTTP/2 on plain connections, which the stand-in
+# doesn't.
+UNSUPPORTED_TRANSPORTS = {"h2c"}
+
+
+def parse_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def parse_int_list(value: str) -> List[int]:
+    return [int(item) for item in parse_list(value)]
+
+
+def start_standin(pad_bytes: int, latency: str) -> subprocess.Popen:
+    """Start a stand-in on an unused port. Its URL is in the process's url attribute."""
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            STANDIN,
+            "--port",
+            "0",
+            "--pad-bytes",
+            str(pad_bytes),
+            "--latency",
+            latency,
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    assert process.stdout is not None, "stdout is a pipe"
+    line = process.stdout.readline()
+    if not line.startswith("Listening on "):
+        process.kill()
+        raise Exception(f"Stand-in didn't start: {line}")
+    process.url = line.split()[-1]  # type: ignore[attr-defined]
+    return process
+
+
+def run_cell(
+    url: str, backend: str, concurrency: int, connections: int, block: bool, count: int
+) -> str:
+    client = TerrawareClient(
+        session="benchmark",
+        base_url=url,
+        transport=create_transport(backend, connections, block),
+    )
+
+    def fetch(_):
+        return client.get_raw("/api/v1/facilities")
+
+    # Open the connections before timing anything.
+    warmup = Pipeline([Stage("warmup", fetch, concurrency)])
+    for _ in warmup.results(range(concurrency)):
+        pass
+
+    pipeline = Pipeline([Stage("get", fetch, concurrency)])
+    for _ in pipeline.results(range(count)):
+        pass
+
+    stats = pipeline.stages[0].stats
+    elapsed = pipeline.elapsed
+    return (
+        f"{count / elapsed:9.1f} {stats.percentile(50) * 1000:8.1f} "
+        + f"{stats.percentile(99) * 1000:8.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare HTTP transports against a local stand-in server."
+    )
+    parser.add_argument(
+        "--backends",
+        type=parse_list,
+        default=sorted(TRANSPORTS.keys() - UNSUPPORTED_TRANSPORTS),
+        help="Comma-separated transports to compare. Default is all of them except "
+        + "h2c, which the stand-in doesn't support.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=parse_int_list,
+        default=[1, 8, 32],
+        help="Comma-separated numbers of concurrent requests. Default is 1,8,32.",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=parse_int_list,
+        default=[1000, 65536],
+        help="Comma-separated response sizes in bytes. Default is 1000,65536.",
+    )
+    parser.add_argument(
+        "--connections",
+        type=int,
+        help="Allow at most this many connections, like a load balancer's connection "
+        + "limit. Default is one connection per concurrent request.",
+    )
+    parser.add_argument(
+        "--requests",
+        "-n",
+        type=int,
+        default=2000,
+        help="Number of requests per combination. Default is 2000.",
+    )
+    parser.add_argument(
+        "--latency",
+        default="none",
+        help="Stand-in server latency, as in standin.py --latency. Default is none.",
+    )
+    args = parser.parse_args()
+
+    unknown = [backend for backend in args.backends if backend not in TRANSPORTS]
+    if unknown:
+        parser.error(f"Unknown transports: {', '.join(unknown)}")
+    unsupported = [
+        backend for backend in args.backends if backend in UNSUPPORTED_TRANSPORTS
+    ]
+    if unsupported:
+        parser.error(f"The stand-in doesn't support {', '.join(unsupported)}")
+
+    print(
+        f"{'backend':10s} {'conc':>5s} {'conns':>5s} {'bytes':>8s} "
+        + f"{'req/sec':>9s} {'p50 ms':>8s} {'p99 ms':>8s}"
+    )
+    for size in args.sizes:
+        standin = start_standin(size, args.latency)
+        try:
+            for backend in args.backends:
+                for concurrency in args.concurrency:
+                    connections = args.connections or concurrency
+                    prefix = (
+                        f"{backend:10s} {concurrency:5d} {connections:5d} {size:8d}"
+                    )
+                    try:
+                        result = run_cell(
+                            standin.url,
+                            backend,
+                            concurrency,
+                            connections,
+                            args.connections is not None,
+                            args.requests,
+                        )
+                    except Exception as ex:
+                        result = f"failed: {ex}"
+                    print(f"{prefix} {result}", flush=True)
+        finally:
+            standin.terminate()
+            standin.wait()
+
+
+if __name__ == "__main__":
+    main()
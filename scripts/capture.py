@@ -0,0 +1,260 @@
+"""
+Capture client traffic so it can be replayed against a server as a load test.
+
+A capture is a gzip-compressed JSON Lines file with one entry per request:
+
+    t  start time (Unix timestamp)
+    m  HTTP method
+    u  URL relative to the server's base URL, including the query string
+    h  request headers other than authentication, if any
+    b  JSON request body, if any
+    x  present if the request had a non-JSON body, which isn't captured
+    s  response status code
+    d  duration in milliseconds
+    c  IDs of objects the request created, as [kind, id] pairs
+
+Captures are opened in append mode, so several script runs can write to the same file; gzip
+readers treat the appended sections as one stream.
+
+Objects created while replaying a capture get different IDs than they did when the capture
+was recorded. The replayer uses the "c" entries to map the captured IDs to the new ones and
+rewrites IDs in later URLs and request bodies. IDs are recognized by position: the path
+segment after a collection name like "accessions", or a field like "batchId".
+"""
+
+import gzip
+import json
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+import requests
+
+# URL path segments that are followed by an ID, and the kind of ID.
+URL_ID_KINDS = {
+    "accessions": "accession",
+    "batches": "batch",
+    "devices": "device",
+    "facilities": "facility",
+    "observations": "observation",
+    "plots": "plot",
+    "sites": "plantingSite",
+    "species": "species",
+    "uploads": "upload",
+    "viabilityTests": "viabilityTest",
+    "withdrawals": "withdrawal",
+}
+
+# Request and response fields that hold IDs, and the kind of ID.
+FIELD_ID_KINDS = {
+    "accessionId": "accession",
+    "accessionNumber": "accessionNumber",
+    "batchId": "batch",
+    "batchNumber": "batchNumber",
+    "deviceId": "device",
+    "facilityId": "facility",
+    "observationId": "observation",
+    "plantingSiteId": "plantingSite",
+    "plotId": "plot",
+    "speciesId": "species",
+    "withdrawalId": "withdrawal",
+}
+
+# Fields of a newly-created object, other than its ID, that are generated by the server.
+GENERATED_FIELDS = ["accessionNumber", "batchNumber"]
+
+
+class ReplayError(Exception):
+    pass
+
+
+def _path_segments(url: str) -> List[str]:
+    return url.split("?", 1)[0].strip("/").split("/")
+
+
+def url_id_kind(url: str) -> Optional[str]:
+    """Return the kind of ID of the last collection named in a URL."""
+    for segment in reversed(_path_segments(url)):
+        if segment in URL_ID_KINDS:
+            return URL_ID_KINDS[segment]
+    return None
+
+
+def route_template(url: str) -> str:
+    """Replace the IDs in a URL's path with placeholders, for grouping statistics."""
+    segments = _path_segments(url)
+    return "/" + "/".join(
+        (
+            "{id}"
+            if index > 0 and segments[index - 1] in URL_ID_KINDS and segment.isdigit()
+            else segment
+        )
+        for index, segment in enumerate(segments)
+    )
+
+
+def created_ids(url: str, payload: Any) -> List[Tuple[str, Any]]:
+    """Find the IDs of newly-created objects in the response to a POST request.
+
+    Handles responses that wrap the new object, e.g., {"accession": {"id": 1, ...}}, that
+    return a bare ID, e.g., {"id": 1}, and that return ID fields, e.g., {"plotId": 1}.
+    """
+    ids: List[Tuple[str, Any]] = []
+    if not isinstance(payload, dict):
+        return ids
+
+    for key, value in payload.items():
+        if key == "id":
+            kind = url_id_kind(url)
+            if kind:
+                ids.append((kind, value))
+        elif key in FIELD_ID_KINDS and not isinstance(value, (dict, list)):
+            ids.append((FIELD_ID_KINDS[key], value))
+        elif isinstance(value, dict) and "id" in value:
+            ids.append((key, value["id"]))
+            for field in GENERATED_FIELDS:
+                if field in value:
+                    ids.append((FIELD_ID_KINDS[field], value[field]))
+
+    return ids
+
+
+class TrafficCapture:
+    """Writes captured requests to a file. Safe to use from multiple threads."""
+
+    def __init__(self, path: str):
+        self.fp = gzip.open(path, "at", encoding="utf-8")
+        self.lock = threading.Lock()
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        kwargs: Dict[str, Any],
+        response: requests.Response,
+        start_time: float,
+    ):
+        # Authentication failures are retried with a new token; the retry is what matters.
+        if response.status_code == 401:
+            return
+
+        entry: Dict[str, Any] = {
+            "t": round(start_time, 4),
+            "m": method,
+            "u": url,
+            "s": response.status_code,
+            "d": round((time.time() - start_time) * 1000, 1),
+        }
+        if kwargs.get("headers"):
+            entry["h"] = kwargs["headers"]
+        if kwargs.get("json") is not None:
+            entry["b"] = kwargs["json"]
+        elif kwargs.get("data") is not None or kwargs.get("files") is not None:
+            entry["x"] = 1
+
+        if (
+            method == "POST"
+            and response.ok
+            and response.headers.get("Content-Type", "").startswith("application/json")
+        ):
+            ids = created_ids(url, response.json())
+            if ids:
+                entry["c"] = ids
+
+        line = json.dumps(entry, separators=(",", ":"))
+        with self.lock:
+            self.fp.write(line + "\n")
+
+    def close(self):
+        with self.lock:
+            self.fp.close()
+
+
+def read_capture(paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as fp:
+            for line in fp:
+                yield json.loads(line)
+
+
+class IdMap:
+    """Maps IDs from a capture to the IDs of the objects created during replay.
+
+    Looking up an ID that a captured request created waits for the corresponding replayed
+    request to finish. IDs the capture didn't create, such as facility IDs, are assumed to
+    be the same on the replay server and are left alone.
+    """
+
+    def __init__(self, expected: Set[Tuple[str, str]], timeout: float = 60):
+        self.expected = expected
+        self.timeout = timeout
+        self.mapping: Dict[Tuple[str, str], Any] = {}
+        self.failed: Set[Tuple[str, str]] = set()
+        self.condition = threading.Condition()
+
+    def add(self, kind: str, old: Any, new: Any):
+        with self.condition:
+            self.mapping[(kind, str(old))] = new
+            self.condition.notify_all()
+
+    def fail(self, kind: str, old: Any):
+        with self.condition:
+            self.failed.add((kind, str(old)))
+            self.condition.notify_all()
+
+    def resolve(self, kind: str, old: Any) -> Any:
+        key = (kind, str(old))
+        if key not in self.expected:
+            return old
+
+        with self.condition:
+            self.condition.wait_for(
+                lambda: key in self.mapping or key in self.failed, self.timeout
+            )
+            if key in self.mapping:
+                return self.mapping[key]
+        raise ReplayError(f"{kind} {old} was not created during replay")
+
+    def rewrite_url(self, url: str) -> str:
+        path, _, query = url.partition("?")
+        segments = path.split("/")
+        for index in range(1, len(segments)):
+            kind = URL_ID_KINDS.get(segments[index - 1])
+            if kind and segments[index] not in URL_ID_KINDS:
+                segments[index] = str(self.resolve(kind, segments[index]))
+        path = "/".join(segments)
+
+        if not query:
+            return path
+        params = [
+            (
+                (key, str(self.resolve(FIELD_ID_KINDS[key], value)))
+                if key in FIELD_ID_KINDS
+                else (key, value)
+            )
+            for key, value in parse_qsl(query, keep_blank_values=True)
+        ]
+        return f"{path}?{urlencode(params)}"
+
+    def rewrite_body(self, body: Any, id_kind: Optional[str] = None) -> Any:
+        """Rewrite the IDs in a request body.
+
+        id_kind is the kind of ID of the body's top-level "id" field, if it has one. That's
+        typically the kind of the last ID in the URL, e.g., an accession for an accession
+        update.
+        """
+        if isinstance(body, dict):
+            rewritten = {}
+            for key, value in body.items():
+                if key == "id" and id_kind:
+                    rewritten[key] = self.resolve(id_kind, value)
+                elif key in FIELD_ID_KINDS and not isinstance(value, (dict, list)):
+                    rewritten[key] = self.resolve(FIELD_ID_KINDS[key], value)
+                else:
+                    rewritten[key] = self.rewrite_body(value)
+            return rewritten
+        elif isinstance(body, list):
+            return [self.rewrite_body(value) for value in body]
+        else:
+            return body
@@ -1,12 +1,30 @@
+import atexit
 import os
+import time
+import uuid
 from argparse import ArgumentParser, Namespace
+from datetime import datetime, timedelta, timezone
 
 import jwt
 import requests
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+
+from capture import TrafficCapture
+from profiling import Profiler, start_profiling
+from refcache import DEFAULT_TTL, ReferenceCache, default_cache_dir, user_identity
+from transports import TRANSPORTS, RequestsTransport, Transport, create_transport
 
 DEFAULT_URL = "http://localhost:8080"
 
+# Most IDs the server accepts in one request to an endpoint that fetches several entities by
+# ID, such as GET /api/v1/devices?id=1,2,3.
+MAX_IDS_PER_REQUEST = 100
+
+# Access tokens and their expiration times, by refresh token. Clients created later in the
+# same process, such as by successive commands in terraware.py's batch mode, reuse them
+# rather than each fetching a new one.
+_access_tokens: Dict[str, Tuple[str, float]] = {}
+
 
 def _authenticated(func):
     """Fetch a fresh access token and retry a request if it gets a 401 Unauthorized response."""
@@ -15,7 +33,12 @@ def _authenticated(func):
         try:
             return func(self, *args, **kwargs)
         except requests.exceptions.HTTPError as ex:
-            if self.refresh_token and ex.response and ex.response.status_code == 401:
+            # Responses with error statuses are falsy, so compare to None explicitly.
+            if (
+                self.refresh_token
+                and ex.response is not None
+                and ex.response.status_code == 401
+            ):
                 self.fetch_access_token()
                 return func(self, *args, **kwargs)
             else:
@@ -30,14 +53,26 @@ class TerrawareClient:
         refresh_token: Optional[str] = None,
         session: Optional[str] = None,
         base_url: Optional[str] = None,
+        pool_size: int = 10,
+        capture: Optional["TrafficCapture"] = None,
+        cache: Optional[ReferenceCache] = None,
+        profiler: Optional[Profiler] = None,
+        transport: Optional[Transport] = None,
     ):
         self.base_url = (base_url or DEFAULT_URL).rstrip("/")
         self.refresh_token = refresh_token
+        self.capture = capture
+        self.cache = cache
+        self.profiler = profiler
+
+        # Reuse connections across requests. Scripts that make concurrent requests should
+        # set pool_size to at least the number of threads.
+        self.http = transport or RequestsTransport(pool_size)
 
         if session:
             self.auth_header = {"Cookie": f"SESSION={session}"}
         elif refresh_token:
-            self.fetch_access_token()
+            self.fetch_access_token(reuse=True)
         else:
             self.auth_header = {}
 
@@ -47,35 +82,77 @@ class TerrawareClient:
         return {**kwargs, "headers": {**self.auth_header, **existing_headers}}
 
     @_authenticated
-    def delete(self, url, **kwargs):
+    def request_raw(self, method, url, **kwargs):
         kwargs_with_auth = self._add_auth_header(kwargs)
-        r = requests.delete(self.base_url + url, **kwargs_with_auth)
+        start = time.time()
+        r = self.http.request(method, self.base_url + url, **kwargs_with_auth)
+        if self.profiler:
+            self.profiler.record_request(time.time() - start)
+        if self.capture:
+            self.capture.record(method, url, kwargs, r, start)
         self.raise_for_status(r)
-        return r.json()
+        return r
+
+    def delete(self, url, **kwargs):
+        return self.request_raw("DELETE", url, **kwargs).json()
+
+    def get_raw(self, url, **kwargs):
+        return self.request_raw("GET", url, **kwargs)
 
-    @_authenticated
     def get(self, url, **kwargs):
-        kwargs_with_auth = self._add_auth_header(kwargs)
-        r = requests.get(self.base_url + url, **kwargs_with_auth)
-        self.raise_for_status(r)
-        return r.json()
+        return self.get_raw(url, **kwargs).json()
 
-    @_authenticated
     def post_raw(self, url, **kwargs):
-        kwargs_with_auth = self._add_auth_header(kwargs)
-        r = requests.post(self.base_url + url, **kwargs_with_auth)
-        self.raise_for_status(r)
-        return r
+        return self.request_raw("POST", url, **kwargs)
 
     def post(self, url, **kwargs):
         return self.post_raw(url, **kwargs).json()
 
-    @_authenticated
     def put(self, url, **kwargs):
-        kwargs_with_auth = self._add_auth_header(kwargs)
-        r = requests.put(self.base_url + url, **kwargs_with_auth)
-        self.raise_for_status(r)
-        return r.json()
+        return self.request_raw("PUT", url, **kwargs).json()
+
+    def get_many(self, url, ids, field, require_all=False):
+        """Fetch entities by ID from an endpoint that accepts several IDs at once.
+
+        The IDs are split into as many requests as the server's per-request limit requires.
+        Returns the entities ordered by ID. IDs that don't exist or that the user can't see
+        are omitted, unless require_all is true, in which case they're an error.
+        """
+        ids = sorted(set(ids))
+        results = []
+        for start in range(0, len(ids), MAX_IDS_PER_REQUEST):
+            chunk = ids[start : start + MAX_IDS_PER_REQUEST]
+            query = ",".join(str(entity_id) for entity_id in chunk)
+            results.extend(self.get(f"{url}?id={query}")[field])
+        if require_all and len(results) < len(ids):
+            missing = set(ids) - {result["id"] for result in results}
+            raise Exception(
+                f"Not found: {', '.join(str(id) for id in sorted(missing))}"
+            )
+        return results
+
+    def get_reference(self, url, field):
+        """Return a field from a GET response, using the reference data cache if enabled."""
+        if not self.cache:
+            return self.get(url)[field]
+
+        entry = self.cache.load(url)
+        if entry and self.cache.is_fresh(entry):
+            return entry.value
+
+        headers = {"If-None-Match": entry.etag} if entry and entry.etag else {}
+        r = self.get_raw(url, headers=headers)
+        if r.status_code == 304 and entry:
+            self.cache.store(url, entry.value, entry.etag)
+            return entry.value
+
+        value = r.json()[field]
+        self.cache.store(url, value, r.headers.get("ETag"))
+        return value
+
+    def invalidate_reference(self, url):
+        if self.cache:
+            self.cache.invalidate(url)
 
     @staticmethod
     def raise_for_status(r: requests.Response):
@@ -91,10 +168,10 @@ class TerrawareClient:
             r.raise_for_status()
 
     def get_me(self):
-        return self.get("/api/v1/users/me")["user"]
+        return self.get_reference("/api/v1/users/me", "user")
 
     def list_organizations(self):
-        return self.get("/api/v1/organizations")["organizations"]
+        return self.get_reference("/api/v1/organizations", "organizations")
 
     def get_default_organization_id(self, require_admin=True):
         return min(
@@ -106,10 +183,12 @@ class TerrawareClient:
         )
 
     def get_facility(self, facility_id):
-        return self.get(f"/api/v1/facilities/{facility_id}")["facility"]
+        return self.get_reference(f"/api/v1/facilities/{facility_id}", "facility")
 
-    def list_facilities(self):
-        return self.get("/api/v1/facilities")["facilities"]
+    def list_facilities(self, fields=None):
+        return self.get_reference(
+            _with_fields("/api/v1/facilities", fields), "facilities"
+        )
 
     def list_devices(self, facility_id):
         return self.get(f"/api/v1/facilities/{facility_id}/devices")["devices"]
@@ -117,12 +196,73 @@ class TerrawareClient:
     def get_device(self, device_id):
         return self.get(f"/api/v1/devices/{device_id}")["device"]
 
+    def get_devices(self, device_ids, require_all=False):
+        return self.get_many("/api/v1/devices", device_ids, "devices", require_all)
+
     def create_timeseries(self, payload):
         return self.post("/api/v1/timeseries/create", json=payload)
 
     def record_values(self, payload):
         return self.post("/api/v1/timeseries/values", json=payload)
 
+    def record_values_raw(self, payload):
+        """Return the raw response so callers can distinguish 200 from 202 Accepted."""
+        return self.post_raw("/api/v1/timeseries/values", json=payload)
+
+    def get_timeseries_history(
+        self, timeseries, start_time, end_time, bucket_seconds=None, aggregation=None
+    ):
+        """Return the values of a list of timeseries over a time range.
+
+        timeseries is a list of (device ID, timeseries name) pairs; times are ISO 8601 strings.
+        """
+        payload = {
+            "aggregation": aggregation,
+            "bucketSeconds": bucket_seconds,
+            "endTime": end_time,
+            "startTime": start_time,
+            "timeseries": [
+                {"deviceId": device_id, "timeseriesName": name}
+                for device_id, name in timeseries
+            ],
+        }
+        return self.post("/api/v1/timeseries/history", json=payload)["timeseries"]
+
+    def iter_timeseries_history(
+        self,
+        timeseries,
+        start_time: datetime,
+        end_time: datetime,
+        window: timedelta = timedelta(days=1),
+        bucket_seconds=None,
+        aggregation=None,
+    ):
+        """Yield (device ID, timeseries name, timestamp, value) for a long time range.
+
+        The range is fetched one window at a time and each response is decoded and yielded
+        before the next one is requested, so memory use depends on the window size rather than
+        the length of the range. Windows should be a multiple of bucket_seconds so buckets
+        don't straddle window boundaries.
+        """
+        window_start = start_time
+        while window_start < end_time:
+            window_end = min(window_start + window, end_time)
+            for series in self.get_timeseries_history(
+                timeseries,
+                _isoformat(window_start),
+                _isoformat(window_end),
+                bucket_seconds,
+                aggregation,
+            ):
+                for value in series["values"]:
+                    yield (
+                        series["deviceId"],
+                        series["timeseriesName"],
+                        value["timestamp"],
+                        value["value"],
+                    )
+            window_start = window_end
+
     def list_timeseries(self, device_id):
         return self.get(f"/api/v1/timeseries?deviceId={device_id}")["timeseries"]
 
@@ -138,6 +278,11 @@ class TerrawareClient:
         uri = f"/api/v2/seedbank/accessions/{accession_id}"
         return self.get(uri)["accession"]
 
+    def get_accessions(self, accession_ids, require_all=False):
+        return self.get_many(
+            "/api/v2/seedbank/accessions", accession_ids, "accessions", require_all
+        )
+
     def update_accession(self, accession_id, payload, simulate=False):
         if simulate:
             query = "?simulate=true"
@@ -162,6 +307,35 @@ class TerrawareClient:
         uri = f"/api/v2/seedbank/accessions/{accession_id}/viabilityTests/{viability_test_id}"
         return self.put(uri, json=payload)["accession"]
 
+    def get_accessions_upload_template(self) -> str:
+        return self.get_raw("/api/v2/seedbank/accessions/uploads/template").text
+
+    def upload_file(self, url, path, file_name):
+        """Upload a CSV file and return the upload ID.
+
+        The file is streamed rather than read into memory.
+        """
+        body = _MultipartFile(path, file_name, "text/csv")
+        return self.post(url, data=body, headers={"Content-Type": body.content_type})[
+            "id"
+        ]
+
+    def upload_accessions(self, facility_id, path, file_name="accessions.csv"):
+        return self.upload_file(
+            f"/api/v2/seedbank/accessions/uploads?facilityId={facility_id}",
+            path,
+            file_name,
+        )
+
+    def get_accessions_upload_status(self, upload_id):
+        return self.get(f"/api/v2/seedbank/accessions/uploads/{upload_id}")["details"]
+
+    def resolve_accessions_upload(self, upload_id, overwrite_existing):
+        return self.post(
+            f"/api/v2/seedbank/accessions/uploads/{upload_id}/resolve",
+            json={"overwriteExisting": overwrite_existing},
+        )
+
     def export_search(self, payload):
         """Return a response with a text/csv content type."""
         return self.post_raw(
@@ -178,10 +352,32 @@ class TerrawareClient:
         return self.post("/api/v1/seedbank/values/all", json=payload)["results"]
 
     def create_species(self, payload):
-        return self.post("/api/v1/species", json=payload)["id"]
-
-    def list_species(self, organization_id):
-        return self.get(f"/api/v1/species?organizationId={organization_id}")["species"]
+        species_id = self.post("/api/v1/species", json=payload)["id"]
+        self.invalidate_reference(_species_url(payload["organizationId"]))
+        return species_id
+
+    def create_species_bulk(self, payloads):
+        """Create up to 1000 species in one request.
+
+        Returns a result for each payload, in order, with a "result" of "Created" or
+        "Duplicate" and the "id" of each created species.
+        """
+        results = self.post("/api/v1/species/bulk", json={"species": payloads})[
+            "results"
+        ]
+        for organization_id in {payload["organizationId"] for payload in payloads}:
+            self.invalidate_reference(_species_url(organization_id))
+        return results
+
+    def list_species(self, organization_id, fields=None):
+        """List an organization's species.
+
+        If fields is a list of property names, only those are included. That's much faster
+        for organizations with many species. The other list methods accept fields too.
+        """
+        return self.get_reference(
+            _with_fields(_species_url(organization_id), fields), "species"
+        )
 
     def create_seedling_batch(self, payload):
         return self.post("/api/v1/nursery/batches", json=payload)["batch"]
@@ -189,22 +385,56 @@ class TerrawareClient:
     def get_seedling_batch(self, batch_id):
         return self.get(f"/api/v1/nursery/batches/{batch_id}")["batch"]
 
+    def get_seedling_batches(self, batch_ids, require_all=False):
+        return self.get_many(
+            "/api/v1/nursery/batches", batch_ids, "batches", require_all
+        )
+
+    def get_batches_upload_template(self) -> str:
+        return self.get_raw("/api/v1/nursery/batches/uploads/template").text
+
+    def upload_batches(self, facility_id, path, file_name="batches.csv"):
+        return self.upload_file(
+            f"/api/v1/nursery/batches/uploads?facilityId={facility_id}",
+            path,
+            file_name,
+        )
+
+    def get_batches_upload_status(self, upload_id):
+        return self.get(f"/api/v1/nursery/batches/uploads/{upload_id}")["details"]
+
+    def get_nursery_summary(self, organization_id):
+        return self.get(f"/api/v1/nursery/summary?organizationId={organization_id}")[
+            "summary"
+        ]
+
+    def get_nursery_facility_summary(self, facility_id):
+        return self.get(f"/api/v1/nursery/facilities/{facility_id}/summary")["summary"]
+
     def withdraw_seedling_batch(self, payload):
         return self.post("/api/v1/nursery/withdrawals", json=payload)
 
+    def list_planting_sites(self, organization_id):
+        return self.get_reference(
+            f"/api/v1/tracking/sites?organizationId={organization_id}", "sites"
+        )
+
     def get_planting_site(self, planting_site_id, depth="Site"):
-        return self.get(f"/api/v1/tracking/sites/{planting_site_id}?depth={depth}")[
-            "site"
-        ]
+        return self.get_reference(
+            f"/api/v1/tracking/sites/{planting_site_id}?depth={depth}", "site"
+        )
 
     def get_observation(self, observation_id):
         return self.get(f"/api/v1/tracking/observations/{observation_id}")[
             "observation"
         ]
 
-    def list_observations(self, organization_id):
+    def list_observations(self, organization_id, fields=None):
         return self.get(
-            f"/api/v1/tracking/observations?organizationId={organization_id}"
+            _with_fields(
+                f"/api/v1/tracking/observations?organizationId={organization_id}",
+                fields,
+            )
         )["observations"]
 
     def list_observation_plots(self, observation_id):
@@ -229,7 +459,18 @@ class TerrawareClient:
             json=payload,
         )
 
-    def fetch_access_token(self):
+    def fetch_access_token(self, reuse: bool = False):
+        """Fetch an access token using the refresh token.
+
+        If reuse is true and another client in this process already fetched an access token
+        that isn't about to expire, use it instead.
+        """
+        if self.refresh_token and reuse:
+            access_token, expires = _access_tokens.get(self.refresh_token, ("", 0.0))
+            if expires > time.time() + 30:
+                self.auth_header = {"Authorization": f"Bearer {access_token}"}
+                return
+
         if self.refresh_token:
             # This depends on how Keycloak populates some JWT fields. We don't bother verifying
             # the signature because we're only using this to form a request to send to Keycloak,
@@ -261,15 +502,73 @@ class TerrawareClient:
                     )
             r.raise_for_status()
 
-            access_token = r.json()["access_token"]
+            token_payload = r.json()
+            access_token = token_payload["access_token"]
+            _access_tokens[self.refresh_token] = (
+                access_token,
+                time.time() + token_payload.get("expires_in", 0),
+            )
 
             self.auth_header = {"Authorization": f"Bearer {access_token}"}
 
 
-def add_terraware_args(parser: ArgumentParser):
+class _MultipartFile:
+    """A multipart/form-data request body containing a single file.
+
+    requests reads the whole file into memory when it builds a multipart body from the files=
+    argument. This streams it from disk instead. Iterating starts from the beginning of the
+    file each time, so the body can be resent if a request is retried.
+    """
+
+    chunk_size = 1024 * 1024
+
+    def __init__(self, path: str, file_name: str, content_type: str):
+        self.path = path
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        self.preamble = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{file_name}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+        self.epilogue = f"\r\n--{boundary}--\r\n".encode()
+
+    def __len__(self):
+        return len(self.preamble) + os.path.getsize(self.path) + len(self.epilogue)
+
+    def __iter__(self):
+        yield self.preamble
+        with open(self.path, "rb") as fp:
+            while True:
+                chunk = fp.read(self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        yield self.epilogue
+
+
+def _species_url(organization_id) -> str:
+    return f"/api/v1/species?organizationId={organization_id}"
+
+
+def _with_fields(url: str, fields: Optional[List[str]]) -> str:
+    """Add a sparse fieldset to a list endpoint's URL."""
+    if not fields:
+        return url
+    separator = "&" if "?" in url else "?"
+    return f"{url}{separator}fields={','.join(fields)}"
+
+
+def _isoformat(time: datetime) -> str:
+    return time.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def add_terraware_args(parser: ArgumentParser, cache: bool = False):
     """Add a standard set of arguments to configure a TerrawareClient.
 
-    Use client_from_args() to create a TerrawareClient from the parsed arguments.
+    If cache is true, also add arguments to control the on-disk cache of reference data
+    such as species lists; scripts that only look up reference data to pick IDs should
+    enable it. Use client_from_args() to create a TerrawareClient from the parsed arguments.
     """
     parser.add_argument(
         "--refresh-token",
@@ -286,16 +585,83 @@ def add_terraware_args(parser: ArgumentParser):
         default=DEFAULT_URL,
         help="Base URL of terraware-server. Default is http://localhost:8080.",
     )
+    parser.add_argument(
+        "--capture",
+        metavar="PATH",
+        help="Append a log of every request and its response status and timing to this "
+        + "file, for replay with replay.py. The log is gzip-compressed.",
+    )
+    parser.add_argument(
+        "--transport",
+        choices=sorted(TRANSPORTS.keys()),
+        default="requests",
+        help="HTTP library to use. http2 and h2c require httpx; h2c uses HTTP/2 on "
+        + "http:// URLs without negotiating it, for servers known to accept that. "
+        + "Default is requests.",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PREFIX",
+        help="Profile the script and write PREFIX.prof (cProfile statistics) and "
+        + "PREFIX.collapsed (stacks for flame graphs), then show how much of the run was "
+        + "spent on client CPU and how much waiting for the server.",
+    )
+    if cache:
+        parser.add_argument(
+            "--cache-ttl",
+            type=float,
+            default=0,
+            metavar="SECONDS",
+            help="Reuse facility, species, and other reference data fetched by earlier runs "
+            + f"for this long, e.g., {DEFAULT_TTL}, without checking whether it has changed "
+            + "on the server. Default is 0: cached data is always checked, which skips "
+            + "downloading it again if it hasn't changed.",
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Don't cache reference data.",
+        )
+        parser.add_argument(
+            "--cache-dir",
+            default=default_cache_dir(),
+            help=f"Directory for cached reference data. Default is {default_cache_dir()}.",
+        )
+    else:
+        parser.set_defaults(cache_ttl=0, cache_dir=None, no_cache=True)
 
 
-def client_from_args(args: Namespace) -> TerrawareClient:
+def client_from_args(args: Namespace, pool_size: int = 10) -> TerrawareClient:
     refresh_token = args.refresh_token or os.getenv("TERRAWARE_REFRESH_TOKEN")
 
     if not refresh_token and not args.session:
         raise Exception("Must specify --refresh-token or --session")
 
+    capture = None
+    if args.capture:
+        capture = TrafficCapture(args.capture)
+        atexit.register(capture.close)
+
+    profiler = None
+    if args.profile:
+        profiler = start_profiling(args.profile)
+
+    cache = None
+    if not args.no_cache:
+        cache = ReferenceCache(
+            args.cache_dir,
+            args.url,
+            user_identity(refresh_token, args.session),
+            args.cache_ttl,
+        )
+
     return TerrawareClient(
         refresh_token,
         args.session,
         args.url,
+        pool_size,
+        capture,
+        cache,
+        profiler,
+        create_transport(args.transport, pool_size),
     )
@@ -1,17 +1,22 @@
 #!/usr/bin/env python3
 import argparse
+import csv
 from datetime import date, timedelta
 from example_values import FIRST_NAMES
+import io
 import json
 import random
-from random import randint
+import time
 from typing import Dict, List, Optional
 from client import TerrawareClient, add_terraware_args, client_from_args
+from datasets import record_rng
+from pipeline import Pipeline, Stage
+from uploads import AWAITING_USER_ACTION, wait_for_upload, write_and_upload
 
 
-def generate_notes() -> Optional[str]:
-    very = " ".join(["very" for _ in range(0, randint(10, 200))])
-    return random.choice(
+def generate_notes(rng=random) -> Optional[str]:
+    very = " ".join(["very" for _ in range(0, rng.randint(10, 200))])
+    return rng.choice(
         [
             None,
             None,
@@ -26,21 +31,23 @@ def generate_notes() -> Optional[str]:
     )
 
 
-def generate_recent_date() -> Optional[date]:
-    if randint(0, 5) == 0:
+def generate_recent_date(rng=random, today: Optional[date] = None) -> Optional[date]:
+    if rng.randint(0, 5) == 0:
         return None
-    return date.today() - timedelta(days=randint(0, 90))
+    return (today or date.today()) - timedelta(days=rng.randint(0, 90))
 
 
-def generate_test_result(recording_date, max_seeds_germinated: float) -> Dict:
+def generate_test_result(
+    recording_date, max_seeds_germinated: float, rng=random
+) -> Dict:
     return {
         "recordingDate": str(recording_date),
-        "seedsGerminated": randint(0, int(max_seeds_germinated)),
+        "seedsGerminated": rng.randint(0, int(max_seeds_germinated)),
     }
 
 
-def generate_source() -> Optional[str]:
-    return random.choice(
+def generate_source(rng=random) -> Optional[str]:
+    return rng.choice(
         [
             None,
             "Web",
@@ -49,15 +56,17 @@ def generate_source() -> Optional[str]:
     )
 
 
-def generate_person_name() -> str:
-    return random.choice(FIRST_NAMES)
+def generate_person_name(rng=random) -> str:
+    return rng.choice(FIRST_NAMES)
 
 
-def generate_viability_test_v2(received_date, remaining_quantity: Dict) -> Dict:
+def generate_viability_test_v2(
+    received_date, remaining_quantity: Dict, rng=random
+) -> Dict:
     if remaining_quantity["units"] == "Seeds":
-        seeds_tested = randint(1, remaining_quantity["quantity"])
+        seeds_tested = rng.randint(1, remaining_quantity["quantity"])
     else:
-        seeds_tested = randint(10, 500)
+        seeds_tested = rng.randint(10, 500)
 
     test_type_substrates = {
         "Lab": [
@@ -77,27 +86,27 @@ def generate_viability_test_v2(received_date, remaining_quantity: Dict) -> Dict:
         ],
     }
 
-    test_type = random.choice(list(test_type_substrates.keys()))
-    seed_type = random.choice([None, "Fresh", "Stored"])
-    substrate = random.choice(test_type_substrates[test_type])
-    treatment = random.choice(
+    test_type = rng.choice(list(test_type_substrates.keys()))
+    seed_type = rng.choice([None, "Fresh", "Stored"])
+    substrate = rng.choice(test_type_substrates[test_type])
+    treatment = rng.choice(
         [None, "Chemical", "Light", "Other", "Scarify", "Soak", "Stratification"]
     )
 
-    start_date = received_date + timedelta(days=randint(0, 2))
-    germination_count = randint(0, 3)
+    start_date = received_date + timedelta(days=rng.randint(0, 2))
+    germination_count = rng.randint(0, 3)
 
     test_results = []
     recording_date = start_date
 
     for _ in range(0, germination_count):
         test_results.append(
-            generate_test_result(recording_date, seeds_tested / germination_count)
+            generate_test_result(recording_date, seeds_tested / germination_count, rng)
         )
-        recording_date += timedelta(days=randint(1, 3))
+        recording_date += timedelta(days=rng.randint(1, 3))
 
     return {
-        "notes": generate_notes(),
+        "notes": generate_notes(rng),
         "seedsTested": seeds_tested,
         "seedType": seed_type,
         "startDate": str(start_date) if start_date else None,
@@ -108,28 +117,31 @@ def generate_viability_test_v2(received_date, remaining_quantity: Dict) -> Dict:
     }
 
 
-def generate_coordinates() -> Dict:
+def generate_coordinates(rng=random) -> Dict:
     return {
-        "latitude": float(randint(100, 110)),
-        "longitude": float(randint(50, 60)),
-        "accuracy": float(random.choice([50, 75, 100])),
+        "latitude": float(rng.randint(100, 110)),
+        "longitude": float(rng.randint(50, 60)),
+        "accuracy": float(rng.choice([50, 75, 100])),
     }
 
 
-def generate_bag_numbers() -> Optional[List[str]]:
-    if randint(0, 5) > 0:
+def generate_bag_numbers(rng=random) -> Optional[List[str]]:
+    if rng.randint(0, 5) > 0:
         return list(
-            [str(randint(100000000, 999999999)) for _ in range(0, randint(1, 10))]
+            [
+                str(rng.randint(100000000, 999999999))
+                for _ in range(0, rng.randint(1, 10))
+            ]
         )
     else:
         return None
 
 
-def generate_collection_site_name() -> Optional[str]:
-    return random.choice(
+def generate_collection_site_name(rng=random) -> Optional[str]:
+    return rng.choice(
         [
             None,
-            f"Location {randint(1, 100)}",
+            f"Location {rng.randint(1, 100)}",
             "West edge of the woods",
             "Right next to the seed bank",
             "Down the road a bit",
@@ -137,74 +149,79 @@ def generate_collection_site_name() -> Optional[str]:
     )
 
 
-def generate_plant_id() -> Optional[str]:
+def generate_plant_id(rng=random) -> Optional[str]:
     # No clue what this will actually look like, so just generate a number
-    return str(randint(100000, 999999)) if randint(0, 4) > 0 else None
+    return str(rng.randint(100000, 999999)) if rng.randint(0, 4) > 0 else None
 
 
-def generate_quantity(unit_type: Optional[str] = None) -> Dict:
+def generate_quantity(unit_type: Optional[str] = None, rng=random) -> Dict:
     if unit_type is None:
-        unit_type = random.choice(["Count", "Weight"])
+        unit_type = rng.choice(["Count", "Weight"])
 
     if unit_type == "Weight":
         return {
-            "quantity": randint(1, 100),
-            "units": random.choice(
+            "quantity": rng.randint(1, 100),
+            "units": rng.choice(
                 ["Grams", "Kilograms", "Pounds", "Milligrams", "Ounces"]
             ),
         }
     else:
-        return {"quantity": randint(1, 100), "units": "Seeds"}
+        return {"quantity": rng.randint(1, 100), "units": "Seeds"}
 
 
-def generate_collectors() -> Optional[List[str]]:
-    num_collectors = randint(1, 3) if randint(0, 2) == 0 else 0
-    return [generate_person_name() for _ in range(num_collectors)] or None
+def generate_collectors(rng=random) -> Optional[List[str]]:
+    num_collectors = rng.randint(1, 3) if rng.randint(0, 2) == 0 else 0
+    return [generate_person_name(rng) for _ in range(num_collectors)] or None
 
 
-def generate_accession(facility_id: int, species_ids: List[int]) -> Dict:
-    bag_numbers = generate_bag_numbers()
+def generate_accession(
+    facility_id: int,
+    species_ids: List[int],
+    rng=random,
+    today: Optional[date] = None,
+) -> Dict:
+    bag_numbers = generate_bag_numbers(rng)
     geolocations = (
-        list([generate_coordinates() for _ in bag_numbers]) if bag_numbers else None
+        list([generate_coordinates(rng) for _ in bag_numbers]) if bag_numbers else None
     )
 
-    collected_date = generate_recent_date()
+    collected_date = generate_recent_date(rng, today)
     received_date = (
-        collected_date + timedelta(days=randint(0, 3)) if collected_date else None
+        collected_date + timedelta(days=rng.randint(0, 3)) if collected_date else None
     )
 
-    plants_collected_from = randint(1, 10)
+    plants_collected_from = rng.randint(1, 10)
 
-    species_id = random.choice(species_ids) if randint(1, 5) > 1 else None
+    species_id = rng.choice(species_ids) if rng.randint(1, 5) > 1 else None
 
     return {
         "bagNumbers": bag_numbers,
         "collectedDate": str(collected_date) if collected_date else None,
         "collectionSiteCoordinates": geolocations,
-        "collectionSiteLandowner": generate_person_name(),
-        "collectionSiteName": generate_collection_site_name(),
-        "collectionSiteNotes": generate_notes(),
-        "collectors": generate_collectors(),
+        "collectionSiteLandowner": generate_person_name(rng),
+        "collectionSiteName": generate_collection_site_name(rng),
+        "collectionSiteNotes": generate_notes(rng),
+        "collectors": generate_collectors(rng),
         "facilityId": facility_id,
-        "founderId": generate_plant_id(),
+        "founderId": generate_plant_id(rng),
         "plantsCollectedFrom": plants_collected_from,
         "receivedDate": str(received_date) if received_date else None,
-        "source": generate_source(),
+        "source": generate_source(rng),
         "speciesId": species_id,
     }
 
 
-def generate_accession_update(accession: Dict) -> Dict:
-    remaining_quantity = generate_quantity()
+def generate_accession_update(accession: Dict, rng=random) -> Dict:
+    remaining_quantity = generate_quantity(rng=rng)
 
     # If receivedDate is set, we will be creating a viability test, so we'll need
     # subset weight/count if the remaining quantity is weight-based.
-    if randint(0, 3) == 0 or (
+    if rng.randint(0, 3) == 0 or (
         "receivedDate" in accession and remaining_quantity["units"] != "Seeds"
     ):
         subset_fields = {
-            "subsetCount": randint(1, 20),
-            "subsetWeight": generate_quantity("Weight"),
+            "subsetCount": rng.randint(1, 20),
+            "subsetWeight": generate_quantity("Weight", rng),
         }
     else:
         subset_fields = {}
@@ -216,47 +233,237 @@ def generate_accession_update(accession: Dict) -> Dict:
     }
 
 
-def create_accession(
-    client: TerrawareClient, facility_id: int, species_ids: List[int]
+def generate_upload_row(
+    species: List[Dict], rng=random, today: Optional[date] = None
+) -> List[str]:
+    """Generate a row of an accessions upload file, in the column order of the template."""
+    chosen = rng.choice(species)
+    quantity = generate_quantity(rng=rng)
+    coordinates = generate_coordinates(rng) if rng.randint(0, 2) > 0 else None
+    collectors = generate_collectors(rng)
+
+    return [
+        "",
+        chosen["scientificName"],
+        chosen.get("commonName") or "",
+        str(quantity["quantity"]),
+        quantity["units"],
+        rng.choice(["Awaiting Processing", "Processing", "Drying", "In Storage"]),
+        str((today or date.today()) - timedelta(days=rng.randint(0, 90))),
+        generate_collection_site_name(rng) or "",
+        generate_person_name(rng),
+        "",
+        "",
+        rng.choice(["", "", "Kenya", "US", "Brazil"]),
+        generate_notes(rng) or "",
+        collectors[0] if collectors else "",
+        rng.choice(["", "Wild", "Reintroduced", "Cultivated", "Other"]),
+        str(rng.randint(1, 10)),
+        generate_plant_id(rng) or "",
+        str(coordinates["latitude"]) if coordinates else "",
+        str(coordinates["longitude"]) if coordinates else "",
+    ]
+
+
+def render_upload_file(
+    template: str,
+    species: List[Dict],
+    number: int,
+    fp,
+    seed: Optional[int] = None,
+    batch_rows: int = 1000,
+):
+    """Write an accessions upload file with the template's header row and generated rows.
+
+    Rows are generated and written a batch at a time, so memory use doesn't grow with the
+    number of accessions.
+    """
+    header = next(csv.reader(io.StringIO(template)))
+    writer = csv.writer(fp)
+    writer.writerow(header)
+
+    for offset in range(0, number, batch_rows):
+        writer.writerows(
+            generate_upload_row(species, record_rng(seed, "accessionRow", index))
+            for index in range(offset, min(offset + batch_rows, number))
+        )
+
+
+def upload_accessions(
+    client: TerrawareClient,
+    facility_id: int,
+    species: List[Dict],
+    number: int,
+    overwrite_existing: bool = False,
+    poll_interval: float = 1.0,
+    keep_file: Optional[str] = None,
+    seed: Optional[int] = None,
+) -> Dict:
+    """Create accessions by uploading a generated accessions list.
+
+    Returns the final status of the upload along with the time each phase took.
+    """
+    start = time.monotonic()
+    template = client.get_accessions_upload_template()
+
+    upload_id, timings = write_and_upload(
+        lambda fp: render_upload_file(template, species, number, fp, seed),
+        lambda path: client.upload_accessions(facility_id, path),
+        "accessions-",
+        keep_file,
+    )
+
+    process_start = time.monotonic()
+    details = wait_for_upload(
+        client.get_accessions_upload_status, upload_id, poll_interval
+    )
+
+    if details["status"] == AWAITING_USER_ACTION:
+        warnings = details.get("warnings") or []
+        print(
+            f"Upload {upload_id} has {len(warnings)} warnings; "
+            + ("overwriting" if overwrite_existing else "keeping")
+            + " existing accessions"
+        )
+        client.resolve_accessions_upload(upload_id, overwrite_existing)
+        details = wait_for_upload(
+            client.get_accessions_upload_status, upload_id, poll_interval
+        )
+
+    timings["process"] = time.monotonic() - process_start
+    timings["total"] = time.monotonic() - start
+
+    return {**details, "timings": timings}
+
+
+def time_rest_sample(
+    client: TerrawareClient,
+    facility_id: int,
+    species_ids: List[int],
+    number: int,
+    workers: Optional[int],
+    seed: Optional[int] = None,
+) -> float:
+    """Create a sample of accessions through the REST API and return the seconds per accession."""
+    start = time.monotonic()
+    if workers:
+        pipeline = create_accessions_pipeline(
+            client, facility_id, species_ids, workers, seed
+        )
+        for _ in pipeline.results(range(0, number)):
+            pass
+    else:
+        for index in range(0, number):
+            create_accession(
+                client, facility_id, species_ids, record_rng(seed, "accession", index)
+            )
+    return (time.monotonic() - start) / number
+
+
+def print_failure(message: str, payload: Dict):
+    print(message)
+    print(json.dumps(payload, indent=2))
+
+
+def create_initial(
+    client: TerrawareClient, facility_id: int, species_ids: List[int], rng=random
 ) -> Dict:
-    create_payload = generate_accession(facility_id, species_ids)
+    create_payload = generate_accession(facility_id, species_ids, rng)
 
     try:
-        initial = client.create_accession(create_payload)
+        return client.create_accession(create_payload)
     except Exception as ex:
-        print("Unable to create accession. Payload:")
-        print(json.dumps(create_payload, indent=2))
+        print_failure("Unable to create accession. Payload:", create_payload)
         raise ex
 
-    accession_id = initial["id"]
 
-    client.check_in_accession(accession_id)
+def check_in(client: TerrawareClient, accession: Dict) -> Dict:
+    client.check_in_accession(accession["id"])
+    return accession
 
-    update_payload = generate_accession_update(initial)
+
+def update(client: TerrawareClient, initial: Dict, rng=random) -> Dict:
+    accession_id = initial["id"]
+    update_payload = generate_accession_update(initial, rng)
 
     try:
-        updated = client.update_accession(accession_id, update_payload)
+        return client.update_accession(accession_id, update_payload)
     except Exception as ex:
-        print(f"Unable to update accession {accession_id}. Payload:")
-        print(json.dumps(update_payload, indent=2))
+        print_failure(
+            f"Unable to update accession {accession_id}. Payload:", update_payload
+        )
         raise ex
 
-    if "receivedDate" in updated:
-        received_date = date.fromisoformat(updated["receivedDate"])
-        viability_test_payload = generate_viability_test_v2(
-            received_date, updated["remainingQuantity"]
+
+def add_viability_test(client: TerrawareClient, updated: Dict, rng=random) -> Dict:
+    if "receivedDate" not in updated:
+        return updated
+
+    accession_id = updated["id"]
+    received_date = date.fromisoformat(updated["receivedDate"])
+    viability_test_payload = generate_viability_test_v2(
+        received_date, updated["remainingQuantity"], rng
+    )
+
+    try:
+        return client.create_viability_test(accession_id, viability_test_payload)
+    except Exception as ex:
+        print_failure(
+            f"Unable to create viability test for accession {accession_id}. Payload:",
+            viability_test_payload,
         )
+        raise ex
 
-        try:
-            updated = client.create_viability_test(accession_id, viability_test_payload)
-        except Exception as ex:
-            print(
-                f"Unable to create viability test for accession {accession_id}. Payload:"
-            )
-            print(json.dumps(viability_test_payload, indent=2))
-            raise ex
 
-    return updated
+def create_accession(
+    client: TerrawareClient, facility_id: int, species_ids: List[int], rng=random
+) -> Dict:
+    initial = create_initial(client, facility_id, species_ids, rng)
+    check_in(client, initial)
+    updated = update(client, initial, rng)
+    return add_viability_test(client, updated, rng)
+
+
+def create_accessions_pipeline(
+    client: TerrawareClient,
+    facility_id: int,
+    species_ids: List[int],
+    workers: int,
+    seed: Optional[int] = None,
+) -> Pipeline:
+    """Build a pipeline that runs each step of accession creation on its own worker pool.
+
+    The create and update steps are the slowest, so they get the full number of workers;
+    this keeps thousands of accessions moving without one slow step starving the others.
+
+    Each accession's random number generator travels through the pipeline with it, so the
+    generated values don't depend on how the steps of different accessions interleave.
+    """
+
+    def create(index: int):
+        rng = record_rng(seed, "accession", index)
+        return rng, create_initial(client, facility_id, species_ids, rng)
+
+    def check_in_step(item):
+        rng, accession = item
+        return rng, check_in(client, accession)
+
+    def update_step(item):
+        rng, accession = item
+        return rng, update(client, accession, rng)
+
+    def viability_test_step(item):
+        rng, accession = item
+        return add_viability_test(client, accession, rng)
+
+    return Pipeline(
+        [
+            Stage("create", create, workers),
+            Stage("checkIn", check_in_step, workers),
+            Stage("update", update_step, workers),
+            Stage("viabilityTest", viability_test_step, workers),
+        ]
+    )
 
 
 def main():
@@ -277,31 +484,129 @@ def main():
         action="store_true",
         help="Show populated accession data as returned by the server.",
     )
-    add_terraware_args(parser)
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        help="Create accessions concurrently, with this many workers for each step "
+        + "(create, check in, update, viability test), and report per-step throughput. "
+        + "Default is to create accessions one at a time.",
+    )
+    parser.add_argument(
+        "--upload",
+        action="store_true",
+        help="Create the accessions by generating an accessions list in the upload template "
+        + "format and uploading it, rather than making API requests for each accession. "
+        + "Reports how long each phase of the upload took.",
+    )
+    parser.add_argument(
+        "--overwrite-existing",
+        action="store_true",
+        help="With --upload, if the server reports that some accessions already exist, "
+        + "overwrite them. Default is to keep the existing accessions.",
+    )
+    parser.add_argument(
+        "--keep-file",
+        metavar="PATH",
+        help="With --upload, write the generated accessions list to this file and leave it "
+        + "there. Default is to use a temporary file.",
+    )
+    parser.add_argument(
+        "--compare",
+        type=int,
+        metavar="N",
+        help="With --upload, also create N accessions using API requests (with --workers if "
+        + "specified) and report the estimated speedup of the upload over the API for the "
+        + "full number of accessions.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed for the random number generator. Each accession's values are generated "
+        + "from their own stream derived from the seed and the accession's position, so the "
+        + "same seed generates the same accessions regardless of --workers. Dates are still "
+        + "relative to the current date. Default is to generate different values each run.",
+    )
+    add_terraware_args(parser, cache=True)
     args = parser.parse_args()
 
-    client = client_from_args(args)
+    client = client_from_args(args, pool_size=(args.workers or 1) * 4)
 
     if args.facility:
         facility_id = args.facility
     else:
         facility_id = [
             entry["id"]
-            for entry in client.list_facilities()
+            for entry in client.list_facilities(["id", "type"])
             if entry["type"] == "Seed Bank"
         ][0]
 
     organization_id = client.get_facility(facility_id)["organizationId"]
 
-    species_ids = [species["id"] for species in client.list_species(organization_id)]
+    species = client.list_species(
+        organization_id, ["id", "scientificName", "commonName"]
+    )
+    species_ids = [entry["id"] for entry in species]
+
+    if args.upload:
+        result = upload_accessions(
+            client,
+            facility_id,
+            species,
+            args.number,
+            args.overwrite_existing,
+            keep_file=args.keep_file,
+            seed=args.seed,
+        )
+        timings = result["timings"]
+        for error in result.get("errors") or []:
+            print(f"Row {error.get('position')}: {error.get('message')}")
+        print(
+            f"{args.number} accessions: rendered in {timings['render']:.1f}s, "
+            f"uploaded in {timings['upload']:.1f}s, "
+            f"processed in {timings['process']:.1f}s, "
+            f"total {timings['total']:.1f}s "
+            f"({args.number / timings['total']:.1f}/sec)"
+        )
 
-    for _ in range(0, args.number):
-        accession = create_accession(client, facility_id, species_ids)
+        if args.compare and result["status"] == "Completed":
+            per_accession = time_rest_sample(
+                client, facility_id, species_ids, args.compare, args.workers, args.seed
+            )
+            rest_estimate = per_accession * args.number
+            print(
+                f"API: {1 / per_accession:.1f}/sec over {args.compare} accessions; "
+                f"estimated {rest_estimate:.1f}s for {args.number}, "
+                f"upload speedup {rest_estimate / timings['total']:.1f}x"
+            )
+        return
+
+    if args.workers:
+        pipeline = create_accessions_pipeline(
+            client, facility_id, species_ids, args.workers, args.seed
+        )
+        accessions = pipeline.results(range(0, args.number))
+    else:
+        pipeline = None
+        accessions = (
+            create_accession(
+                client,
+                facility_id,
+                species_ids,
+                record_rng(args.seed, "accession", index),
+            )
+            for index in range(0, args.number)
+        )
+
+    for accession in accessions:
         if args.verbose:
             print(json.dumps(accession, indent=2))
         else:
             print(f"{accession['id']} {accession['accessionNumber']}")
 
+    if pipeline:
+        pipeline.report()
+
 
 if __name__ == "__main__":
     main()
@@ -1,16 +1,21 @@
 #!/usr/bin/env python3
 import argparse
+import csv
 from datetime import date, timedelta
+import io
 import json
 import random
-from random import randint
-from typing import List, Optional
+import time
+from typing import Dict, List, Optional
 from client import TerrawareClient, add_terraware_args, client_from_args
+from datasets import record_rng
+from pipeline import LatencyStats, Pipeline, Stage
+from uploads import wait_for_upload, write_and_upload
 
 
-def generate_notes() -> Optional[str]:
-    very = " ".join(["very" for _ in range(0, randint(10, 200))])
-    return random.choice(
+def generate_notes(rng=random) -> Optional[str]:
+    very = " ".join(["very" for _ in range(0, rng.randint(10, 200))])
+    return rng.choice(
         [
             None,
             None,
@@ -25,29 +30,157 @@ def generate_notes() -> Optional[str]:
     )
 
 
-def generate_recent_date() -> Optional[date]:
-    return date.today() - timedelta(days=randint(0, 90))
+def generate_recent_date(rng=random, today: Optional[date] = None) -> Optional[date]:
+    return (today or date.today()) - timedelta(days=rng.randint(0, 90))
 
 
-def generate_upcoming_date() -> Optional[date]:
-    return date.today() + timedelta(days=randint(0, 90))
+def generate_upcoming_date(rng=random, today: Optional[date] = None) -> Optional[date]:
+    return (today or date.today()) + timedelta(days=rng.randint(0, 90))
 
 
-def create_batch(client: TerrawareClient, facility_id: int, species_ids: List[int]):
-    create_payload = {
-        "activeGrowthQuantity": randint(1, 20),
-        "addedDate": str(generate_recent_date()),
+def generate_batch(
+    facility_id: int,
+    species_ids: List[int],
+    rng=random,
+    today: Optional[date] = None,
+) -> Dict:
+    return {
+        "activeGrowthQuantity": rng.randint(1, 20),
+        "addedDate": str(generate_recent_date(rng, today)),
         "facilityId": facility_id,
-        "germinatingQuantity": randint(1, 10) if randint(0, 3) == 0 else 0,
-        "notes": generate_notes(),
-        "readyByDate": str(generate_upcoming_date()) if randint(0, 1) == 0 else None,
-        "readyQuantity": randint(1, 20),
-        "speciesId": random.choice(species_ids),
+        "germinatingQuantity": rng.randint(1, 10) if rng.randint(0, 3) == 0 else 0,
+        "notes": generate_notes(rng),
+        "readyByDate": (
+            str(generate_upcoming_date(rng, today)) if rng.randint(0, 1) == 0 else None
+        ),
+        "readyQuantity": rng.randint(1, 20),
+        "speciesId": rng.choice(species_ids),
     }
 
+
+def create_batch(
+    client: TerrawareClient, facility_id: int, species_ids: List[int], rng=random
+):
+    create_payload = generate_batch(facility_id, species_ids, rng)
+
     return client.create_seedling_batch(create_payload)
 
 
+def generate_upload_row(
+    species: List[Dict], rng=random, today: Optional[date] = None
+) -> List[str]:
+    """Generate a row of a seedling batches upload file, in the template's column order."""
+    chosen = rng.choice(species)
+    return [
+        chosen["scientificName"],
+        chosen.get("commonName") or "",
+        str(rng.randint(1, 10) if rng.randint(0, 3) == 0 else 0),
+        str(rng.randint(1, 20)),
+        str(rng.randint(1, 20)),
+        str(generate_recent_date(rng, today)),
+        "",
+    ]
+
+
+def render_upload_file(
+    template: str,
+    species: List[Dict],
+    number: int,
+    fp,
+    seed: Optional[int] = None,
+    batch_rows: int = 1000,
+):
+    """Write a seedling batches upload file with the template's header row.
+
+    Rows are generated and written a batch at a time, so memory use doesn't grow with the
+    number of batches.
+    """
+    header = next(csv.reader(io.StringIO(template)))
+    writer = csv.writer(fp)
+    writer.writerow(header)
+
+    for offset in range(0, number, batch_rows):
+        writer.writerows(
+            generate_upload_row(species, record_rng(seed, "batchRow", index))
+            for index in range(offset, min(offset + batch_rows, number))
+        )
+
+
+def upload_batches(
+    client: TerrawareClient,
+    facility_id: int,
+    species: List[Dict],
+    number: int,
+    poll_interval: float = 1.0,
+    keep_file: Optional[str] = None,
+    seed: Optional[int] = None,
+) -> Dict:
+    """Create batches by uploading a generated seedling batches list.
+
+    Returns the final status of the upload along with the time each phase took.
+    """
+    start = time.monotonic()
+    template = client.get_batches_upload_template()
+
+    upload_id, timings = write_and_upload(
+        lambda fp: render_upload_file(template, species, number, fp, seed),
+        lambda path: client.upload_batches(facility_id, path),
+        "batches-",
+        keep_file,
+    )
+
+    process_start = time.monotonic()
+    details = wait_for_upload(
+        client.get_batches_upload_status, upload_id, poll_interval
+    )
+    timings["process"] = time.monotonic() - process_start
+    timings["total"] = time.monotonic() - start
+
+    return {**details, "timings": timings}
+
+
+def create_batches_pipeline(
+    client: TerrawareClient,
+    facility_id: int,
+    species_ids: List[int],
+    workers: int,
+    seed: Optional[int] = None,
+) -> Pipeline:
+    return Pipeline(
+        [
+            Stage(
+                "create",
+                lambda index: create_batch(
+                    client, facility_id, species_ids, record_rng(seed, "batch", index)
+                ),
+                workers,
+            )
+        ]
+    )
+
+
+def time_summaries(
+    client: TerrawareClient, organization_id: int, facility_id: int, count: int
+):
+    """Fetch the nursery summaries repeatedly and print their latencies."""
+    organization_stats = LatencyStats("organization summary")
+    facility_stats = LatencyStats("facility summary")
+    start = time.monotonic()
+
+    for _ in range(count):
+        request_start = time.monotonic()
+        client.get_nursery_summary(organization_id)
+        organization_stats.record(time.monotonic() - request_start)
+
+        request_start = time.monotonic()
+        client.get_nursery_facility_summary(facility_id)
+        facility_stats.record(time.monotonic() - request_start)
+
+    elapsed = time.monotonic() - start
+    print(organization_stats.summary(elapsed))
+    print(facility_stats.summary(elapsed))
+
+
 def main():
     parser = argparse.ArgumentParser("Create random seedling batches")
     parser.add_argument(
@@ -66,17 +199,52 @@ def main():
         action="store_true",
         help="Show populated batch data as returned by the server.",
     )
-    add_terraware_args(parser)
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed for the random number generator. Each batch's values are generated from "
+        + "their own stream derived from the seed and the batch's position. Dates are still "
+        + "relative to the current date. Default is to generate different values each run.",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        help="Create batches concurrently with this many workers and report throughput. "
+        + "Default is to create batches one at a time.",
+    )
+    parser.add_argument(
+        "--upload",
+        action="store_true",
+        help="Create the batches by generating a seedling batches list in the upload "
+        + "template format and uploading it, rather than making an API request for each "
+        + "batch. Reports how long each phase of the upload took.",
+    )
+    parser.add_argument(
+        "--keep-file",
+        metavar="PATH",
+        help="With --upload, write the generated batches list to this file and leave it "
+        + "there. Default is to use a temporary file.",
+    )
+    parser.add_argument(
+        "--summaries",
+        type=int,
+        metavar="N",
+        default=0,
+        help="After creating the batches, fetch the organization and facility nursery "
+        + "summaries N times each and report their latencies.",
+    )
+    add_terraware_args(parser, cache=True)
     args = parser.parse_args()
 
-    client = client_from_args(args)
+    client = client_from_args(args, pool_size=(args.workers or 1) * 2)
 
     if args.facility:
         facility_id = args.facility
     else:
         nurseries = [
             entry["id"]
-            for entry in client.list_facilities()
+            for entry in client.list_facilities(["id", "type"])
             if entry["type"] == "Nursery"
         ]
         if not nurseries:
@@ -85,16 +253,61 @@ def main():
 
     organization_id = client.get_facility(facility_id)["organizationId"]
 
-    species_ids = [species["id"] for species in client.list_species(organization_id)]
+    species = client.list_species(
+        organization_id, ["id", "scientificName", "commonName"]
+    )
+    species_ids = [entry["id"] for entry in species]
     if not species_ids:
         raise Exception("No species are defined for organization.")
 
-    for _ in range(0, args.number):
-        batch = create_batch(client, facility_id, species_ids)
-        if args.verbose:
-            print(json.dumps(batch, indent=2))
+    if args.upload:
+        result = upload_batches(
+            client,
+            facility_id,
+            species,
+            args.number,
+            keep_file=args.keep_file,
+            seed=args.seed,
+        )
+        timings = result["timings"]
+        for error in result.get("errors") or []:
+            print(f"Row {error.get('position')}: {error.get('message')}")
+        print(
+            f"{args.number} batches: rendered in {timings['render']:.1f}s, "
+            f"uploaded in {timings['upload']:.1f}s, "
+            f"processed in {timings['process']:.1f}s, "
+            f"total {timings['total']:.1f}s "
+            f"({args.number / timings['total']:.1f}/sec)"
+        )
+    else:
+        if args.workers:
+            pipeline = create_batches_pipeline(
+                client, facility_id, species_ids, args.workers, args.seed
+            )
+            batches = pipeline.results(range(0, args.number))
         else:
-            print(f"{batch['id']} {batch['batchNumber']}")
+            pipeline = None
+            batches = (
+                create_batch(
+                    client,
+                    facility_id,
+                    species_ids,
+                    record_rng(args.seed, "batch", index),
+                )
+                for index in range(0, args.number)
+            )
+
+        for batch in batches:
+            if args.verbose:
+                print(json.dumps(batch, indent=2))
+            else:
+                print(f"{batch['id']} {batch['batchNumber']}")
+
+        if pipeline:
+            pipeline.report()
+
+    if args.summaries:
+        time_summaries(client, organization_id, facility_id, args.summaries)
 
 
 if __name__ == "__main__":
@@ -1,8 +1,110 @@
 #!/usr/bin/env python3
 import argparse
+import csv
+import json
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set
 
 import example_values
-from client import add_terraware_args, client_from_args
+from client import TerrawareClient, add_terraware_args, client_from_args
+from pipeline import Pipeline, Stage
+
+# Maximum number of species the server accepts in one bulk create request.
+MAX_CHUNK_SIZE = 1000
+
+
+def read_species_file(path: str) -> Iterator[Dict]:
+    """Yield species payloads from a file without reading the whole file into memory.
+
+    Files ending in .jsonl have one JSON species payload per line. Files ending in .csv have a
+    header row with payload field names such as "scientificName" and "commonName"; empty
+    values are omitted. Any other file has one scientific name per line.
+    """
+    with open(path, newline="") as fp:
+        if path.endswith(".jsonl"):
+            for line in fp:
+                if line.strip():
+                    yield json.loads(line)
+        elif path.endswith(".csv"):
+            for row in csv.DictReader(fp):
+                yield {key: value for key, value in row.items() if value}
+        else:
+            for line in fp:
+                if line.strip():
+                    yield {"scientificName": line.strip()}
+
+
+def new_species(
+    payloads: Iterable[Dict], organization_id: int, existing_names: Set[str]
+) -> Iterator[Dict]:
+    """Yield the payloads whose names aren't in existing_names, which is updated as we go."""
+    for payload in payloads:
+        name = payload["scientificName"]
+        if name not in existing_names:
+            existing_names.add(name)
+            yield {**payload, "organizationId": organization_id}
+
+
+def chunks(payloads: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    iterator = iter(payloads)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def import_species(
+    client: TerrawareClient,
+    organization_id: int,
+    payloads: Iterable[Dict],
+    number: Optional[int],
+    chunk_size: int,
+    workers: int,
+):
+    existing_names = {
+        species["scientificName"]
+        for species in client.list_species(organization_id, ["scientificName"])
+    }
+    payloads = islice(new_species(payloads, organization_id, existing_names), number)
+
+    failed_chunks: List[str] = []
+
+    def on_error(chunk: List[Dict], ex: Exception):
+        failed_chunks.append(chunk[0]["scientificName"])
+        print(f"Chunk starting with {chunk[0]['scientificName']} failed: {ex}")
+
+    pipeline = Pipeline(
+        [Stage("species", client.create_species_bulk, workers, on_error)]
+    )
+
+    counts: Dict[str, int] = {}
+    try:
+        for results in pipeline.results(chunks(payloads, chunk_size)):
+            for result in results:
+                counts[result["result"]] = counts.get(result["result"], 0) + 1
+    except Exception:
+        # Failed chunks are reported below, after the summary of what did get created.
+        if not failed_chunks:
+            raise
+
+    elapsed = pipeline.elapsed
+    created = counts.get("Created", 0)
+    print(
+        f"Created {created} species in {elapsed:.1f}s "
+        + f"({created / elapsed if elapsed > 0 else 0:.1f}/sec), "
+        + f"skipped {counts.get('Duplicate', 0)} duplicates"
+    )
+    pipeline.report()
+
+    if failed_chunks:
+        raise Exception(
+            "Failed to create the chunks starting with " + ", ".join(failed_chunks)
+        )
+    if not counts:
+        raise Exception("No new species names available")
+    if number and created < number:
+        print(f"Only {created} new species names were available")
 
 
 def main():
@@ -19,39 +121,50 @@ def main():
         "-n",
         type=int,
         help="Number of species to create. Default is to create all example species in "
-        + "example_values.py.",
+        + "example_values.py, or all the species in the file.",
+    )
+    parser.add_argument(
+        "--file",
+        "-f",
+        help="Read species from this file instead of using the example species. A .jsonl "
+        + "file has one species payload per line, a .csv file has a header row with payload "
+        + "field names, and any other file has one scientific name per line.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=500,
+        help=f"Number of species to create per request, up to {MAX_CHUNK_SIZE}. "
+        + "Default is 500.",
     )
-    add_terraware_args(parser)
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=1,
+        help="Number of concurrent requests. Default is 1.",
+    )
+    add_terraware_args(parser, cache=True)
 
     args = parser.parse_args()
-    client = client_from_args(args)
+    if not 1 <= args.chunk_size <= MAX_CHUNK_SIZE:
+        parser.error(f"--chunk-size must be between 1 and {MAX_CHUNK_SIZE}")
+
+    client = client_from_args(args, pool_size=args.workers)
 
     if args.organization:
         organization_id = args.organization
     else:
         organization_id = client.get_default_organization_id()
 
-    existing_species_names = [
-        species["scientificName"] for species in client.list_species(organization_id)
-    ]
-    new_species_names = [
-        name
-        for name in example_values.TREE_SPECIES
-        if name not in existing_species_names
-    ]
+    if args.file:
+        payloads: Iterable[Dict] = read_species_file(args.file)
+    else:
+        payloads = ({"scientificName": name} for name in example_values.TREE_SPECIES)
 
-    if not new_species_names:
-        raise Exception("No new species names available")
-    if args.number and args.number > len(new_species_names):
-        raise Exception(f"Only {len(new_species_names)} new species names available")
-
-    for scientific_name in new_species_names[: args.number]:
-        client.create_species(
-            {
-                "organizationId": organization_id,
-                "scientificName": scientific_name,
-            }
-        )
+    import_species(
+        client, organization_id, payloads, args.number, args.chunk_size, args.workers
+    )
 
 
 if __name__ == "__main__":
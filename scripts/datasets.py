@@ -0,0 +1,144 @@
+"""
+Reproducible datasets of generated request payloads.
+
+The data generation scripts can draw their random values from a separate random number
+generator for each record, seeded from a dataset-wide seed plus the record's kind and
+position. A record's values then depend only on the seed and its position, not on how many
+other records were generated before it, in what order, or in which process, so a dataset can
+be generated in parallel and regenerated identically later.
+
+Generated datasets are written as a directory of JSON Lines shard files plus a manifest.
+Each line is one record: the payload of a request along with whatever IDs are needed to
+submit it. Benchmarks can generate a large dataset once and replay it many times with
+submit_dataset.py.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import gzip
+import json
+import os
+import random
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional
+
+MANIFEST_FILE = "manifest.json"
+
+# Called with a record's random number generator, the dataset's context, and the record's
+# index. Must be a module-level function so it can be sent to worker processes.
+RecordGenerator = Callable[[random.Random, Dict[str, Any], int], Dict[str, Any]]
+
+
+def record_rng(seed: Optional[int], kind: str, index: Any) -> random.Random:
+    """Return the random number generator for one record.
+
+    Without a seed, every record gets an unpredictable generator.
+    """
+    if seed is None:
+        return random.Random()
+    return random.Random(f"{seed}:{kind}:{index}")
+
+
+def _open(path: str, mode: str, compressed: bool) -> IO[str]:
+    if not compressed:
+        return open(path, mode, encoding="utf-8")
+    if mode == "w":
+        return gzip.open(path, "wt", encoding="utf-8")
+    return gzip.open(path, "rt", encoding="utf-8")
+
+
+def _write_shard(
+    path: str,
+    generator: RecordGenerator,
+    kind: str,
+    seed: int,
+    context: Dict[str, Any],
+    start: int,
+    end: int,
+) -> int:
+    """Generate records [start, end) into a shard file. Runs in a worker process."""
+    temp_path = path + ".tmp"
+    with _open(temp_path, "w", path.endswith(".gz")) as fp:
+        for index in range(start, end):
+            record = generator(record_rng(seed, kind, index), context, index)
+            fp.write(json.dumps({"index": index, **record}, separators=(",", ":")))
+            fp.write("\n")
+    os.replace(temp_path, path)
+    return end - start
+
+
+def generate_dataset(
+    directory: str,
+    kind: str,
+    generator: RecordGenerator,
+    count: int,
+    seed: int,
+    context: Dict[str, Any],
+    shards: int,
+    workers: Optional[int] = None,
+    compress: bool = False,
+    progress: Optional[Callable[[int], None]] = None,
+) -> Dict[str, Any]:
+    """Generate a dataset of count records in parallel and write its manifest.
+
+    Record indexes are split into contiguous ranges, one per shard, so reading the shards in
+    order yields the records in index order. Returns the manifest.
+    """
+    os.makedirs(directory, exist_ok=True)
+    shards = max(1, min(shards, count))
+    suffix = ".jsonl.gz" if compress else ".jsonl"
+    files: List[str] = []
+    generated = 0
+
+    with ProcessPoolExecutor(workers) as executor:
+        futures = []
+        for shard in range(shards):
+            start = count * shard // shards
+            end = count * (shard + 1) // shards
+            file_name = f"{kind}-{shard:05d}{suffix}"
+            files.append(file_name)
+            futures.append(
+                executor.submit(
+                    _write_shard,
+                    os.path.join(directory, file_name),
+                    generator,
+                    kind,
+                    seed,
+                    context,
+                    start,
+                    end,
+                )
+            )
+
+        for future in futures:
+            generated += future.result()
+            if progress:
+                progress(generated)
+
+    manifest = {
+        "kind": kind,
+        "count": count,
+        "seed": seed,
+        "context": context,
+        "files": files,
+    }
+    with open(os.path.join(directory, MANIFEST_FILE), "w") as fp:
+        json.dump(manifest, fp, indent=2)
+
+    return manifest
+
+
+def read_manifest(directory: str) -> Dict[str, Any]:
+    with open(os.path.join(directory, MANIFEST_FILE)) as fp:
+        return json.load(fp)
+
+
+def read_records(
+    directory: str, manifest: Optional[Dict[str, Any]] = None
+) -> Iterator[Dict[str, Any]]:
+    """Yield a dataset's records in index order, one shard file at a time."""
+    manifest = manifest or read_manifest(directory)
+    for file_name in manifest["files"]:
+        with _open(
+            os.path.join(directory, file_name), "r", file_name.endswith(".gz")
+        ) as fp:
+            for line in fp:
+                yield json.loads(line)
@@ -2,7 +2,70 @@
 import argparse
 import json
 import sys
-from client import add_terraware_args, client_from_args
+import threading
+from collections import Counter
+from typing import Dict, Iterator, TextIO
+
+from client import TerrawareClient, add_terraware_args, client_from_args
+from pipeline import Pipeline, Stage
+
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+FAILED = "failed"
+
+
+def read_edits(fp: TextIO) -> Iterator[Dict]:
+    """Yield {accessionId, changes} records from a JSON Lines file one at a time."""
+    for line in fp:
+        if line.strip():
+            yield json.loads(line)
+
+
+def edit_accessions(
+    client: TerrawareClient, records: Iterator[Dict], workers: int, simulate: bool
+) -> int:
+    """Apply the changes in each record to its accession, continuing past failures.
+
+    Accessions whose values wouldn't change aren't updated at all. Returns the number of
+    accessions that failed.
+    """
+    outcomes: Counter = Counter()
+    lock = threading.Lock()
+
+    def edit(record: Dict) -> str:
+        accession_id = record["accessionId"]
+        try:
+            accession = client.get_accession(accession_id)
+            merged = {**accession, **record["changes"]}
+            if merged == accession:
+                outcome = UNCHANGED
+            else:
+                client.update_accession(accession_id, merged, simulate)
+                outcome = UPDATED
+        except Exception as ex:
+            print(f"Accession {accession_id} failed: {ex}", file=sys.stderr)
+            outcome = FAILED
+
+        with lock:
+            outcomes[outcome] += 1
+            done = sum(outcomes.values())
+        if done % 1000 == 0:
+            print(f"Processed {done} accessions")
+
+        return outcome
+
+    pipeline = Pipeline([Stage("accessions", edit, workers)])
+    for _ in pipeline.results(records):
+        pass
+
+    verb = "would have been updated" if simulate else "updated"
+    print(
+        f"{outcomes[UPDATED]} {verb}, {outcomes[UNCHANGED]} unchanged, "
+        + f"{outcomes[FAILED]} failed"
+    )
+    pipeline.report()
+
+    return outcomes[FAILED]
 
 
 def main():
@@ -23,7 +86,21 @@ def main():
         action="store_true",
         help="Show updated accession data after editing.",
     )
-    parser.add_argument("accessionId")
+    parser.add_argument(
+        "--bulk",
+        "-b",
+        metavar="FILE",
+        help="Edit many accessions. FILE is a JSON Lines file, or - for standard input, "
+        + 'with one {"accessionId": ..., "changes": {...}} record per line.',
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=16,
+        help="Number of accessions to edit concurrently with --bulk. Default is 16.",
+    )
+    parser.add_argument("accessionId", nargs="?")
     parser.add_argument(
         "file",
         nargs="?",
@@ -33,6 +110,27 @@ def main():
 
     args = parser.parse_args()
 
+    if args.bulk:
+        if args.accessionId:
+            parser.error("Can't specify an accession ID with --bulk")
+
+        client = client_from_args(args, pool_size=args.workers)
+        if args.bulk == "-":
+            failures = edit_accessions(
+                client, read_edits(sys.stdin), args.workers, args.simulate
+            )
+        else:
+            with open(args.bulk) as fp:
+                failures = edit_accessions(
+                    client, read_edits(fp), args.workers, args.simulate
+                )
+        if failures:
+            sys.exit(f"{failures} edits failed")
+        return
+
+    if not args.accessionId:
+        parser.error("Must specify an accession ID or --bulk")
+
     if args.file:
         with open(args.file) as fp:
             edits = json.load(fp)
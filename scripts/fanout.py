@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Seed data at every facility of many organizations at once, using all the CPUs.
+
+The work is split into shards, one per facility or one per organization, and the shards are
+run on a pool of processes. Each process has its own client with its own connection pool and
+runs its current shard with concurrent worker threads, the same way the single-facility
+scripts do with -w. Progress from all the processes is reported centrally.
+
+    accessions  create -n accessions at each seed bank (create_accessions.py)
+    batches     create -n seedling batches at each nursery (create_batches.py)
+    timeseries  generate --seconds of values for each known device (timeseries.py)
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import create_accessions
+import create_batches
+import timeseries
+from client import TerrawareClient, add_terraware_args, client_from_args
+from pipeline import Pipeline, Stage
+
+# Facility type each kind of data is created at, or None for all facilities.
+FACILITY_TYPES = {
+    "accessions": "Seed Bank",
+    "batches": "Nursery",
+    "timeseries": None,
+}
+
+# Number of records a process creates between progress reports.
+PROGRESS_BATCH = 50
+
+# Set in each worker process by _init_worker.
+_client: Optional[TerrawareClient] = None
+_progress: Optional[multiprocessing.Queue] = None
+
+
+def _init_worker(args: argparse.Namespace, progress: multiprocessing.Queue):
+    global _client, _progress
+    # Processes can't safely share a capture file or a profile.
+    if args.capture:
+        args.capture = f"{args.capture}.{os.getpid()}"
+    args.profile = None
+    _client = client_from_args(args, pool_size=args.workers * 4)
+    _progress = progress
+
+
+def _worker_client() -> TerrawareClient:
+    assert _client is not None, "_init_worker sets the client"
+    return _client
+
+
+def _worker_progress() -> multiprocessing.Queue:
+    assert _progress is not None, "_init_worker sets the progress queue"
+    return _progress
+
+
+def shard_seed(seed: Optional[int], facility_id: int) -> Optional[int]:
+    """Return a seed for one facility so facilities don't all get identical records."""
+    if seed is None:
+        return None
+    return random.Random(f"{seed}:{facility_id}").getrandbits(62)
+
+
+def _count_results(results) -> int:
+    progress = _worker_progress()
+    count = 0
+    for count, _ in enumerate(results, 1):
+        if count % PROGRESS_BATCH == 0:
+            progress.put(PROGRESS_BATCH)
+    progress.put(count % PROGRESS_BATCH)
+    return count
+
+
+def _create_accessions(facility: Dict, species_ids: List[int], args) -> int:
+    pipeline = create_accessions.create_accessions_pipeline(
+        _worker_client(),
+        facility["id"],
+        species_ids,
+        args.workers,
+        shard_seed(args.seed, facility["id"]),
+    )
+    return _count_results(pipeline.results(range(args.number)))
+
+
+def _create_batches(facility: Dict, species_ids: List[int], args) -> int:
+    pipeline = create_batches.create_batches_pipeline(
+        _worker_client(),
+        facility["id"],
+        species_ids,
+        args.workers,
+        shard_seed(args.seed, facility["id"]),
+    )
+    return _count_results(pipeline.results(range(args.number)))
+
+
+def _record_timeseries(facility: Dict, species_ids: List[int], args) -> int:
+    """Generate values for the facility's devices. Returns the number of requests."""
+    client = _worker_client()
+    end_time = int(time.time())
+    start_time = end_time - args.seconds
+
+    def payloads():
+        for device in client.list_devices(facility["id"]):
+            config = timeseries.timeseries_config.get(
+                (device.get("make"), device.get("model"))
+            )
+            if not config:
+                continue
+            timeseries.create_missing_timeseries(
+                client, device["id"], config, False, False
+            )
+            latest_times = timeseries.get_latest_value_times(client, device)
+            yield from timeseries.record_values_payloads(
+                device, config, latest_times, start_time, end_time, args.seed
+            )
+
+    pipeline = Pipeline([Stage("values", client.record_values, args.workers)])
+    return _count_results(pipeline.results(payloads()))
+
+
+CREATORS = {
+    "accessions": _create_accessions,
+    "batches": _create_batches,
+    "timeseries": _record_timeseries,
+}
+
+
+def run_shard(label: str, facilities: List[Dict], args) -> Dict:
+    """Run one shard in a worker process and return a summary of the outcome."""
+    start = time.monotonic()
+    count = 0
+    error = None
+    try:
+        species_ids = []
+        if args.kind != "timeseries":
+            species = _worker_client().list_species(
+                facilities[0]["organizationId"], ["id"]
+            )
+            species_ids = [entry["id"] for entry in species]
+            if not species_ids:
+                raise Exception("Organization has no species")
+        for facility in facilities:
+            count += CREATORS[args.kind](facility, species_ids, args)
+    except Exception as ex:
+        error = f"{type(ex).__name__}: {ex}"
+    return {
+        "count": count,
+        "elapsed": time.monotonic() - start,
+        "error": error,
+        "label": label,
+    }
+
+
+def find_shards(client: TerrawareClient, args) -> Dict[str, List[Dict]]:
+    """Return the facilities to work on, grouped into shards by label."""
+    organization_ids = set(
+        args.organization
+        or [organization["id"] for organization in client.list_organizations()]
+    )
+    facility_type = FACILITY_TYPES[args.kind]
+    shards = defaultdict(list)
+    for facility in client.list_facilities(["id", "organizationId", "type"]):
+        if facility["organizationId"] not in organization_ids:
+            continue
+        if facility_type and facility["type"] != facility_type:
+            continue
+        if args.shard_by == "organization":
+            shards[f"organization {facility['organizationId']}"].append(facility)
+        else:
+            shards[f"facility {facility['id']}"].append(facility)
+    return shards
+
+
+def report_progress(
+    progress: multiprocessing.Queue,
+    totals: Dict[str, int],
+    interval: float,
+    stopping: threading.Event,
+):
+    """Add up progress from the worker processes and print it periodically."""
+    start = time.monotonic()
+    next_report = start + interval
+    while not stopping.is_set() or not progress.empty():
+        try:
+            totals["count"] += progress.get(timeout=0.2)
+        except queue.Empty:
+            pass
+        now = time.monotonic()
+        if interval and now >= next_report and not stopping.is_set():
+            elapsed = now - start
+            print(
+                f"{elapsed:.0f}s: {totals['count']} created "
+                + f"({totals['count'] / elapsed:.1f}/sec), "
+                + f"{totals['shards']} of {totals['total_shards']} shards done"
+            )
+            next_report += interval
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Seed data at every facility of many organizations using a pool of "
+        + "processes."
+    )
+    parser.add_argument("kind", choices=sorted(CREATORS.keys()))
+    parser.add_argument(
+        "--number",
+        "-n",
+        type=int,
+        default=100,
+        help="Number of accessions or batches to create at each facility. Default is 100.",
+    )
+    parser.add_argument(
+        "--seconds",
+        type=int,
+        default=timeseries.DEFAULT_SECONDS,
+        help="Number of seconds of timeseries values to generate, ending now. Default is "
+        + "30 days.",
+    )
+    parser.add_argument(
+        "--organization",
+        "-o",
+        type=int,
+        action="append",
+        help="Only use facilities in this organization. May be specified more than once. "
+        + "Default is every organization the user belongs to.",
+    )
+    parser.add_argument(
+        "--shard-by",
+        choices=["facility", "organization"],
+        default="facility",
+        help="Give each process one facility at a time, or all of one organization's "
+        + "facilities at a time. Default is facility.",
+    )
+    parser.add_argument(
+        "--processes",
+        "-P",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of processes. Default is the number of CPUs.",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=4,
+        help="Number of concurrent requests in each process. Default is 4.",
+    )
+    parser.add_argument(
+        "--progress",
+        type=float,
+        default=10,
+        help="Seconds between progress reports; 0 to disable. Default is 10.",
+    )
+    parser.add_argument(
+        "--seed", type=int, help="Seed for the random number generator."
+    )
+    add_terraware_args(parser, cache=True)
+    args = parser.parse_args()
+
+    client = client_from_args(args)
+    shards = find_shards(client, args)
+    if not shards:
+        raise Exception("No matching facilities found")
+    print(f"Running {len(shards)} shards on {args.processes} processes")
+
+    progress: multiprocessing.Queue = multiprocessing.Queue()
+    totals = {"count": 0, "shards": 0, "total_shards": len(shards)}
+    stopping = threading.Event()
+    reporter = threading.Thread(
+        target=report_progress, args=(progress, totals, args.progress, stopping)
+    )
+    reporter.start()
+
+    start = time.monotonic()
+    failures = []
+    try:
+        with ProcessPoolExecutor(
+            args.processes, initializer=_init_worker, initargs=(args, progress)
+        ) as executor:
+            futures = [
+                executor.submit(run_shard, label, facilities, args)
+                for label, facilities in shards.items()
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                totals["shards"] += 1
+                if result["error"]:
+                    failures.append(result)
+    finally:
+        stopping.set()
+        reporter.join()
+
+    elapsed = time.monotonic() - start
+    unit = "timeseries requests" if args.kind == "timeseries" else args.kind
+    print(
+        f"Created {totals['count']} {unit} in {elapsed:.1f}s "
+        + f"({totals['count'] / elapsed if elapsed > 0 else 0:.1f}/sec) across "
+        + f"{len(shards)} shards"
+    )
+    for result in failures:
+        print(f"{result['label']} failed after {result['count']}: {result['error']}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+import argparse
+from datetime import datetime, timezone
+import random
+import sys
+import time
+from typing import Any, Dict
+
+from client import TerrawareClient, add_terraware_args, client_from_args
+from create_accessions import generate_accession
+from create_batches import generate_batch
+from datasets import generate_dataset, record_rng
+from observe import generate_complete_plot_payload, get_incomplete_plot_ids
+from observe_ad_hoc import (
+    generate_biomass_observation_payload,
+    generate_monitoring_observation_payload,
+)
+
+
+def generate_accession_record(rng: random.Random, context: Dict, index: int) -> Dict:
+    today = datetime.fromtimestamp(context["time"], timezone.utc).date()
+    return {
+        "payload": generate_accession(
+            context["facilityId"], context["speciesIds"], rng, today
+        )
+    }
+
+
+def generate_batch_record(rng: random.Random, context: Dict, index: int) -> Dict:
+    today = datetime.fromtimestamp(context["time"], timezone.utc).date()
+    return {
+        "payload": generate_batch(
+            context["facilityId"], context["speciesIds"], rng, today
+        )
+    }
+
+
+def generate_plot_record(rng: random.Random, context: Dict, index: int) -> Dict:
+    plot_id = context["plotIds"][index]
+    # observe.py seeds each plot by its ID rather than its position in the list.
+    rng = record_rng(context["seed"], "plot", plot_id)
+    return {
+        "observationId": context["observationId"],
+        "plotId": plot_id,
+        "payload": generate_complete_plot_payload(
+            plot_id, context["speciesIds"], rng, context["time"]
+        ),
+    }
+
+
+def generate_ad_hoc_record(rng: random.Random, context: Dict, index: int) -> Dict:
+    if context["type"] == "biomass":
+        payload = generate_biomass_observation_payload(
+            context["plantingSiteId"],
+            context["forestType"],
+            context["speciesIds"],
+            rng,
+            context["time"],
+        )
+    else:
+        payload = generate_monitoring_observation_payload(
+            context["plantingSiteId"], context["speciesIds"], rng, context["time"]
+        )
+    return {"payload": payload}
+
+
+# The kind names match the ones the individual scripts use with --seed, so a dataset
+# generated here contains the same payloads those scripts would submit with the same seed,
+# apart from dates and times, which are relative to the dataset's time.
+GENERATORS = {
+    "accession": generate_accession_record,
+    "adHoc": generate_ad_hoc_record,
+    "batch": generate_batch_record,
+    "plot": generate_plot_record,
+}
+
+
+def find_facility(client: TerrawareClient, facility_type: str) -> int:
+    facilities = [
+        entry["id"]
+        for entry in client.list_facilities(["id", "type"])
+        if entry["type"] == facility_type
+    ]
+    if not facilities:
+        raise Exception(f"No {facility_type} facilities found.")
+    return facilities[0]
+
+
+def species_ids_for(client: TerrawareClient, organization_id: int):
+    species_ids = [
+        species["id"] for species in client.list_species(organization_id, ["id"])
+    ]
+    if not species_ids:
+        raise Exception(f"Organization {organization_id} has no species defined")
+    return species_ids
+
+
+def fetch_context(client: TerrawareClient, args) -> Dict[str, Any]:
+    """Look up the IDs the records will refer to. This is the only use of the server."""
+    if args.kind in ["accession", "batch"]:
+        facility_id = args.facility or find_facility(
+            client, "Seed Bank" if args.kind == "accession" else "Nursery"
+        )
+        organization_id = client.get_facility(facility_id)["organizationId"]
+        return {
+            "facilityId": facility_id,
+            "speciesIds": species_ids_for(client, organization_id),
+        }
+    elif args.kind == "plot":
+        if not args.observation:
+            raise Exception("--observation is required for plot datasets")
+        observation = client.get_observation(args.observation)
+        organization_id = client.get_planting_site(observation["plantingSiteId"])[
+            "organizationId"
+        ]
+        plot_ids = get_incomplete_plot_ids(client, args.observation)
+        if not plot_ids:
+            raise Exception("No incomplete monitoring plots found in observation.")
+        return {
+            "observationId": args.observation,
+            "plotIds": plot_ids,
+            "speciesIds": species_ids_for(client, organization_id),
+        }
+    else:
+        if not args.site:
+            raise Exception("--site is required for adHoc datasets")
+        organization_id = client.get_planting_site(args.site)["organizationId"]
+        return {
+            "forestType": args.forest_type,
+            "plantingSiteId": args.site,
+            "speciesIds": species_ids_for(client, organization_id),
+            "type": args.type,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a reproducible dataset of request payloads in parallel and "
+        + "write it to sharded JSON Lines files that submit_dataset.py can replay. IDs of "
+        + "the facility, species, and so on are fetched from the server once at the start."
+    )
+    parser.add_argument("kind", choices=sorted(GENERATORS.keys()))
+    parser.add_argument(
+        "--output", "-o", required=True, help="Directory to write the dataset to."
+    )
+    parser.add_argument(
+        "--number",
+        "-n",
+        type=int,
+        default=1000,
+        help="Number of records to generate. For plot datasets, the default and maximum "
+        + "is the number of incomplete plots in the observation.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed for the random number generator. Default is 0.",
+    )
+    parser.add_argument(
+        "--time",
+        type=int,
+        help="Unix timestamp that generated dates and times are relative to. Give the "
+        + "value from an earlier dataset's manifest to regenerate it exactly. Default is "
+        + "the current time.",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=16,
+        help="Number of files to write. Default is 16.",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        help="Number of processes to generate records with. Default is the number of CPUs.",
+    )
+    parser.add_argument(
+        "--compress",
+        "-z",
+        action="store_true",
+        help="Write gzip-compressed files.",
+    )
+    parser.add_argument(
+        "--facility", "-f", type=int, help="Facility for accessions or batches."
+    )
+    parser.add_argument(
+        "--observation", type=int, help="Observation for plot datasets."
+    )
+    parser.add_argument(
+        "--site", "-s", type=int, help="Planting site for adHoc datasets."
+    )
+    parser.add_argument(
+        "--forest-type",
+        choices=["Mangrove", "Terrestrial"],
+        default="Terrestrial",
+        help="Forest type for adHoc biomass observations. Default is Terrestrial.",
+    )
+    parser.add_argument(
+        "--type",
+        "-t",
+        choices=["biomass", "monitoring"],
+        default="biomass",
+        help="Type of adHoc observations. Default is biomass.",
+    )
+    add_terraware_args(parser)
+    args = parser.parse_args()
+
+    client = client_from_args(args)
+    context = fetch_context(client, args)
+    context["time"] = args.time or int(time.time())
+    context["seed"] = args.seed
+
+    count = args.number
+    if args.kind == "plot":
+        count = min(count, len(context["plotIds"]))
+
+    start = time.monotonic()
+
+    def progress(generated: int):
+        print(f"\r{generated}/{count} records", end="", file=sys.stderr)
+
+    manifest = generate_dataset(
+        args.output,
+        args.kind,
+        GENERATORS[args.kind],
+        count,
+        args.seed,
+        context,
+        args.shards,
+        args.workers,
+        args.compress,
+        progress,
+    )
+    elapsed = time.monotonic() - start
+
+    print(file=sys.stderr)
+    print(
+        f"Wrote {count} {args.kind} records to {len(manifest['files'])} files in "
+        f"{elapsed:.1f}s ({count / elapsed:.0f}/sec); time "
+        f"{datetime.fromtimestamp(context['time'], timezone.utc).isoformat()}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,13 @@ from datetime import datetime, timezone
 import json
 import random
 import time
-from client import add_terraware_args, client_from_args
+from typing import List, Optional
+
+import requests
+
+from client import TerrawareClient, add_terraware_args, client_from_args
+from datasets import record_rng
+from pipeline import Pipeline, Stage
 
 
 def isoformat(timestamp: int) -> str:
@@ -15,21 +21,21 @@ def isoformat(timestamp: int) -> str:
     )
 
 
-def generate_recorded_plant(species_ids):
-    if random.randint(1, 10) > 1:
+def generate_recorded_plant(species_ids, rng=random):
+    if rng.randint(1, 10) > 1:
         certainty = "Known"
-        species_id = random.choice(species_ids)
+        species_id = rng.choice(species_ids)
         species_name = None
-    elif random.randint(1, 2) == 1:
+    elif rng.randint(1, 2) == 1:
         certainty = "Other"
         species_id = None
-        species_name = f"Other {random.randint(1, 5)}"
+        species_name = f"Other {rng.randint(1, 5)}"
     else:
         certainty = "Unknown"
         species_id = None
         species_name = None
 
-    status = "Live" if random.randint(1, 5) > 1 else random.choice(["Dead", "Existing"])
+    status = "Live" if rng.randint(1, 5) > 1 else rng.choice(["Dead", "Existing"])
 
     return {
         "certainty": certainty,
@@ -40,13 +46,17 @@ def generate_recorded_plant(species_ids):
     }
 
 
-def generate_complete_plot_payload(plot_id, species_ids):
-    num_plants = random.randint(25, 200)
+def generate_complete_plot_payload(
+    plot_id, species_ids, rng=random, now: Optional[int] = None
+):
+    num_plants = rng.randint(25, 200)
     return {
         "conditions": [],
         "notes": f"Notes for plot {plot_id}",
-        "observedTime": isoformat(int(time.time())),
-        "plants": [generate_recorded_plant(species_ids) for _ in range(0, num_plants)],
+        "observedTime": isoformat(now or int(time.time())),
+        "plants": [
+            generate_recorded_plant(species_ids, rng) for _ in range(0, num_plants)
+        ],
     }
 
 
@@ -60,6 +70,50 @@ def get_incomplete_plot_ids(client, observation_id):
     ]
 
 
+def complete_plots(
+    client: TerrawareClient,
+    observation_id: int,
+    plot_ids: List[int],
+    species_ids: List[int],
+    workers: int,
+    seed: Optional[int],
+):
+    """Claim and complete plots concurrently, like a field team syncing a whole site at once.
+
+    A plot that someone else has claimed or completed in the meantime is skipped.
+    """
+
+    def complete_plot(plot_id: int) -> bool:
+        try:
+            client.claim_observation_plot(observation_id, plot_id)
+            payload = generate_complete_plot_payload(
+                plot_id, species_ids, record_rng(seed, "plot", plot_id)
+            )
+            client.complete_observation(observation_id, plot_id, payload)
+        except requests.HTTPError as ex:
+            if ex.response is not None and ex.response.status_code == 409:
+                print(f"Skipping plot {plot_id}: {ex.response.text}")
+                return False
+            raise
+
+        print(f"Completed plot {plot_id}")
+        return True
+
+    def on_error(plot_id: int, ex: Exception):
+        print(f"Plot {plot_id} failed: {ex}")
+
+    pipeline = Pipeline([Stage("plots", complete_plot, workers, on_error)])
+    completed = sum(pipeline.results(plot_ids))
+
+    elapsed = pipeline.elapsed
+    print(
+        f"Completed {completed} plots in {elapsed:.1f}s "
+        + f"({completed / elapsed if elapsed > 0 else 0:.1f} plots/sec), "
+        + f"skipped {len(plot_ids) - completed}"
+    )
+    pipeline.report()
+
+
 def main():
     parser = argparse.ArgumentParser("Complete observations of monitoring plots")
     parser.add_argument(
@@ -85,10 +139,24 @@ def main():
         help="Record results for this many plots. Default is to record results for all "
         + "incomplete plots. Ignored if --plot is specified.",
     )
-    add_terraware_args(parser)
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed for the random number generator. Each plot's results are generated from "
+        + "their own stream derived from the seed and the plot ID. Default is to generate "
+        + "different results each run.",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=8,
+        help="Number of plots to claim and complete concurrently. Default is 8.",
+    )
+    add_terraware_args(parser, cache=True)
     args = parser.parse_args()
 
-    client = client_from_args(args)
+    client = client_from_args(args, pool_size=args.workers)
 
     if args.observation:
         observation_id = args.observation
@@ -99,7 +167,9 @@ def main():
         organization_id = client.get_default_organization_id(require_admin=False)
         incomplete_observations = [
             observation
-            for observation in client.list_observations(organization_id)
+            for observation in client.list_observations(
+                organization_id, ["id", "state"]
+            )
             if observation["state"] in ["InProgress", "Overdue"]
         ]
         if not incomplete_observations:
@@ -121,13 +191,13 @@ def main():
 
     # Use the organization's species list, rather than the list of planted species in each
     # substratum, so we can run this without needing to first create a bunch of nursery withdrawals.
-    species_ids = [species["id"] for species in client.list_species(organization_id)]
+    species_ids = [
+        species["id"] for species in client.list_species(organization_id, ["id"])
+    ]
 
-    for plot_id in plot_ids:
-        client.claim_observation_plot(observation_id, plot_id)
-        print(f"Completing plot {plot_id}")
-        payload = generate_complete_plot_payload(plot_id, species_ids)
-        client.complete_observation(observation_id, plot_id, payload)
+    complete_plots(
+        client, observation_id, plot_ids, species_ids, args.workers, args.seed
+    )
 
 
 if __name__ == "__main__":
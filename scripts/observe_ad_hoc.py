@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
 import argparse
+import os
 import random
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
+from functools import partial
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
 
-from client import add_terraware_args, client_from_args
+from client import TerrawareClient, add_terraware_args, client_from_args
+from datasets import record_rng
+from pipeline import Pipeline, Stage
 
 
 def isoformat(timestamp: int) -> str:
@@ -16,27 +23,38 @@ def isoformat(timestamp: int) -> str:
     )
 
 
-def random_decimal(min_val, max_val, precision=1):
+def format_date(timestamp: Optional[int] = None) -> str:
+    """Format the current time as a local date, or a Unix timestamp as a UTC date.
+
+    Timestamps come from reproducible datasets, which must produce the same dates on every
+    host regardless of its time zone.
+    """
+    if timestamp is None:
+        return datetime.now().strftime("%Y-%m-%d")
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d")
+
+
+def random_decimal(min_val, max_val, precision=1, rng=random):
     """Generate a random decimal with specified precision."""
-    return round(random.uniform(min_val, max_val), precision)
+    return round(rng.uniform(min_val, max_val), precision)
 
 
-def generate_species_entry(species_ids):
+def generate_species_entry(species_ids, rng=random):
     """Generate a random species entry with either ID or name."""
-    if random.randint(1, 10) > 2:  # 80% chance of known species
+    if rng.randint(1, 10) > 2:  # 80% chance of known species
         return {
             "commonName": None,
-            "isInvasive": random.choice([True, False]),
-            "isThreatened": random.choice([True, False]),
+            "isInvasive": rng.choice([True, False]),
+            "isThreatened": rng.choice([True, False]),
             "scientificName": None,
-            "speciesId": random.choice(species_ids),
+            "speciesId": rng.choice(species_ids),
         }
     else:
         return {
             "commonName": None,
-            "isInvasive": random.choice([True, False]),
-            "isThreatened": random.choice([True, False]),
-            "scientificName": f"Unknown Species {random.randint(1, 10)}",
+            "isInvasive": rng.choice([True, False]),
+            "isThreatened": rng.choice([True, False]),
+            "scientificName": f"Unknown Species {rng.randint(1, 10)}",
             "speciesId": None,
         }
 
@@ -49,16 +67,16 @@ def get_species_refs(species_entry):
         return {"speciesId": None, "speciesName": species_entry["scientificName"]}
 
 
-def generate_unique_species_list(species_ids, num_species=None):
+def generate_unique_species_list(species_ids, num_species=None, rng=random):
     """Generate a unique list of random species entries."""
     if num_species is None:
-        num_species = random.randint(5, 15)
+        num_species = rng.randint(5, 15)
 
     unique_species_keys = set()
     master_species_list = []
 
     while len(master_species_list) < num_species:
-        species_entry = generate_species_entry(species_ids)
+        species_entry = generate_species_entry(species_ids, rng)
         key = (
             species_entry["speciesId"]
             if species_entry["speciesId"] is not None
@@ -72,7 +90,7 @@ def generate_unique_species_list(species_ids, num_species=None):
     return master_species_list
 
 
-def generate_quadrats(master_species_list):
+def generate_quadrats(master_species_list, rng=random):
     """Generate random quadrats with species from the master list."""
     quadrats = []
     positions = [
@@ -83,15 +101,15 @@ def generate_quadrats(master_species_list):
     ]
 
     for position in positions:
-        if random.random() < 0.9:  # 90% chance of including each position
+        if rng.random() < 0.9:  # 90% chance of including each position
             # Select a random subset of species for this quadrat
             max_species = min(5, len(master_species_list))
-            num_quadrat_species = random.randint(1, max_species)
-            selected_species = random.sample(master_species_list, num_quadrat_species)
+            num_quadrat_species = rng.randint(1, max_species)
+            selected_species = rng.sample(master_species_list, num_quadrat_species)
 
             # Create species entries for the quadrat
             quadrat_species = [
-                {"abundancePercent": random.randint(5, 95), **get_species_refs(species)}
+                {"abundancePercent": rng.randint(5, 95), **get_species_refs(species)}
                 for species in selected_species
             ]
 
@@ -106,35 +124,35 @@ def generate_quadrats(master_species_list):
     return quadrats
 
 
-def generate_trees(master_species_list, num_trees=None):
+def generate_trees(master_species_list, num_trees=None, rng=random):
     """Generate random trees using species from the master list."""
     if num_trees is None:
-        num_trees = random.randint(3, 15)
+        num_trees = rng.randint(3, 15)
 
     trees = []
     for _ in range(num_trees):
-        species = random.choice(master_species_list)
+        species = rng.choice(master_species_list)
         species_refs = get_species_refs(species)
 
-        if random.choice(["shrub", "tree"]) == "shrub":
+        if rng.choice(["shrub", "tree"]) == "shrub":
             trees.append(
                 {
                     "growthForm": "shrub",
-                    "description": f"Shrub {random.randint(1, 100)}",
-                    "isDead": random.choices([True, False], weights=[1, 9])[0],
-                    "shrubDiameter": random.randint(5, 50),
+                    "description": f"Shrub {rng.randint(1, 100)}",
+                    "isDead": rng.choices([True, False], weights=[1, 9])[0],
+                    "shrubDiameter": rng.randint(5, 50),
                     **species_refs,
                 }
             )
         else:
-            num_trunks = random.choices([1, random.randint(2, 5)], weights=[8, 2])[0]
+            num_trunks = rng.choices([1, rng.randint(2, 5)], weights=[8, 2])[0]
             trunks = [
                 {
-                    "diameterAtBreastHeight": random_decimal(5, 100),
-                    "height": random_decimal(1, 20),
-                    "pointOfMeasurement": random_decimal(1.3, 1.5),
+                    "diameterAtBreastHeight": random_decimal(5, 100, rng=rng),
+                    "height": random_decimal(1, 20, rng=rng),
+                    "pointOfMeasurement": random_decimal(1.3, 1.5, rng=rng),
                     "description": f"Trunk {i+1}",
-                    "isDead": random.choices([True, False], weights=[1, 9])[0],
+                    "isDead": rng.choices([True, False], weights=[1, 9])[0],
                 }
                 for i in range(num_trunks)
             ]
@@ -145,16 +163,22 @@ def generate_trees(master_species_list, num_trees=None):
 
 
 def generate_biomass_measurements(
-    forest_type, master_species_list, quadrats, trees, observed_time=None
+    forest_type,
+    master_species_list,
+    quadrats,
+    trees,
+    observed_time=None,
+    rng=random,
+    now: Optional[int] = None,
 ):
     """Generate the biomass measurements part of the payload."""
     measurements = {
-        "description": f"Observation {datetime.now().strftime('%Y-%m-%d')}",
+        "description": f"Observation {format_date(now)}",
         "forestType": forest_type,
-        "herbaceousCoverPercent": random.randint(10, 90),
-        "smallTreeCountLow": random.randint(5, 20),
-        "smallTreeCountHigh": random.randint(25, 50),
-        "soilAssessment": random.choice(
+        "herbaceousCoverPercent": rng.randint(10, 90),
+        "smallTreeCountLow": rng.randint(5, 20),
+        "smallTreeCountHigh": rng.randint(25, 50),
+        "soilAssessment": rng.choice(
             [
                 "Healthy with good moisture",
                 "Dry and compacted",
@@ -172,18 +196,18 @@ def generate_biomass_measurements(
     if forest_type == "Mangrove" and observed_time is not None:
         measurements.update(
             {
-                "ph": random_decimal(6.0, 8.5),
-                "salinity": random_decimal(15, 35),
-                "tide": random.choice(["High", "Low"]),
+                "ph": random_decimal(6.0, 8.5, rng=rng),
+                "salinity": random_decimal(15, 35, rng=rng),
+                "tide": rng.choice(["High", "Low"]),
                 "tideTime": observed_time,
-                "waterDepth": random.randint(10, 100),
+                "waterDepth": rng.randint(10, 100),
             }
         )
 
     return measurements
 
 
-def generate_conditions():
+def generate_conditions(rng=random):
     # Observable conditions from the enum
     observable_conditions = [
         "AnimalDamage",
@@ -195,54 +219,62 @@ def generate_conditions():
         "UnfavorableWeather",
     ]
 
-    return random.sample(observable_conditions, k=random.randint(1, 3))
+    return rng.sample(observable_conditions, k=rng.randint(1, 3))
 
 
-def generate_biomass_observation_payload(planting_site_id, forest_type, species_ids):
+def generate_biomass_observation_payload(
+    planting_site_id, forest_type, species_ids, rng=random, now: Optional[int] = None
+):
     """Generate a random biomass observation payload."""
     # Create timestamp for the observation
-    current_time = int(time.time())
-    observed_time = isoformat(current_time - random.randint(0, 86400))
+    current_time = now or int(time.time())
+    observed_time = isoformat(current_time - rng.randint(0, 86400))
 
     # Generate components of the observation
-    master_species_list = generate_unique_species_list(species_ids)
-    quadrats = generate_quadrats(master_species_list)
-    trees = generate_trees(master_species_list)
+    master_species_list = generate_unique_species_list(species_ids, rng=rng)
+    quadrats = generate_quadrats(master_species_list, rng)
+    trees = generate_trees(master_species_list, rng=rng)
 
     # Create the payload
     payload = {
         "biomassMeasurements": generate_biomass_measurements(
-            forest_type, master_species_list, quadrats, trees, observed_time
+            forest_type,
+            master_species_list,
+            quadrats,
+            trees,
+            observed_time,
+            rng,
+            current_time,
         ),
         "observationType": "Biomass Measurements",
         "plantingSiteId": planting_site_id,
         "observedTime": observed_time,
         "swCorner": {
             "type": "Point",
-            "coordinates": [random.uniform(-180, 180), random.uniform(-90, 90)],
+            "coordinates": [rng.uniform(-180, 180), rng.uniform(-90, 90)],
         },
-        "conditions": generate_conditions(),
-        "notes": f"Biomass observation on {datetime.now().strftime('%Y-%m-%d')}",
+        "conditions": generate_conditions(rng),
+        "notes": f"Biomass observation on {format_date(current_time)}",
     }
 
     return payload
 
 
-def generate_recorded_plant(species_ids):
-    if random.randint(1, 10) > 1:
+def generate_recorded_plant(species_ids, rng=random):
+    if rng.randint(1, 10) > 1:
         certainty = "Known"
-        species_id = random.choice(species_ids)
+        species_id = rng.choice(species_ids)
         species_name = None
-    elif random.randint(1, 2) == 1:
+    elif rng.randint(1, 2) == 1:
         certainty = "Other"
         species_id = None
-        species_name = f"Other {random.randint(1, 5)}"
+        species_name = f"Other {rng.randint(1, 5)}"
     else:
         certainty = "Unknown"
         species_id = None
         species_name = None
 
-    status = "Live" if random.randint(1, 5) > 1 else random.choice(["Dead", "Existing"])
+    status = "Live" if rng.randint(1, 5) > 1 else rng.choice(["Dead", "Existing"])
 
     return {
         "certainty": certainty,
@@ -253,26 +285,97 @@ def generate_recorded_plant(species_ids):
     }
 
 
-def generate_monitoring_observation_payload(planting_site_id, species_ids):
-    num_plants = random.randint(25, 200)
-    observed_time = isoformat(int(time.time()) - random.randint(0, 86400))
+def generate_monitoring_observation_payload(
+    planting_site_id, species_ids, rng=random, now: Optional[int] = None
+):
+    num_plants = rng.randint(25, 200)
+    current_time = now or int(time.time())
+    observed_time = isoformat(current_time - rng.randint(0, 86400))
 
     payload = {
-        "plants": [generate_recorded_plant(species_ids) for _ in range(0, num_plants)],
+        "plants": [
+            generate_recorded_plant(species_ids, rng) for _ in range(0, num_plants)
+        ],
         "observationType": "Monitoring",
         "plantingSiteId": planting_site_id,
         "observedTime": observed_time,
         "swCorner": {
             "type": "Point",
-            "coordinates": [random.uniform(-180, 180), random.uniform(-90, 90)],
+            "coordinates": [rng.uniform(-180, 180), rng.uniform(-90, 90)],
         },
-        "conditions": generate_conditions(),
-        "notes": f"Monitoring observation on {datetime.now().strftime('%Y-%m-%d')}",
+        "conditions": generate_conditions(rng),
+        "notes": f"Monitoring observation on {format_date(current_time)}",
     }
 
     return payload
 
 
+def generate_payload(
+    index: int,
+    planting_site_ids: List[int],
+    observation_type: str,
+    forest_type: str,
+    species_ids: List[int],
+    seed: Optional[int],
+    now: int,
+) -> Dict:
+    """Generate the payload of one of a series of observations spread across sites."""
+    planting_site_id = planting_site_ids[index % len(planting_site_ids)]
+    rng = record_rng(seed, "adHoc", index)
+    if observation_type == "biomass":
+        return generate_biomass_observation_payload(
+            planting_site_id, forest_type, species_ids, rng, now
+        )
+    else:
+        return generate_monitoring_observation_payload(
+            planting_site_id, species_ids, rng, now
+        )
+
+
+def generate_payloads(
+    count: int, processes: int, chunk_size: int = 1000, **kwargs
+) -> Iterator[Dict]:
+    """Generate payloads on a process pool, in index order.
+
+    Payloads are generated a chunk at a time so memory use stays bounded when they are
+    generated faster than they can be submitted.
+    """
+    generate = partial(generate_payload, **kwargs)
+    indexes = iter(range(count))
+    with ProcessPoolExecutor(processes) as executor:
+        while True:
+            chunk = list(islice(indexes, chunk_size))
+            if not chunk:
+                return
+            yield from executor.map(
+                generate, chunk, chunksize=max(1, len(chunk) // (processes * 4))
+            )
+
+
+def create_observations(
+    client: TerrawareClient,
+    count: int,
+    workers: int,
+    processes: int,
+    **kwargs,
+):
+    """Create a batch of ad-hoc observations concurrently and report their latencies."""
+
+    def on_error(payload: Dict, ex: Exception):
+        print(f"Observation at site {payload['plantingSiteId']} failed: {ex}")
+
+    pipeline = Pipeline(
+        [Stage("adHoc", client.complete_ad_hoc_observation, workers, on_error)]
+    )
+    for done, _ in enumerate(
+        pipeline.results(generate_payloads(count, processes, **kwargs)), 1
+    ):
+        if done % 100 == 0:
+            print(f"Created {done} of {count} observations")
+
+    pipeline.report()
+
+
 def main():
     parser = argparse.ArgumentParser("Complete ad-hoc observations")
     parser.add_argument(
@@ -301,39 +404,90 @@ def main():
         default="biomass",
         help="The type of ad-hoc observation to create. Default is biomass.",
     )
-    add_terraware_args(parser)
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed for the random number generator. The same seed generates the same "
+        + "observation, other than its timestamps. Default is to generate a different "
+        + "observation each run.",
+    )
+    parser.add_argument(
+        "--count",
+        "-n",
+        type=int,
+        help="Create this many observations, spread across all the organization's planting "
+        + "sites, or only the one given with --site. Default is to create one observation.",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=8,
+        help="Number of concurrent requests when using --count. Default is 8.",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of processes to generate observations with when using --count. "
+        + "Default is the number of CPUs.",
+    )
+    add_terraware_args(parser, cache=True)
     args = parser.parse_args()
 
-    client = client_from_args(args)
+    client = client_from_args(args, pool_size=args.workers)
 
     if args.site:
-        planting_site_id = args.site
+        planting_site_ids = [args.site]
     else:
         organization_id = args.organization or client.get_default_organization_id(
             require_admin=False
         )
-        sites = client.get(
-            "/api/v1/tracking/sites?organizationId=" + str(organization_id)
-        )["sites"]
+        sites = client.list_planting_sites(organization_id)
         if not sites:
             raise Exception(f"Organization {organization_id} has no planting sites")
-        planting_site_id = sites[0]["id"]
-        print(f"Using planting site {planting_site_id}")
+        if args.count:
+            planting_site_ids = [site["id"] for site in sites]
+            print(f"Using {len(sites)} planting sites")
+        else:
+            planting_site_ids = [sites[0]["id"]]
+            print(f"Using planting site {planting_site_ids[0]}")
+    planting_site_id = planting_site_ids[0]
 
     # Get the organization's species list to use for species selection
     organization_id = client.get_planting_site(planting_site_id)["organizationId"]
-    species_ids = [species["id"] for species in client.list_species(organization_id)]
+    species_ids = [
+        species["id"] for species in client.list_species(organization_id, ["id"])
+    ]
 
     if not species_ids:
         raise Exception(f"Organization {organization_id} has no species defined")
 
+    if args.count:
+        create_observations(
+            client,
+            args.count,
+            args.workers,
+            args.processes,
+            planting_site_ids=planting_site_ids,
+            observation_type=args.type,
+            forest_type=args.forest_type,
+            species_ids=species_ids,
+            seed=args.seed,
+            now=int(time.time()),
+        )
+        return
+
     # Generate and complete the observation
+    rng = record_rng(args.seed, "adHoc", 0)
     if args.type == "biomass":
         payload = generate_biomass_observation_payload(
-            planting_site_id, args.forest_type, species_ids
+            planting_site_id, args.forest_type, species_ids, rng
         )
     else:
-        payload = generate_monitoring_observation_payload(planting_site_id, species_ids)
+        payload = generate_monitoring_observation_payload(
+            planting_site_id, species_ids, rng
+        )
     result = client.complete_ad_hoc_observation(payload)
 
     print(
@@ -0,0 +1,208 @@
+"""
+Helpers for driving many concurrent requests at a server.
+
+A Pipeline runs a sequence of stages, each with its own pool of worker threads and its own
+bounded input queue, so many items can be at different stages at once. This suits workflows
+like accession creation, where each record needs several dependent requests: while one
+accession is being checked in, others are being created and others are getting viability
+tests.
+"""
+
+import queue
+import sys
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+# Marks the end of a stage's input.
+_END = object()
+
+
+class LatencyStats:
+    """Thread-safe collection of operation durations and outcomes."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.errors = 0
+        self._latencies: List[float] = []
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, error: bool = False):
+        with self._lock:
+            self._latencies.append(seconds)
+            if error:
+                self.errors += 1
+
+    @property
+    def count(self) -> int:
+        return len(self._latencies)
+
+    def percentile(self, percent: float) -> float:
+        with self._lock:
+            if not self._latencies:
+                return 0.0
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index]
+
+    def summary(self, elapsed: float) -> str:
+        rate = self.count / elapsed if elapsed > 0 else 0
+        return (
+            f"{self.name}: {self.count} in {elapsed:.1f}s ({rate:.1f}/sec), "
+            f"p50 {self.percentile(50) * 1000:.0f}ms, "
+            f"p95 {self.percentile(95) * 1000:.0f}ms, "
+            f"p99 {self.percentile(99) * 1000:.0f}ms, "
+            f"{self.errors} errors"
+        )
+
+
+class Stage:
+    """One step of a pipeline.
+
+    func is called with each item from the previous stage and returns the item to pass to the
+    next stage, or None to drop it. on_error, if set, is called with the item and exception
+    before the pipeline stops; use it to log the payload that failed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        workers: int = 1,
+        on_error: Optional[Callable[[Any, Exception], None]] = None,
+    ):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.on_error = on_error
+        self.stats = LatencyStats(name)
+
+
+class Pipeline:
+    """Runs items through a list of stages concurrently.
+
+    The first exception stops the pipeline: no new items are started, items already in flight
+    are abandoned, and the exception is re-raised from results().
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: Optional[int] = None):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.error: Optional[Tuple[Stage, Exception]] = None
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._stopping = threading.Event()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds the pipeline has been running, or ran for if it has finished."""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def results(self, items: Iterable) -> Iterator:
+        """Feed items into the pipeline and yield the outputs of the last stage."""
+        self.started = time.monotonic()
+        queues: List[queue.Queue] = [
+            queue.Queue(self.queue_size or stage.workers * 4) for stage in self.stages
+        ]
+        output: queue.Queue = queue.Queue()
+        queues.append(output)
+
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0]))]
+        for index, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            next_workers = (
+                self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+            )
+            for _ in range(stage.workers):
+                threads.append(
+                    threading.Thread(
+                        target=self._work,
+                        args=(
+                            stage,
+                            queues[index],
+                            queues[index + 1],
+                            remaining,
+                            lock,
+                            next_workers,
+                        ),
+                        daemon=True,
+                    )
+                )
+
+        for thread in threads:
+            thread.start()
+
+        while True:
+            item = output.get()
+            if item is _END:
+                break
+            yield item
+
+        for thread in threads:
+            thread.join()
+        self.finished = time.monotonic()
+
+        if self.error:
+            raise self.error[1]
+
+    def _feed(self, items: Iterable, first_queue: queue.Queue):
+        try:
+            for item in items:
+                if self._stopping.is_set():
+                    break
+                first_queue.put(item)
+        except Exception as ex:
+            self._fail(self.stages[0], ex)
+        finally:
+            for _ in range(self.stages[0].workers):
+                first_queue.put(_END)
+
+    def _work(
+        self,
+        stage: Stage,
+        input_queue: queue.Queue,
+        output_queue: queue.Queue,
+        remaining: List[int],
+        lock: threading.Lock,
+        next_workers: int,
+    ):
+        while True:
+            item = input_queue.get()
+            if item is _END:
+                break
+            if self._stopping.is_set():
+                continue
+
+            start = time.monotonic()
+            try:
+                result = stage.func(item)
+                stage.stats.record(time.monotonic() - start)
+            except Exception as ex:
+                stage.stats.record(time.monotonic() - start, error=True)
+                if stage.on_error:
+                    stage.on_error(item, ex)
+                self._fail(stage, ex)
+                continue
+
+            if result is not None:
+                output_queue.put(result)
+
+        # The last worker to finish tells the next stage that there's no more input.
+        with lock:
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                for _ in range(next_workers):
+                    output_queue.put(_END)
+
+    def _fail(self, stage: Stage, ex: Exception):
+        if not self.error:
+            self.error = (stage, ex)
+        self._stopping.set()
+
+    def report(self, file=sys.stdout):
+        """Print throughput and latency for each stage."""
+        for stage in self.stages:
+            print(stage.stats.summary(self.elapsed), file=file)
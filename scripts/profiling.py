@@ -0,0 +1,170 @@
+"""
+Profile a script run to see whether it's limited by the client or by the server.
+
+Profiling starts when the client is created and stops when the script exits. It writes two
+files:
+
+    PREFIX.prof       cProfile statistics for every thread, merged; view them with
+                      `python -m pstats PREFIX.prof` or a viewer such as snakeviz
+    PREFIX.collapsed  stacks sampled every few milliseconds from every thread, one
+                      "frame;frame;frame count" line per distinct stack, for flamegraph.pl
+                      or speedscope
+
+and prints a summary that splits the wall time into CPU time spent in this process, which
+includes generating payloads and encoding and decoding JSON, and time spent waiting for
+responses from the server. cProfile makes Python code run noticeably slower, so the CPU
+time it reports is higher than it would be in a normal run.
+
+Only the script's own process is profiled, not worker processes such as the ones
+observe_ad_hoc.py uses to generate payloads.
+"""
+
+import atexit
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import List, Optional
+
+# Seconds between stack samples.
+SAMPLE_INTERVAL = 0.005
+
+
+class _StackSampler(threading.Thread):
+    """Periodically records the stacks of all the other threads."""
+
+    def __init__(self):
+        super().__init__(name="profiling-sampler", daemon=True)
+        self.counts: Counter = Counter()
+        self.stopping = threading.Event()
+
+    def run(self):
+        own_ident = threading.get_ident()
+        while not self.stopping.wait(SAMPLE_INTERVAL):
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame:
+                    code = frame.f_code
+                    filename = os.path.basename(code.co_filename)
+                    stack.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.counts[";".join(reversed(stack))] += 1
+
+
+class Profiler:
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.profiles: List[cProfile.Profile] = []
+        self.lock = threading.Lock()
+        self.sampler = _StackSampler()
+        self.request_count = 0
+        self.request_seconds = 0.0
+        self.started_wall = 0.0
+        self.started_cpu = 0.0
+
+    def start(self):
+        self.started_wall = time.monotonic()
+        self.started_cpu = time.process_time()
+        self.sampler.start()
+        threading.setprofile(self._start_thread_profile)
+        self._start_thread_profile()
+
+    def _start_thread_profile(self, *args):
+        """Profile the current thread. Runs as the profile hook of each new thread."""
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12 and up only allow one active cProfile at a time, but it sees all
+            # the threads, so the first thread's profile is enough.
+            return
+        with self.lock:
+            self.profiles.append(profile)
+
+    def record_request(self, seconds: float):
+        """Record the time a thread spent waiting for an HTTP request to finish."""
+        with self.lock:
+            self.request_count += 1
+            self.request_seconds += seconds
+
+    def stop(self):
+        wall = time.monotonic() - self.started_wall
+        cpu = time.process_time() - self.started_cpu
+
+        threading.setprofile(None)
+        self.sampler.stopping.set()
+        self.sampler.join()
+
+        with self.lock:
+            profiles = list(self.profiles)
+        for profile in profiles:
+            profile.disable()
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(self.prefix + ".prof")
+
+        with open(self.prefix + ".collapsed", "w") as fp:
+            for stack, count in self.sampler.counts.most_common():
+                fp.write(f"{stack} {count}\n")
+
+        self.report(wall, cpu, stats)
+
+    def report(self, wall: float, cpu: float, stats: pstats.Stats):
+        encode = _cumulative_time(stats, "json/encoder.py", "encode")
+        decode = _cumulative_time(stats, "json/decoder.py", "decode")
+        in_flight = self.request_seconds / wall if wall > 0 else 0.0
+        cpu_percent = cpu * 100 / wall if wall > 0 else 0.0
+
+        print(f"Wall time: {wall:.2f}s", file=sys.stderr)
+        print(
+            f"Client CPU: {cpu:.2f}s ({cpu_percent:.0f}% of wall time), including "
+            + f"JSON encoding {encode:.2f}s and decoding {decode:.2f}s",
+            file=sys.stderr,
+        )
+        print(
+            f"Waiting for server: {self.request_seconds:.2f}s in {self.request_count} "
+            + f"requests ({in_flight:.1f} in flight on average)",
+            file=sys.stderr,
+        )
+        # Python code runs on one CPU at a time, so a process that's using most of a CPU
+        # can't go any faster by adding threads.
+        if cpu_percent >= 80:
+            print("Mostly limited by client CPU", file=sys.stderr)
+        elif in_flight >= 0.8:
+            print("Mostly limited by the server", file=sys.stderr)
+        print(
+            f"Wrote {self.prefix}.prof and {self.prefix}.collapsed",
+            file=sys.stderr,
+        )
+
+
+def _cumulative_time(stats: pstats.Stats, file_suffix: str, function: str) -> float:
+    """Return the cumulative time spent in a function, counting recursive calls once."""
+    # get_stats_profile() would be the typed way to read this, but it keys functions by name
+    # alone and rounds the times, so read the raw table that typeshed doesn't declare.
+    raw_stats = stats.stats  # type: ignore[attr-defined]
+    return sum(
+        cumulative
+        for (filename, _, name), (_, _, _, cumulative, _) in raw_stats.items()
+        if name == function and filename.endswith(file_suffix)
+    )
+
+
+_active: Optional[Profiler] = None
+
+
+def start_profiling(prefix: str) -> Profiler:
+    """Start profiling the process, if it isn't already, and stop when the process exits."""
+    global _active
+    if not _active:
+        _active = Profiler(prefix)
+        _active.start()
+        atexit.register(_active.stop)
+    return _active
@@ -0,0 +1,124 @@
+"""
+On-disk cache of reference data such as facility and species lists.
+
+The data generation scripts look up facilities, species, and organizations on every run just
+to pick IDs. When a pipeline runs the scripts over and over, those round trips can take as
+long as the work itself. The cache keeps each response in its own JSON file under a
+directory per server and user, so entries are never shared between users who might see
+different data. The organization is part of the cache key via the request URL.
+
+The server sends ETags for these endpoints, so an entry is revalidated with If-None-Match
+before it's used, and is only downloaded again if it has changed. With a TTL, entries younger
+than the TTL are used without revalidating them, which saves the round trip but can return
+out-of-date data.
+
+Writes go to a temporary file that is renamed into place, so concurrent processes never see
+a partial entry; if two of them refresh the same entry at once, the last one wins.
+
+Responses to the same URL with different `fields` parameters are cached separately, but
+invalidating a URL invalidates all of them.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import jwt
+
+# Suggested number of seconds to use entries without revalidating them.
+DEFAULT_TTL = 600
+
+
+def default_cache_dir() -> str:
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "terraware-scripts")
+
+
+def user_identity(refresh_token: Optional[str], session: Optional[str]) -> str:
+    """Return a string that identifies the user whose credentials these are.
+
+    For refresh tokens, this is the token's subject, so the cache survives getting a new
+    token. Session cookies aren't decodable, so the cache only lasts as long as the session.
+    """
+    if refresh_token:
+        try:
+            claims = jwt.decode(refresh_token, options={"verify_signature": False})
+            if "sub" in claims:
+                return "sub:" + claims["sub"]
+        except jwt.InvalidTokenError:
+            pass
+        return "token:" + hashlib.sha256(refresh_token.encode()).hexdigest()
+    return "session:" + hashlib.sha256((session or "").encode()).hexdigest()
+
+
+def _split_fields(url: str) -> Tuple[str, str]:
+    """Split a URL into the URL without its fields parameters and the fields it asks for."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    fields = ",".join(value for name, value in query if name == "fields")
+    others = urlencode([(name, value) for name, value in query if name != "fields"])
+    return urlunsplit(parts._replace(query=others)), fields
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()[:32]
+
+
+class CacheEntry:
+    def __init__(self, value: Any, stored_at: float, etag: Optional[str]):
+        self.value = value
+        self.stored_at = stored_at
+        self.etag = etag
+
+
+class ReferenceCache:
+    def __init__(
+        self, directory: str, base_url: str, user: str, ttl: float = DEFAULT_TTL
+    ):
+        scope = hashlib.sha256(f"{base_url}\n{user}".encode()).hexdigest()[:16]
+        self.directory = os.path.join(directory, scope)
+        self.ttl = ttl
+
+    def _path(self, url: str) -> str:
+        base_url, fields = _split_fields(url)
+        name = _digest(base_url)
+        if fields:
+            name += "-" + _digest(fields)[:8]
+        return os.path.join(self.directory, name + ".json")
+
+    def load(self, url: str) -> Optional[CacheEntry]:
+        try:
+            with open(self._path(url)) as fp:
+                data = json.load(fp)
+            return CacheEntry(data["value"], data["storedAt"], data.get("etag"))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return time.time() - entry.stored_at < self.ttl
+
+    def store(self, url: str, value: Any, etag: Optional[str] = None):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(url)
+        temp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(temp_path, "w") as fp:
+            json.dump(
+                {"url": url, "storedAt": time.time(), "etag": etag, "value": value}, fp
+            )
+        os.replace(temp_path, path)
+
+    def invalidate(self, url: str):
+        base_url, _ = _split_fields(url)
+        pattern = os.path.join(self.directory, _digest(base_url) + "*.json")
+        for path in glob.glob(pattern):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from capture import (
+    IdMap,
+    ReplayError,
+    created_ids,
+    read_capture,
+    route_template,
+    url_id_kind,
+)
+from client import TerrawareClient, add_terraware_args, client_from_args
+from pipeline import LatencyStats
+
+
+class Replayer:
+    """Re-issues captured requests, preserving their relative timing at a given speed.
+
+    Requests are started in capture order. A request that refers to an object created by an
+    earlier request waits for that request to finish, which is never long since the earlier
+    request was started first.
+    """
+
+    def __init__(
+        self,
+        client: TerrawareClient,
+        paths: List[str],
+        speed: Optional[float],
+        workers: int,
+        max_gap: float,
+    ):
+        self.client = client
+        self.paths = paths
+        self.speed = speed
+        self.workers = workers
+        self.max_gap = max_gap
+
+        self.stats: Dict[str, LatencyStats] = {}
+        self.captured_stats: Dict[str, LatencyStats] = {}
+        self.status_mismatches: Counter = Counter()
+        self.dependency_failures = 0
+        self.skipped = 0
+        self.lock = threading.Lock()
+        self.elapsed = 0.0
+
+        expected = set()
+        for entry in read_capture(paths):
+            for kind, old in entry.get("c", []):
+                expected.add((kind, str(old)))
+        self.ids = IdMap(expected)
+
+    def run(self):
+        slots = threading.BoundedSemaphore(self.workers * 2)
+        start = time.monotonic()
+        offset = 0.0
+        previous_time: Optional[float] = None
+
+        with ThreadPoolExecutor(self.workers) as executor:
+            for entry in read_capture(self.paths):
+                if "x" in entry:
+                    self.skipped += 1
+                    continue
+
+                # Idle time between captured script runs is compressed to max_gap.
+                if previous_time is not None:
+                    offset += min(max(0.0, entry["t"] - previous_time), self.max_gap)
+                previous_time = entry["t"]
+
+                if self.speed:
+                    delay = start + offset / self.speed - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+
+                slots.acquire()
+                executor.submit(self._send, entry).add_done_callback(
+                    lambda _: slots.release()
+                )
+
+        self.elapsed = time.monotonic() - start
+
+    def _send(self, entry: Dict[str, Any]):
+        route = f"{entry['m']} {route_template(entry['u'])}"
+        created = entry.get("c", [])
+
+        try:
+            url = self.ids.rewrite_url(entry["u"])
+            body = self.ids.rewrite_body(entry.get("b"), url_id_kind(entry["u"]))
+        except ReplayError:
+            with self.lock:
+                self.dependency_failures += 1
+            for kind, old in created:
+                self.ids.fail(kind, old)
+            return
+
+        start = time.monotonic()
+        try:
+            response = self.client.request_raw(
+                entry["m"], url, json=body, headers=entry.get("h", {})
+            )
+        except requests.exceptions.HTTPError as ex:
+            response = ex.response
+        except requests.exceptions.ConnectionError:
+            response = None
+        elapsed = time.monotonic() - start
+
+        status = response.status_code if response is not None else None
+        new_ids = []
+        if created and response is not None and response.ok:
+            new_ids = created_ids(url, response.json())
+
+        # Match the new IDs to the captured ones by kind, in the order they appear.
+        for kind, old in created:
+            new = next((value for k, value in new_ids if k == kind), None)
+            if new is None:
+                self.ids.fail(kind, old)
+            else:
+                new_ids.remove((kind, new))
+                self.ids.add(kind, old, new)
+
+        with self.lock:
+            if route not in self.stats:
+                self.stats[route] = LatencyStats(route)
+                self.captured_stats[route] = LatencyStats(route)
+            if status != entry["s"]:
+                self.status_mismatches[(route, entry["s"], status)] += 1
+        self.stats[route].record(elapsed, error=status is None or status >= 400)
+        self.captured_stats[route].record(entry["d"] / 1000, error=entry["s"] >= 400)
+
+    def report(self):
+        total = sum(stats.count for stats in self.stats.values())
+        print(
+            f"Replayed {total} requests in {self.elapsed:.1f}s "
+            f"({total / self.elapsed if self.elapsed else 0:.1f}/sec)"
+        )
+        for route, stats in sorted(self.stats.items(), key=lambda item: -item[1].count):
+            captured = self.captured_stats[route]
+            print(stats.summary(self.elapsed))
+            print(
+                f"  captured p50 {captured.percentile(50) * 1000:.0f}ms, "
+                f"p95 {captured.percentile(95) * 1000:.0f}ms, "
+                f"{captured.errors} errors"
+            )
+        for (route, captured, replayed), count in self.status_mismatches.items():
+            print(f"{route}: {count} returned {replayed} instead of {captured}")
+        if self.dependency_failures:
+            print(
+                f"{self.dependency_failures} requests skipped because an object they "
+                + "referred to wasn't created"
+            )
+        if self.skipped:
+            print(
+                f"{self.skipped} requests skipped because their bodies weren't captured"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay requests captured with the --capture option of the other "
+        + "scripts. Objects that referred to existing data, such as facilities and species, "
+        + "need the same IDs on the target server; objects created during the capture are "
+        + "created again and later requests are rewritten to use their new IDs."
+    )
+    parser.add_argument("captures", nargs="+", help="Capture files, in order.")
+    speed = parser.add_mutually_exclusive_group()
+    speed.add_argument(
+        "--speed",
+        "-s",
+        type=float,
+        default=1.0,
+        help="Replay this many times faster than the requests were captured. Default is 1.",
+    )
+    speed.add_argument(
+        "--max",
+        action="store_true",
+        help="Replay as fast as possible, limited only by --workers.",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=16,
+        help="Maximum number of concurrent requests. Default is 16.",
+    )
+    parser.add_argument(
+        "--max-gap",
+        type=float,
+        default=5.0,
+        help="Shorten idle periods in the capture, such as the time between two script "
+        + "runs, to this many seconds. Default is 5.",
+    )
+    add_terraware_args(parser)
+    args = parser.parse_args()
+
+    client = client_from_args(args, pool_size=args.workers)
+    replayer = Replayer(
+        client,
+        args.captures,
+        None if args.max else args.speed,
+        args.workers,
+        args.max_gap,
+    )
+    replayer.run()
+    replayer.report()
+
+
+if __name__ == "__main__":
+    main()
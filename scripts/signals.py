@@ -0,0 +1,225 @@
+"""
+Synthetic sensor signal models for generating realistic timeseries data.
+
+Uniformly random values don't compress, index, or aggregate anything like real sensor data,
+which makes storage and query benchmarks misleading. These models produce values with the
+kinds of structure real devices have: slow drift, daily cycles, plateaus, monotonic counters,
+and gaps where a device stopped reporting.
+
+Each model generates values for a whole batch of timestamps at a time and carries its state
+(the current level of a random walk, the current count of a counter, and so on) from one batch
+to the next. Given the same random number generator seed, a model produces the same values.
+"""
+
+import abc
+import math
+import random
+from typing import Dict, List, Optional, Type
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+class SignalModel(abc.ABC):
+    """Base class for signal models.
+
+    Every model is configured with the min and max values from a timeseries_config entry, plus
+    optional model-specific parameters. All models support "dropout", the probability that a
+    gap in the data starts at any given sample, and "dropout_length", the average number of
+    samples a gap lasts.
+    """
+
+    def __init__(self, params: Dict, rng: random.Random):
+        self.min_value = float(params["min"])
+        self.max_value = float(params["max"])
+        self.span = self.max_value - self.min_value
+        self.rng = rng
+        self.dropout = float(params.get("dropout", 0))
+        self.dropout_length = float(params.get("dropout_length", 10))
+        self._dropout_remaining = 0
+
+    def generate(self, timestamps: List[int]) -> List[Optional[float]]:
+        values = self.values(timestamps)
+        if self.dropout:
+            self._apply_dropouts(values)
+        return values
+
+    @abc.abstractmethod
+    def values(self, timestamps: List[int]) -> List[Optional[float]]:
+        pass
+
+    def _apply_dropouts(self, values: List[Optional[float]]):
+        rng = self.rng
+        remaining = self._dropout_remaining
+        for index in range(len(values)):
+            if remaining == 0 and rng.random() < self.dropout:
+                remaining = max(1, int(rng.expovariate(1 / self.dropout_length)))
+            if remaining:
+                values[index] = None
+                remaining -= 1
+        self._dropout_remaining = remaining
+
+    def _clamp(self, value: float) -> float:
+        return min(self.max_value, max(self.min_value, value))
+
+
+class UniformModel(SignalModel):
+    """Independent uniformly-distributed values. This is the original dummy data behavior."""
+
+    def values(self, timestamps: List[int]) -> List[Optional[float]]:
+        rng = self.rng
+        return [rng.random() * self.span + self.min_value for _ in timestamps]
+
+
+class RandomWalkModel(SignalModel):
+    """Values that drift by a small normally-distributed step each sample.
+
+    "volatility" is the standard deviation of each step as a fraction of the min-max range.
+    The walk reflects off the min and max values.
+    """
+
+    def __init__(self, params: Dict, rng: random.Random):
+        super().__init__(params, rng)
+        self.step = self.span * float(params.get("volatility", 0.02))
+        self.level = self.min_value + self.span * rng.uniform(0.25, 0.75)
+
+    def values(self, timestamps: List[int]) -> List[Optional[float]]:
+        gauss = self.rng.gauss
+        step = self.step
+        low = self.min_value
+        high = self.max_value
+        level = self.level
+        values: List[Optional[float]] = []
+
+        for _ in timestamps:
+            level += gauss(0, step)
+            if level > high:
+                level = 2 * high - level
+            elif level < low:
+                level = 2 * low - level
+            values.append(level)
+
+        self.level = self._clamp(level)
+        return values
+
+
+class DiurnalModel(SignalModel):
+    """A daily sine wave plus noise, like temperature or solar power.
+
+    "peak_hour" is the UTC hour when the value is highest; "noise" is the standard deviation
+    of the noise as a fraction of the min-max range.
+    """
+
+    def __init__(self, params: Dict, rng: random.Random):
+        super().__init__(params, rng)
+        self.peak_seconds = float(params.get("peak_hour", 14)) * 3600
+        self.noise = self.span * float(params.get("noise", 0.05))
+        self.midpoint = self.min_value + self.span / 2
+        self.amplitude = self.span / 2 - self.noise
+
+    def values(self, timestamps: List[int]) -> List[Optional[float]]:
+        gauss = self.rng.gauss
+        clamp = self._clamp
+        radians_per_second = 2 * math.pi / SECONDS_PER_DAY
+        # Shift the phase so the sine wave's maximum lands on the peak hour.
+        phase = self.peak_seconds - SECONDS_PER_DAY / 4
+
+        return [
+            clamp(
+                self.midpoint
+                + self.amplitude * math.sin((timestamp - phase) * radians_per_second)
+                + gauss(0, self.noise)
+            )
+            for timestamp in timestamps
+        ]
+
+
+class StepModel(SignalModel):
+    """A value that holds steady and occasionally jumps to a new level, like a status code.
+
+    "mean_seconds" is the average time between changes.
+    """
+
+    def __init__(self, params: Dict, rng: random.Random):
+        super().__init__(params, rng)
+        self.mean_seconds = float(params.get("mean_seconds", 6 * 3600))
+        self.level = rng.uniform(self.min_value, self.max_value)
+        self.next_change: Optional[float] = None
+
+    def values(self, timestamps: List[int]) -> List[Optional[float]]:
+        rng = self.rng
+        values: List[Optional[float]] = []
+
+        for timestamp in timestamps:
+            if self.next_change is None:
+                self.next_change = timestamp + rng.expovariate(1 / self.mean_seconds)
+            elif timestamp >= self.next_change:
+                self.level = rng.uniform(self.min_value, self.max_value)
+                self.next_change = timestamp + rng.expovariate(1 / self.mean_seconds)
+            values.append(self.level)
+
+        return values
+
+
+class CounterModel(SignalModel):
+    """A monotonically increasing count, like a battery's cycle count.
+
+    Starts at the min value and goes up by "increment" an average of once per "mean_seconds".
+    The max value is ignored.
+    """
+
+    def __init__(self, params: Dict, rng: random.Random):
+        super().__init__(params, rng)
+        self.count = self.min_value
+        self.increment = float(params.get("increment", 1))
+        self.mean_seconds = float(params.get("mean_seconds", SECONDS_PER_DAY))
+        self.previous_timestamp: Optional[int] = None
+
+    def values(self, timestamps: List[int]) -> List[Optional[float]]:
+        rng = self.rng
+        values: List[Optional[float]] = []
+
+        for timestamp in timestamps:
+            if self.previous_timestamp is not None:
+                elapsed = timestamp - self.previous_timestamp
+                if rng.random() < elapsed / self.mean_seconds:
+                    self.count += self.increment
+            self.previous_timestamp = timestamp
+            values.append(self.count)
+
+        return values
+
+
+MODELS: Dict[str, Type[SignalModel]] = {
+    "counter": CounterModel,
+    "diurnal": DiurnalModel,
+    "random_walk": RandomWalkModel,
+    "step": StepModel,
+    "uniform": UniformModel,
+}
+
+
+def format_value(value: float) -> str:
+    """Render a value for the API, without a spurious ".0" on whole numbers."""
+    return str(int(value)) if value.is_integer() else str(value)
+
+
+def series_rng(seed: Optional[int], device_id: int, name: str) -> random.Random:
+    """Return a random number generator for one timeseries.
+
+    With a seed, each timeseries gets its own stream derived from the seed, the device, and the
+    timeseries name, so the values of one timeseries don't depend on which other timeseries
+    were generated or in what order.
+    """
+    if seed is None:
+        return random.Random()
+    return random.Random(f"{seed}:{device_id}:{name}")
+
+
+def create_model(
+    params: Dict, rng: random.Random, model_name: Optional[str] = None
+) -> SignalModel:
+    """Create the model for a timeseries_config entry, optionally overriding its type."""
+    name = model_name or params.get("model", "uniform")
+    if name not in MODELS:
+        raise ValueError(f"Unknown signal model {name}")
+    return MODELS[name](params, rng)
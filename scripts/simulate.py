@@ -0,0 +1,579 @@
+#!/usr/bin/env python3
+"""
+Simulate a mix of production traffic at a target request rate.
+
+Operations are picked at random according to their weights and started on a fixed schedule,
+so the offered load stays the same no matter how slowly the server responds; if the server
+falls behind, requests pile up on the worker threads rather than being started later. Each
+operation generates its payloads with the same code as the single-purpose scripts:
+
+    search            one of the payloads in --search-file, or search.py's example payload
+    timeseries        a batch of values, up to the current time, for every timeseries of one
+                      device (timeseries.py)
+    accession-create  a new accession (create_accessions.py)
+    accession-update  an edit to a previously created accession (create_accessions.py)
+    withdrawal        a withdrawal to a planting substratum (withdraw_to_substrata.py)
+    observation       an ad-hoc observation (observe_ad_hoc.py)
+
+At the end, the script reports each operation's throughput, latency, and error rate, and
+checks them against any service level objectives given with --slo. Latencies are measured
+from when each operation was scheduled to start, not from when a worker picked it up, so
+time spent waiting behind a slow server counts against the objectives; the time spent
+waiting is also reported on its own as the queue delay. It exits with status 1 if
+any objective was missed.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import create_accessions
+import create_batches
+import observe_ad_hoc
+import search
+import timeseries
+from client import TerrawareClient, add_terraware_args, client_from_args
+from datasets import record_rng
+from pipeline import LatencyStats
+from signals import SignalModel, create_model, series_rng
+from withdraw_to_substrata import describe_error, generate_nursery_withdrawal
+
+DEFAULT_MIX = (
+    "search=30,timeseries=30,accession-create=10,accession-update=10,"
+    + "withdrawal=10,observation=10"
+)
+
+# Operation names and the Simulator methods that perform them.
+OPERATIONS = {
+    "search": "search",
+    "timeseries": "record_timeseries",
+    "accession-create": "create_accession",
+    "accession-update": "update_accession",
+    "withdrawal": "withdraw",
+    "observation": "observe",
+}
+
+# Maximum number of created accessions to remember as candidates for updates.
+MAX_ACCESSION_POOL = 1000
+
+# Operations that start at least this many seconds after their scheduled time are reported
+# as late, meaning the client didn't have enough workers to keep up with the target rate.
+LATE_THRESHOLD = 1.0
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for entry in value.split(","):
+        name, _, weight = entry.partition("=")
+        mix[name.strip()] = float(weight) if weight else 1.0
+    return mix
+
+
+def parse_slo(value: str) -> Tuple[str, str, float]:
+    """Parse an objective like "search:p95=800" (milliseconds) or "*:errors=1" (percent)."""
+    try:
+        operation, rest = value.split(":", 1)
+        metric, limit = rest.split("=", 1)
+        if metric not in ("p50", "p95", "p99", "errors"):
+            raise ValueError(metric)
+        return operation, metric, float(limit)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "Must be OPERATION:METRIC=LIMIT where METRIC is p50, p95, p99, or errors"
+        )
+
+
+def read_search_payloads(path: str) -> List[Dict]:
+    """Read a JSON search payload, a JSON array of them, or a JSON Lines file of them."""
+    with open(path) as fp:
+        text = fp.read()
+    try:
+        payloads = json.loads(text)
+        return payloads if isinstance(payloads, list) else [payloads]
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class Simulator:
+    """Holds the reference data the operations need and runs individual operations."""
+
+    def __init__(
+        self,
+        client: TerrawareClient,
+        organization_id: int,
+        seed: Optional[int],
+        search_payloads: List[Dict],
+        timeseries_values: int,
+        observation_type: str,
+    ):
+        self.client = client
+        self.organization_id = organization_id
+        self.seed = seed
+        self.search_payloads = search_payloads
+        self.timeseries_values = timeseries_values
+        self.observation_type = observation_type
+        self.lock = threading.Lock()
+
+        self.species_ids = [
+            species["id"] for species in client.list_species(organization_id, ["id"])
+        ]
+        facilities = [
+            facility
+            for facility in client.list_facilities(["id", "organizationId", "type"])
+            if facility["organizationId"] == organization_id
+        ]
+        self.seed_bank_ids = [f["id"] for f in facilities if f["type"] == "Seed Bank"]
+        self.nursery_ids = [f["id"] for f in facilities if f["type"] == "Nursery"]
+        self.planting_site_ids = [
+            site["id"] for site in client.list_planting_sites(organization_id)
+        ]
+
+        self.accessions: List[Dict] = []
+        self.batches: List[Dict] = []
+        self.planting_site_id: Optional[int] = None
+        self.substratum_ids: List[int] = []
+        # (device, timeseries_config entry) for each device that can record values.
+        self.devices: List[Tuple[Dict, Dict]] = []
+        self.device_locks: Dict[int, threading.Lock] = {}
+        self.next_times: Dict[int, int] = {}
+        self.models: Dict[Tuple[int, str], SignalModel] = {}
+
+    def prepare(
+        self, operation: str, batch_ids: List[int], planting_site_id: Optional[int]
+    ) -> Optional[str]:
+        """Fetch or create the data an operation needs. Returns a reason it can't run."""
+        if operation in ("accession-create", "accession-update"):
+            if not self.seed_bank_ids or not self.species_ids:
+                return "no seed bank or no species"
+            if operation == "accession-update":
+                for index in range(10):
+                    self.create_accession(record_rng(self.seed, "setup", index), index)
+        elif operation == "withdrawal":
+            return self.prepare_withdrawals(batch_ids, planting_site_id)
+        elif operation == "observation":
+            if not self.planting_site_ids or not self.species_ids:
+                return "no planting sites or no species"
+        elif operation == "timeseries":
+            return self.prepare_timeseries()
+        return None
+
+    def prepare_withdrawals(
+        self, batch_ids: List[int], planting_site_id: Optional[int]
+    ) -> Optional[str]:
+        if batch_ids:
+            self.batches = self.client.get_seedling_batches(batch_ids, require_all=True)
+        elif self.nursery_ids and self.species_ids:
+            # Make the batches big enough that they won't run out of plants.
+            rng = record_rng(self.seed, "setupBatch", 0)
+            for _ in range(4):
+                payload = create_batches.generate_batch(
+                    self.nursery_ids[0], self.species_ids, rng
+                )
+                payload["readyQuantity"] = 1000000
+                self.batches.append(self.client.create_seedling_batch(payload))
+        else:
+            return "no nursery or no species"
+
+        self.planting_site_id = planting_site_id or (
+            self.planting_site_ids[0] if self.planting_site_ids else None
+        )
+        if not self.planting_site_id:
+            return "no planting sites"
+        site = self.client.get_planting_site(self.planting_site_id, depth="Substratum")
+        self.substratum_ids = [
+            substratum["id"]
+            for stratum in site.get("strata", [])
+            for substratum in stratum["substrata"]
+        ]
+        return None if self.substratum_ids else "planting site has no substrata"
+
+    def prepare_timeseries(self) -> Optional[str]:
+        default_start = int(time.time()) - 24 * 60 * 60
+        for facility_id in self.seed_bank_ids + self.nursery_ids:
+            for device in self.client.list_devices(facility_id):
+                config: Optional[Dict[str, Any]] = timeseries.timeseries_config.get(
+                    (device.get("make"), device.get("model"))
+                )
+                if not config:
+                    continue
+                timeseries.create_missing_timeseries(
+                    self.client, device["id"], config, False, False
+                )
+                latest_times = timeseries.get_latest_value_times(self.client, device)
+                self.next_times[device["id"]] = (
+                    max(latest_times.values()) + config["interval"]
+                    if latest_times
+                    else default_start
+                )
+                self.device_locks[device["id"]] = threading.Lock()
+                for name, params in config["timeseries"].items():
+                    self.models[(device["id"], name)] = create_model(
+                        params, series_rng(self.seed, device["id"], name)
+                    )
+                self.devices.append((device, config))
+        return None if self.devices else "no devices with known makes and models"
+
+    def search(self, rng: random.Random, index: int):
+        self.client.search(rng.choice(self.search_payloads))
+
+    def record_timeseries(self, rng: random.Random, index: int) -> bool:
+        """Record the next values of a device that has values up to the current time.
+
+        Devices never record values from the future. Returns False without sending anything
+        if every device has caught up to the current time.
+        """
+        now = int(time.time())
+        for offset in range(len(self.devices)):
+            device, config = self.devices[(index + offset) % len(self.devices)]
+            interval = config["interval"]
+
+            # Signal models carry state from one batch of values to the next, so only
+            # generate one device's values at a time.
+            with self.device_locks[device["id"]]:
+                start = self.next_times[device["id"]]
+                count = min(self.timeseries_values, (now - start) // interval + 1)
+                if count <= 0:
+                    continue
+                end = start + interval * count
+                self.next_times[device["id"]] = end
+                elements = [
+                    element
+                    for name in config["timeseries"]
+                    for element in timeseries.timeseries_values_payload(
+                        device,
+                        name,
+                        start,
+                        end,
+                        interval,
+                        self.models[(device["id"], name)],
+                    )
+                ]
+
+            self.client.record_values({"timeseries": elements})
+            return True
+
+        return False
+
+    def create_accession(self, rng: random.Random, index: int):
+        facility_id = self.seed_bank_ids[index % len(self.seed_bank_ids)]
+        payload = create_accessions.generate_accession(
+            facility_id, self.species_ids, rng
+        )
+        accession = self.client.create_accession(payload)
+
+        with self.lock:
+            if len(self.accessions) < MAX_ACCESSION_POOL:
+                self.accessions.append(accession)
+            else:
+                self.accessions[rng.randrange(MAX_ACCESSION_POOL)] = accession
+
+    def update_accession(self, rng: random.Random, index: int):
+        with self.lock:
+            accession = rng.choice(self.accessions)
+        payload = create_accessions.generate_accession_update(accession, rng)
+        self.client.update_accession(accession["id"], payload)
+
+    def withdraw(self, rng: random.Random, index: int):
+        batch = self.batches[index % len(self.batches)]
+        self.client.withdraw_seedling_batch(
+            generate_nursery_withdrawal(
+                batch["facilityId"],
+                batch["id"],
+                self.planting_site_id,
+                self.substratum_ids[index % len(self.substratum_ids)],
+            )
+        )
+
+    def observe(self, rng: random.Random, index: int):
+        self.client.complete_ad_hoc_observation(
+            observe_ad_hoc.generate_payload(
+                index,
+                self.planting_site_ids,
+                self.observation_type,
+                "Terrestrial",
+                self.species_ids,
+                self.seed,
+                int(time.time()),
+            )
+        )
+
+
+def run(
+    simulator: Simulator,
+    mix: Dict[str, float],
+    rate: float,
+    duration: float,
+    workers: int,
+    poisson: bool,
+    progress_interval: float,
+) -> Tuple[Dict[str, LatencyStats], LatencyStats, Counter, float]:
+    """Run the mix of operations.
+
+    Returns the stats of each operation, the delays between operations' scheduled and actual
+    start times, the errors, and the elapsed time.
+    """
+    names = list(mix.keys())
+    # Operations return False if there was nothing to do; those aren't counted in the stats.
+    operations: Dict[str, Callable[[random.Random, int], Optional[bool]]] = {
+        name: getattr(simulator, OPERATIONS[name]) for name in names
+    }
+    weights = [mix[name] for name in names]
+    stats = {name: LatencyStats(name) for name in names}
+    queue_delay = LatencyStats("queue delay")
+    errors: Counter = Counter()
+    skipped: Counter = Counter()
+    late = [0]
+    lock = threading.Lock()
+    schedule_rng = random.Random(simulator.seed)
+
+    def perform(name: str, index: int, scheduled: float):
+        # Measure from the scheduled time rather than when a worker got to the operation, or
+        # an overloaded server would make the latencies look better by delaying the requests
+        # that would have seen its worst response times.
+        delay = time.monotonic() - scheduled
+        queue_delay.record(max(delay, 0.0))
+        if delay > LATE_THRESHOLD:
+            with lock:
+                late[0] += 1
+        try:
+            if (
+                operations[name](record_rng(simulator.seed, name, index), index)
+                is False
+            ):
+                with lock:
+                    skipped[name] += 1
+                return
+            stats[name].record(time.monotonic() - scheduled)
+        except Exception as ex:
+            stats[name].record(time.monotonic() - scheduled, error=True)
+            with lock:
+                errors[(name, describe_error(ex))] += 1
+
+    started = time.monotonic()
+    next_progress = started + progress_interval
+    scheduled = started
+    index = 0
+
+    with ThreadPoolExecutor(workers) as executor:
+        while True:
+            scheduled += schedule_rng.expovariate(rate) if poisson else 1 / rate
+            if scheduled - started >= duration:
+                break
+
+            now = time.monotonic()
+            if scheduled > now:
+                time.sleep(scheduled - now)
+
+            if progress_interval and now >= next_progress:
+                completed = sum(stat.count for stat in stats.values()) + sum(
+                    skipped.values()
+                )
+                failed = sum(stat.errors for stat in stats.values())
+                elapsed = now - started
+                print(
+                    f"{elapsed:.0f}s: {completed} completed ({completed / elapsed:.1f}/sec), "
+                    + f"{index - completed} in flight, {failed} errors"
+                )
+                next_progress += progress_interval
+
+            name = schedule_rng.choices(names, weights)[0]
+            executor.submit(perform, name, index, scheduled)
+            index += 1
+
+    elapsed = time.monotonic() - started
+    if late[0]:
+        print(
+            f"{late[0]} operations started more than {LATE_THRESHOLD:.0f}s late; "
+            + "use more workers to reach the target rate"
+        )
+    for name, count in skipped.items():
+        print(f"Skipped {count} {name} operations that had nothing to send")
+    return stats, queue_delay, errors, elapsed
+
+
+def check_slos(
+    stats: Dict[str, LatencyStats], slos: List[Tuple[str, str, float]]
+) -> bool:
+    """Print whether each objective was met. Returns true if they all were."""
+    all_met = True
+    for operation, metric, limit in slos:
+        names = list(stats.keys()) if operation == "*" else [operation]
+        for name in names:
+            if name not in stats:
+                print(f"SLO {name}:{metric}: operation wasn't run")
+                continue
+            stat = stats[name]
+            if metric == "errors":
+                actual = stat.errors * 100 / stat.count if stat.count else 0.0
+                description = f"errors {actual:.2f}% (limit {limit:g}%)"
+            else:
+                actual = stat.percentile(float(metric[1:])) * 1000
+                description = f"{metric} {actual:.0f}ms (limit {limit:g}ms)"
+            met = actual <= limit
+            all_met = all_met and met
+            print(f"SLO {name}: {description} {'met' if met else 'MISSED'}")
+    return all_met
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Simulate a mix of production traffic at a target request rate."
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=parse_mix(DEFAULT_MIX),
+        help="Comma-separated operation=weight pairs. Default is " + DEFAULT_MIX + ".",
+    )
+    parser.add_argument(
+        "--rate",
+        "-r",
+        type=float,
+        default=20,
+        help="Operations per second across all operations. Default is 20.",
+    )
+    parser.add_argument(
+        "--duration",
+        "-d",
+        type=float,
+        default=60,
+        help="Number of seconds to run. Default is 60.",
+    )
+    parser.add_argument(
+        "--poisson",
+        action="store_true",
+        help="Space operations randomly, as independent arrivals, rather than evenly.",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=32,
+        help="Maximum number of concurrent operations. Default is 32.",
+    )
+    parser.add_argument(
+        "--slo",
+        type=parse_slo,
+        action="append",
+        default=[],
+        metavar="OPERATION:METRIC=LIMIT",
+        help="Service level objective, e.g., search:p95=800 for a 95th percentile latency "
+        + "of at most 800ms or *:errors=1 for an error rate of at most 1%% for every "
+        + "operation. May be specified more than once.",
+    )
+    parser.add_argument(
+        "--organization",
+        "-o",
+        type=int,
+        help="Organization to use. Default is the lowest-numbered one where the current "
+        + "user is an admin.",
+    )
+    parser.add_argument(
+        "--search-file",
+        help="File with search payloads to pick from: a JSON payload, a JSON array of "
+        + "payloads, or JSON Lines. Default is search.py's example payload.",
+    )
+    parser.add_argument(
+        "--batch",
+        "-b",
+        type=int,
+        action="append",
+        default=[],
+        help="Seedling batch to withdraw from. May be specified more than once. Default is "
+        + "to create batches at the organization's first nursery.",
+    )
+    parser.add_argument(
+        "--planting-site",
+        "-p",
+        type=int,
+        help="Planting site to withdraw to. Default is the organization's first one.",
+    )
+    parser.add_argument(
+        "--timeseries-values",
+        type=int,
+        default=10,
+        help="Values per timeseries in each timeseries request. Default is 10.",
+    )
+    parser.add_argument(
+        "--observation-type",
+        choices=["biomass", "monitoring"],
+        default="monitoring",
+        help="Type of ad-hoc observation to create. Default is monitoring.",
+    )
+    parser.add_argument(
+        "--progress",
+        type=float,
+        default=10,
+        help="Seconds between progress reports; 0 to disable. Default is 10.",
+    )
+    parser.add_argument(
+        "--seed", type=int, help="Seed for the random number generator."
+    )
+    add_terraware_args(parser, cache=True)
+    args = parser.parse_args()
+
+    unknown = [name for name in args.mix if name not in OPERATIONS]
+    if unknown:
+        parser.error(f"Unknown operations: {', '.join(unknown)}")
+
+    client = client_from_args(args, pool_size=args.workers)
+
+    simulator = Simulator(
+        client,
+        args.organization or client.get_default_organization_id(),
+        args.seed,
+        (
+            read_search_payloads(args.search_file)
+            if args.search_file
+            else [search.example_payload]
+        ),
+        args.timeseries_values,
+        args.observation_type,
+    )
+
+    mix = {}
+    for name, weight in args.mix.items():
+        if weight <= 0:
+            continue
+        reason = simulator.prepare(name, args.batch, args.planting_site)
+        if reason:
+            print(f"Skipping {name}: {reason}")
+        else:
+            mix[name] = weight
+    if not mix:
+        raise Exception("None of the operations can run in this organization")
+
+    print(f"Running {', '.join(mix)} at {args.rate:g}/sec for {args.duration:g}s")
+    stats, queue_delay, errors, elapsed = run(
+        simulator,
+        mix,
+        args.rate,
+        args.duration,
+        args.workers,
+        args.poisson,
+        args.progress,
+    )
+
+    for stat in stats.values():
+        error_rate = stat.errors * 100 / stat.count if stat.count else 0.0
+        print(f"{stat.summary(elapsed)} ({error_rate:.2f}%)")
+    print(
+        f"queue delay: p50 {queue_delay.percentile(50) * 1000:.0f}ms, "
+        + f"p95 {queue_delay.percentile(95) * 1000:.0f}ms, "
+        + f"p99 {queue_delay.percentile(99) * 1000:.0f}ms"
+    )
+    for (name, description), count in errors.most_common():
+        print(f"{count:6d}  {name}: {description}")
+
+    if not check_slos(stats, args.slo):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
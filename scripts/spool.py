@@ -0,0 +1,407 @@
+"""
+Disk-backed write-ahead buffer for timeseries values.
+
+Payloads are appended to a directory of segment files before they are submitted to the
+server. A drainer replays the segments in large packed batches once the server accepts data,
+and deletes segments once all their payloads have been acknowledged. If the server is down or
+the facility isn't configured yet, the values stay on disk until a later run can deliver them.
+
+A spool directory should only be used by one process at a time.
+"""
+
+from datetime import datetime
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+from client import TerrawareClient
+
+# Maximum number of timeseries entries the server accepts in one request.
+MAX_TIMESERIES_PER_REQUEST = 1000
+
+DEFAULT_SEGMENT_BYTES = 4 * 1024 * 1024
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_BATCH_VALUES = 20000
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".jsonl"
+ACK_SUFFIX = ".ack"
+STATE_FILE = "state.json"
+
+
+class Spool:
+    """Append-only, segment-rotated log of record_values payloads."""
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        fsync: bool = False,
+    ):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.fsync = fsync
+        self.dropped_segments = 0
+        self._lock = threading.RLock()
+        self._active = None
+        self._active_number = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+        existing = self._segment_numbers()
+        self._next_number = existing[-1] + 1 if existing else 1
+
+        self._latest_times: Dict[str, int] = {}
+        state_path = os.path.join(directory, STATE_FILE)
+        if os.path.exists(state_path):
+            with open(state_path) as fp:
+                self._latest_times = json.load(fp).get("latestTimes", {})
+
+    def _segment_numbers(self) -> List[int]:
+        return sorted(
+            int(name[len(SEGMENT_PREFIX) : -len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def segment_path(self, number: int) -> str:
+        return os.path.join(
+            self.directory, f"{SEGMENT_PREFIX}{number:012d}{SEGMENT_SUFFIX}"
+        )
+
+    def append(self, payload: Dict):
+        """Write a record_values payload to the end of the spool."""
+        line = (json.dumps(payload, separators=(",", ":")) + "\n").encode("utf-8")
+
+        with self._lock:
+            if self._active is None or self._active.tell() >= self.segment_bytes:
+                self._rotate()
+                self._enforce_limit()
+
+            active = self._active
+            assert active is not None, "_rotate opens a new segment"
+            active.write(line)
+            active.flush()
+            if self.fsync:
+                os.fsync(active.fileno())
+
+            for element in payload["timeseries"]:
+                if not element["values"]:
+                    continue
+                key = _series_key(element["deviceId"], element["timeseriesName"])
+                # Timestamps all use the same ISO 8601 format, so they sort as strings.
+                latest = _parse_timestamp(
+                    max(value["timestamp"] for value in element["values"])
+                )
+                if latest > self._latest_times.get(key, 0):
+                    self._latest_times[key] = latest
+
+    def _rotate(self):
+        if self._active is not None:
+            self._active.close()
+        self._active_number = self._next_number
+        self._next_number += 1
+        self._active = open(self.segment_path(self._active_number), "ab")
+
+    def seal(self):
+        """Close the active segment so the drainer can pick it up."""
+        with self._lock:
+            if self._active is not None and self._active.tell() > 0:
+                self._active.close()
+                self._active = None
+                self._active_number = 0
+
+    def sealed_segments(self) -> List[int]:
+        with self._lock:
+            return [n for n in self._segment_numbers() if n != self._active_number]
+
+    def total_bytes(self) -> int:
+        return sum(
+            os.path.getsize(self.segment_path(number))
+            for number in self._segment_numbers()
+        )
+
+    def _enforce_limit(self):
+        """Drop the oldest sealed segments if the spool has outgrown its disk budget."""
+        total = self.total_bytes()
+        for number in self.sealed_segments():
+            if total <= self.max_bytes:
+                break
+            path = self.segment_path(number)
+            total -= os.path.getsize(path)
+            self.delete_segment(number)
+            self.dropped_segments += 1
+            print(
+                f"Spool is over {self.max_bytes} bytes; dropped {os.path.basename(path)}",
+                file=sys.stderr,
+            )
+
+    def read_segment(self, number: int) -> Iterator[Tuple[Dict, int]]:
+        """Yield the unacknowledged payloads of a segment with the offset after each one."""
+        offset = self.acknowledged_offset(number)
+        with open(self.segment_path(number), "rb") as fp:
+            fp.seek(offset)
+            for line in fp:
+                offset += len(line)
+                if line.strip():
+                    yield json.loads(line), offset
+
+    def acknowledged_offset(self, number: int) -> int:
+        ack_path = self.segment_path(number) + ACK_SUFFIX
+        if os.path.exists(ack_path):
+            with open(ack_path) as fp:
+                return int(fp.read().strip() or 0)
+        return 0
+
+    def acknowledge(self, number: int, offset: int):
+        """Record that a segment has been delivered up to a byte offset."""
+        if os.path.exists(self.segment_path(number)):
+            _atomic_write(self.segment_path(number) + ACK_SUFFIX, str(offset))
+
+    def compact(self, number: int):
+        """Drop the acknowledged prefix of a segment if it makes up most of the file.
+
+        This keeps a segment whose delivery keeps getting interrupted from holding on to
+        bytes that have already reached the server.
+        """
+        path = self.segment_path(number)
+        offset = self.acknowledged_offset(number)
+        if offset > os.path.getsize(path) // 2:
+            with open(path, "rb") as fp:
+                fp.seek(offset)
+                remaining = fp.read()
+            # Reset the offset before shrinking the file; if the process dies in between, the
+            # acknowledged values are sent again and ignored as duplicates, rather than the
+            # old offset skipping values in the new file that were never delivered.
+            _atomic_write(path + ACK_SUFFIX, "0")
+            _atomic_write(path, remaining, binary=True)
+            os.remove(path + ACK_SUFFIX)
+
+    def delete_segment(self, number: int):
+        path = self.segment_path(number)
+        for name in [path, path + ACK_SUFFIX]:
+            if os.path.exists(name):
+                os.remove(name)
+
+    def latest_times(self, device_id: int) -> Dict[str, int]:
+        """Return the most recent spooled timestamp of each of a device's timeseries."""
+        prefix = f"{device_id}/"
+        with self._lock:
+            return {
+                key[len(prefix) :]: timestamp
+                for key, timestamp in self._latest_times.items()
+                if key.startswith(prefix)
+            }
+
+    def close(self):
+        with self._lock:
+            if self._active is not None:
+                self._active.close()
+                self._active = None
+                self._active_number = 0
+            _atomic_write(
+                os.path.join(self.directory, STATE_FILE),
+                json.dumps({"latestTimes": self._latest_times}),
+            )
+
+
+class SpoolDrainer(threading.Thread):
+    """Background thread that replays spooled payloads to the server.
+
+    Payloads from a segment are merged into packed requests of up to batch_values values.
+    When the server is unreachable or answers 202 Accepted (facility not configured), the
+    drainer leaves the data in place and backs off before trying again.
+    """
+
+    def __init__(
+        self,
+        client: TerrawareClient,
+        spool: Spool,
+        batch_values: int = DEFAULT_BATCH_VALUES,
+        min_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        verbose: bool = False,
+    ):
+        super().__init__(name="spool-drainer", daemon=True)
+        self.client = client
+        self.spool = spool
+        self.batch_values = batch_values
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.verbose = verbose
+        self.requests_sent = 0
+        self.values_sent = 0
+        self.values_rejected = 0
+        self._stopping = threading.Event()
+        self._idle = threading.Event()
+
+    def run(self):
+        backoff = self.min_backoff
+        while not self._stopping.is_set():
+            try:
+                delivered = self.drain_once()
+                backoff = self.min_backoff
+                if not delivered:
+                    self._idle.set()
+                    self._stopping.wait(self.min_backoff)
+            except ServerNotAccepting as ex:
+                if self.verbose:
+                    print(f"Spool drainer backing off {backoff:.0f}s: {ex}")
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    def drain_once(self) -> bool:
+        """Deliver every sealed segment. Returns False if there was nothing to send."""
+        self._idle.clear()
+        segments = self.spool.sealed_segments()
+        if not segments:
+            self.spool.seal()
+            segments = self.spool.sealed_segments()
+            if not segments:
+                return False
+
+        for number in segments:
+            if self._stopping.is_set():
+                break
+            self._drain_segment(number)
+
+        return True
+
+    def _drain_segment(self, number: int):
+        if not os.path.exists(self.spool.segment_path(number)):
+            # Dropped by the disk limit since we listed the segments.
+            return
+
+        self.spool.compact(number)
+        batch = PackedBatch()
+        end_offset = None
+
+        for payload, offset in self.spool.read_segment(number):
+            if batch.value_count and (
+                batch.value_count + _value_count(payload) > self.batch_values
+                or batch.entry_count + len(payload["timeseries"])
+                > MAX_TIMESERIES_PER_REQUEST
+            ):
+                # A nonempty batch means at least one payload, and thus its offset, was read.
+                assert end_offset is not None
+                self._send(batch)
+                self.spool.acknowledge(number, end_offset)
+                batch = PackedBatch()
+            batch.add(payload)
+            end_offset = offset
+
+        if batch.value_count:
+            self._send(batch)
+        self.spool.delete_segment(number)
+
+    def _send(self, batch: "PackedBatch"):
+        payload = batch.payload()
+        try:
+            response = self.client.record_values_raw(payload)
+        except requests.exceptions.ConnectionError as ex:
+            raise ServerNotAccepting(f"Server unreachable: {ex}")
+        except requests.exceptions.HTTPError as ex:
+            status = ex.response.status_code if ex.response is not None else None
+            if status is None or status >= 500 or status == 429:
+                raise ServerNotAccepting(f"HTTP {status}: {ex}")
+            # The server will never accept this payload; don't let it block the spool.
+            print(f"Server rejected spooled values: {ex}", file=sys.stderr)
+            self.values_rejected += batch.value_count
+            return
+
+        if response.status_code == 202:
+            raise ServerNotAccepting("Facility is not configured yet")
+
+        self.requests_sent += 1
+        self.values_sent += batch.value_count
+        failures = response.json().get("failures") or []
+        for failure in failures:
+            # Duplicates are expected when replaying after a partial delivery.
+            if failure["message"] != "Already have a value with this timestamp":
+                print(
+                    f"Device {failure['deviceId']} timeseries {failure['timeseriesName']}: "
+                    f"{len(failure['values'])} values failed: {failure['message']}",
+                    file=sys.stderr,
+                )
+                self.values_rejected += len(failure["values"])
+
+        if self.verbose:
+            print(
+                f"Spool drainer sent {batch.value_count} values in {batch.entry_count} "
+                "timeseries"
+            )
+
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the drainer finds nothing left to send."""
+        return self._idle.wait(timeout)
+
+    def stop(self):
+        self._stopping.set()
+        self.join()
+
+    def finish(self, timeout: float):
+        """Keep draining until the spool is empty or the timeout expires, then stop."""
+        deadline = time.monotonic() + timeout
+        self.spool.seal()
+        while time.monotonic() < deadline:
+            self._idle.clear()
+            if self.wait_until_idle(max(0.0, deadline - time.monotonic())):
+                if not self.spool.sealed_segments():
+                    break
+        self.stop()
+
+
+class PackedBatch:
+    """Merges payloads into a single request, combining values for the same timeseries."""
+
+    def __init__(self):
+        self.entries: Dict[Tuple[int, str], List[Dict]] = {}
+        self.value_count = 0
+
+    @property
+    def entry_count(self) -> int:
+        return len(self.entries)
+
+    def add(self, payload: Dict):
+        for element in payload["timeseries"]:
+            key = (element["deviceId"], element["timeseriesName"])
+            self.entries.setdefault(key, []).extend(element["values"])
+            self.value_count += len(element["values"])
+
+    def payload(self) -> Dict:
+        return {
+            "timeseries": [
+                {"deviceId": device_id, "timeseriesName": name, "values": values}
+                for (device_id, name), values in self.entries.items()
+            ]
+        }
+
+
+class ServerNotAccepting(Exception):
+    pass
+
+
+def _value_count(payload: Dict) -> int:
+    return sum(len(element["values"]) for element in payload["timeseries"])
+
+
+def _series_key(device_id: int, name: str) -> str:
+    return f"{device_id}/{name}"
+
+
+def _parse_timestamp(iso_datetime: str) -> int:
+    return int(datetime.fromisoformat(iso_datetime.replace("Z", "+00:00")).timestamp())
+
+
+def _atomic_write(path: str, content, binary: bool = False):
+    temp_path = f"{path}.tmp{os.getpid()}"
+    with open(temp_path, "wb" if binary else "w") as fp:
+        fp.write(content)
+    os.replace(temp_path, path)
@@ -0,0 +1,930 @@
+#!/usr/bin/env python3
+"""
+Lightweight stand-in for terraware-server and Keycloak, for benchmarking clients.
+
+Implements the endpoints TerrawareClient and the scripts in this directory use most, with
+in-memory data: organizations, facilities, devices, timeseries, accessions, species, seedling
+batches, search with cursors, planting sites, observations, and the Keycloak token endpoint.
+It doesn't validate payloads beyond what's needed to generate plausible responses, so it's
+only useful for measuring client behavior, not for testing correctness.
+
+Responses can be slowed down and made to fail:
+
+    --latency SPEC              latency of every response
+    --route-latency ROUTE=SPEC  latency of one route, e.g., "POST /api/v1/timeseries/values"
+                                or "/api/v1/species/{id}"; IDs in paths are written as {id}
+    --error-rate P              fraction of requests that get a 500 response
+    --throttle-rate P           fraction of requests that get a 429 response
+    --rate-limit N              requests per second above which requests get 429 responses
+
+Latency SPECs are in milliseconds: "fixed:20", "uniform:5,50", "normal:30,10",
+"lognormal:MEDIAN,SIGMA", or "exp:MEAN".
+
+The stand-in accepts any session cookie. It also prints a refresh token that works with its
+token endpoint, so the refresh token code path can be exercised too. Only the shape of the
+tokens is realistic; their signatures are bogus.
+
+Use run_in_thread() to start a stand-in inside a benchmark script.
+"""
+
+import argparse
+import base64
+import csv
+import hashlib
+import io
+import json
+import math
+import random
+import re
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from capture import route_template
+
+# Make and model of the simulated devices. These match entries in timeseries.py's
+# timeseries_config so timeseries.py generates values for them.
+DEVICE_MODELS = [("OmniSense", "S-11"), ("Blue Ion", "LV"), ("Blue Ion", "LX-HV")]
+
+REALM_PATH = "/realms/terraware"
+
+# Most IDs the server's multiple-ID endpoints, such as GET /api/v1/devices?id=..., accept.
+MAX_IDS_PER_REQUEST = 100
+
+
+class LatencyModel:
+    """A distribution of response latencies, parsed from a SPEC string."""
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        # Parameters are milliseconds except for the lognormal sigma, which is unitless.
+        raw_values = [float(value) for value in params.split(",") if value]
+        values = [value / 1000 for value in raw_values]
+        samplers: Dict[str, Callable[[random.Random], float]] = {
+            "none": lambda rng: 0.0,
+            "fixed": lambda rng: values[0],
+            "uniform": lambda rng: rng.uniform(values[0], values[1]),
+            "normal": lambda rng: rng.gauss(values[0], values[1]),
+            "lognormal": lambda rng: values[0] * math.exp(rng.gauss(0, raw_values[1])),
+            "exp": lambda rng: rng.expovariate(1 / values[0]),
+        }
+        if kind not in samplers:
+            raise ValueError(f"Unknown latency distribution {kind}")
+        self._sample = samplers[kind]
+
+    def sample(self, rng: random.Random) -> float:
+        return max(0.0, self._sample(rng))
+
+
+class RateLimiter:
+    """Token bucket that allows a sustained rate of requests with bursts up to one second."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class Config:
+    def __init__(
+        self,
+        latency: str = "none",
+        route_latency: Optional[Dict[str, str]] = None,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        rate_limit: Optional[float] = None,
+        facilities: int = 2,
+        devices: int = 3,
+        species: int = 50,
+        sites: int = 2,
+        plots: int = 20,
+        search_rows: int = 1000,
+        history_interval: int = 300,
+        history_max_values: int = 10000,
+        pad_bytes: int = 0,
+        token_lifetime: int = 300,
+        seed: Optional[int] = None,
+    ):
+        self.latency = LatencyModel(latency)
+        self.route_latency = {
+            route: LatencyModel(spec) for route, spec in (route_latency or {}).items()
+        }
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.facilities = facilities
+        self.devices = devices
+        self.species = species
+        self.sites = sites
+        self.plots = plots
+        self.search_rows = search_rows
+        self.history_interval = history_interval
+        self.history_max_values = history_max_values
+        self.pad_bytes = pad_bytes
+        self.token_lifetime = token_lifetime
+        self.seed = seed
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _format_time(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _b64(data: Dict) -> str:
+    encoded = base64.urlsafe_b64encode(json.dumps(data).encode())
+    return encoded.rstrip(b"=").decode()
+
+
+def make_token(claims: Dict) -> str:
+    """Make a JWT with the given claims and a bogus signature."""
+    return f"{_b64({'alg': 'HS256', 'typ': 'JWT'})}.{_b64(claims)}.c3RhbmRpbg"
+
+
+def read_token_claims(token: str) -> Dict:
+    payload = token.split(".")[1]
+    return json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+
+
+class StandInData:
+    """In-memory server state. Handler methods are called with the data lock held."""
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.lock = threading.Lock()
+        self.next_id = 1000
+        rng = random.Random(config.seed)
+
+        self.organizations = [
+            {"id": 1, "name": "Stand-in Organization", "role": "Owner"}
+        ]
+        self.facilities: Dict[int, Dict] = {}
+        self.devices: Dict[int, Dict] = {}
+        for index in range(1, config.facilities + 1):
+            facility_type = "Seed Bank" if index % 2 else "Nursery"
+            self.facilities[index] = {
+                "id": index,
+                "connectionState": "Configured",
+                "name": f"{facility_type} {index}",
+                "organizationId": 1,
+                "type": facility_type,
+            }
+            for device_index in range(config.devices):
+                device_id = index * 100 + device_index
+                make, model = DEVICE_MODELS[device_index % len(DEVICE_MODELS)]
+                self.devices[device_id] = {
+                    "id": device_id,
+                    "facilityId": index,
+                    "make": make,
+                    "model": model,
+                    "name": f"{make} {model} {device_id}",
+                    "type": "sensor",
+                }
+
+        # Latest value time of each timeseries, by device ID and timeseries name.
+        self.timeseries: Dict[int, Dict[str, Optional[str]]] = {}
+
+        self.species: Dict[int, Dict] = {}
+        for index in range(1, config.species + 1):
+            self.species[index] = {
+                "id": index,
+                "scientificName": f"Standin species {index}",
+                "commonName": f"Common {rng.randint(1, 10000)}",
+            }
+
+        self.accessions: Dict[int, Dict] = {}
+        self.batches: Dict[int, Dict] = {}
+        self.withdrawals = 0
+
+        self.sites: Dict[int, Dict] = {}
+        substratum_id = 1
+        for index in range(1, config.sites + 1):
+            strata = []
+            for stratum_index in range(1, 3):
+                substrata = []
+                for _ in range(3):
+                    substrata.append({"id": substratum_id, "name": f"{substratum_id}"})
+                    substratum_id += 1
+                strata.append(
+                    {
+                        "id": index * 10 + stratum_index,
+                        "name": f"Stratum {stratum_index}",
+                        "substrata": substrata,
+                    }
+                )
+            self.sites[index] = {
+                "id": index,
+                "name": f"Site {index}",
+                "organizationId": 1,
+                "strata": strata,
+            }
+
+        self.observations: Dict[int, Dict] = {
+            1: {
+                "id": 1,
+                "plantingSiteId": 1,
+                "state": "InProgress",
+            }
+        }
+        self.plots: Dict[int, Dict[int, Dict]] = {
+            1: {plot_id: {"plotId": plot_id} for plot_id in range(1, config.plots + 1)}
+        }
+
+    def new_id(self) -> int:
+        self.next_id += 1
+        return self.next_id
+
+    def refresh_token(self, base_url: str) -> str:
+        return make_token(
+            {"iss": base_url + REALM_PATH, "azp": "standin", "typ": "Refresh"}
+        )
+
+    # Keycloak
+
+    def issue_token(self, form: Dict[str, List[str]]) -> Dict:
+        if form.get("grant_type") != ["refresh_token"] or not form.get("refresh_token"):
+            raise HttpError(400, "invalid_grant")
+        lifetime = self.config.token_lifetime
+        return {
+            "access_token": make_token({"exp": int(time.time()) + lifetime}),
+            "expires_in": lifetime,
+            "token_type": "Bearer",
+        }
+
+    # Users and organizations
+
+    def get_me(self, query, body):
+        return {"user": {"id": 1, "email": "standin@example.com"}}
+
+    def list_organizations(self, query, body):
+        return {"organizations": self.organizations}
+
+    # Facilities and devices
+
+    def list_facilities(self, query, body):
+        return {"facilities": _sparse(query, self.facilities.values())}
+
+    def get_facility(self, query, body, facility_id):
+        return {"facility": self._find(self.facilities, facility_id, "Facility")}
+
+    def list_devices(self, query, body, facility_id):
+        self._find(self.facilities, facility_id, "Facility")
+        return {
+            "devices": [
+                device
+                for device in self.devices.values()
+                if device["facilityId"] == int(facility_id)
+            ]
+        }
+
+    def get_device(self, query, body, device_id):
+        return {"device": self._find(self.devices, device_id, "Device")}
+
+    def get_devices(self, query, body):
+        return {"devices": _by_ids(query, self.devices)}
+
+    # Timeseries
+
+    def list_timeseries(self, query, body):
+        device_id = int(query["deviceId"][0])
+        timeseries = []
+        for name, latest in self.timeseries.get(device_id, {}).items():
+            entry: Dict[str, Any] = {
+                "deviceId": device_id,
+                "timeseriesName": name,
+                "type": "Numeric",
+            }
+            if latest:
+                entry["latestValue"] = {"timestamp": latest, "value": "0"}
+            timeseries.append(entry)
+        return {"timeseries": timeseries}
+
+    def create_timeseries(self, query, body):
+        for entry in body["timeseries"]:
+            self.timeseries.setdefault(entry["deviceId"], {}).setdefault(
+                entry["timeseriesName"], None
+            )
+        return {"status": "ok"}
+
+    def record_values(self, query, body):
+        for entry in body["timeseries"]:
+            series = self.timeseries.setdefault(entry["deviceId"], {})
+            latest = series.get(entry["timeseriesName"])
+            for value in entry["values"]:
+                # Timestamps are all in the same format, so they sort as strings.
+                if latest is None or value["timestamp"] > latest:
+                    latest = value["timestamp"]
+            series[entry["timeseriesName"]] = latest
+        return {"status": "ok"}
+
+    def timeseries_history(self, query, body):
+        start = _parse_time(body["startTime"])
+        end = _parse_time(body["endTime"])
+        interval = timedelta(
+            seconds=body.get("bucketSeconds") or self.config.history_interval
+        )
+        count = min(
+            self.config.history_max_values, max(0, int((end - start) / interval))
+        )
+        rng = random.Random(self.config.seed)
+        return {
+            "timeseries": [
+                {
+                    "deviceId": series["deviceId"],
+                    "timeseriesName": series["timeseriesName"],
+                    "values": [
+                        {
+                            "timestamp": _format_time(start + interval * index),
+                            "value": f"{rng.uniform(0, 100):.3f}",
+                        }
+                        for index in range(count)
+                    ],
+                }
+                for series in body["timeseries"]
+            ]
+        }
+
+    # Accessions
+
+    def create_accession(self, query, body):
+        accession_id = self.new_id()
+        accession = {
+            **body,
+            "id": accession_id,
+            "accessionNumber": f"SA-{accession_id}",
+            "state": "Awaiting Check-In",
+        }
+        self.accessions[accession_id] = accession
+        return {"accession": accession}
+
+    def get_accession(self, query, body, accession_id):
+        return {"accession": self._find(self.accessions, accession_id, "Accession")}
+
+    def get_accessions(self, query, body):
+        return {"accessions": _by_ids(query, self.accessions)}
+
+    def update_accession(self, query, body, accession_id):
+        accession = self._find(self.accessions, accession_id, "Accession")
+        updated = {**accession, **body, "id": accession["id"]}
+        if query.get("simulate") != ["true"]:
+            self.accessions[accession["id"]] = updated
+        return {"accession": updated}
+
+    def delete_accession(self, query, body, accession_id):
+        self._find(self.accessions, accession_id, "Accession")
+        del self.accessions[int(accession_id)]
+        return {"status": "ok"}
+
+    def check_in_accession(self, query, body, accession_id):
+        accession = self._find(self.accessions, accession_id, "Accession")
+        accession["state"] = "Awaiting Processing"
+        return {"accession": accession}
+
+    def create_viability_test(self, query, body, accession_id):
+        accession = self._find(self.accessions, accession_id, "Accession")
+        test = {**body, "id": self.new_id()}
+        accession.setdefault("viabilityTests", []).append(test)
+        return {"accession": accession}
+
+    # Species
+
+    def list_species(self, query, body):
+        return {"species": _sparse(query, self.species.values())}
+
+    def create_species(self, query, body):
+        if self._species_name_exists(body["scientificName"]):
+            raise HttpError(409, "A species with that name already exists.")
+        return {"id": self._add_species(body)}
+
+    def create_species_bulk(self, query, body):
+        results = []
+        for payload in body["species"]:
+            name = payload["scientificName"]
+            if self._species_name_exists(name):
+                results.append({"result": "Duplicate", "scientificName": name})
+            else:
+                species_id = self._add_species(payload)
+                results.append(
+                    {"id": species_id, "result": "Created", "scientificName": name}
+                )
+        return {"results": results}
+
+    def _species_name_exists(self, name: str) -> bool:
+        return any(
+            species["scientificName"] == name for species in self.species.values()
+        )
+
+    def _add_species(self, payload: Dict) -> int:
+        species_id = self.new_id()
+        self.species[species_id] = {**payload, "id": species_id}
+        return species_id
+
+    # Nursery
+
+    def create_batch(self, query, body):
+        batch_id = self.new_id()
+        batch = {**body, "id": batch_id, "batchNumber": f"NB-{batch_id}"}
+        self.batches[batch_id] = batch
+        return {"batch": batch}
+
+    def get_batch(self, query, body, batch_id):
+        return {"batch": self._find(self.batches, batch_id, "Batch")}
+
+    def get_batches(self, query, body):
+        return {"batches": _by_ids(query, self.batches)}
+
+    def withdraw(self, query, body):
+        self.withdrawals += 1
+        return {"withdrawal": {**body, "id": self.new_id()}}
+
+    # Search
+
+    def search(self, query, body):
+        """Return synthetic rows with the requested fields, a page at a time."""
+        offset = int(body.get("cursor") or 0)
+        count = body.get("count") or 25
+        end = min(self.config.search_rows, offset + count)
+        fields = body.get("fields") or ["id"]
+        results = [
+            {field: f"{field}-{row}" for field in fields} for row in range(offset, end)
+        ]
+        cursor = str(end) if end < self.config.search_rows else None
+        return {"results": results, "cursor": cursor}
+
+    # Planting sites and observations
+
+    def list_sites(self, query, body):
+        return {
+            "sites": [
+                {key: value for key, value in site.items() if key != "strata"}
+                for site in self.sites.values()
+            ]
+        }
+
+    def get_site(self, query, body, site_id):
+        return {"site": self._find(self.sites, site_id, "Planting site")}
+
+    def list_observations(self, query, body):
+        return {"observations": _sparse(query, self.observations.values())}
+
+    def get_observation(self, query, body, observation_id):
+        return {
+            "observation": self._find(self.observations, observation_id, "Observation")
+        }
+
+    def list_observation_plots(self, query, body, observation_id):
+        self._find(self.observations, observation_id, "Observation")
+        return {"plots": list(self.plots[int(observation_id)].values())}
+
+    def claim_plot(self, query, body, observation_id, plot_id):
+        plot = self._find(self.plots.get(int(observation_id), {}), plot_id, "Plot")
+        if "completedByUserId" in plot:
+            raise HttpError(409, "The plot has already been completed.")
+        plot["claimedByUserId"] = 1
+        return {"status": "ok"}
+
+    def complete_plot(self, query, body, observation_id, plot_id):
+        plot = self._find(self.plots.get(int(observation_id), {}), plot_id, "Plot")
+        if "completedByUserId" in plot:
+            raise HttpError(409, "The plot has already been completed.")
+        plot["completedByUserId"] = 1
+        return {"status": "ok"}
+
+    def complete_ad_hoc(self, query, body):
+        self._find(self.sites, body["plantingSiteId"], "Planting site")
+        return {"observationId": self.new_id(), "plotId": self.new_id()}
+
+    def _find(self, objects: Dict[int, Dict], object_id, description: str) -> Dict:
+        try:
+            return objects[int(object_id)]
+        except (KeyError, ValueError):
+            raise HttpError(404, f"{description} {object_id} not found")
+
+
+# Routes as (method, path regex, StandInData method name). Path parameters are passed to the
+# method as positional arguments.
+ROUTES: List[Tuple[str, str, str]] = [
+    ("GET", r"/api/v1/users/me", "get_me"),
+    ("GET", r"/api/v1/organizations", "list_organizations"),
+    ("GET", r"/api/v1/facilities", "list_facilities"),
+    ("GET", r"/api/v1/facilities/(\d+)", "get_facility"),
+    ("GET", r"/api/v1/facilities/(\d+)/devices", "list_devices"),
+    ("GET", r"/api/v1/devices", "get_devices"),
+    ("GET", r"/api/v1/devices/(\d+)", "get_device"),
+    ("GET", r"/api/v1/timeseries", "list_timeseries"),
+    ("POST", r"/api/v1/timeseries/create", "create_timeseries"),
+    ("POST", r"/api/v1/timeseries/values", "record_values"),
+    ("POST", r"/api/v1/timeseries/history", "timeseries_history"),
+    ("POST", r"/api/v2/seedbank/accessions", "create_accession"),
+    ("GET", r"/api/v2/seedbank/accessions", "get_accessions"),
+    ("GET", r"/api/v2/seedbank/accessions/(\d+)", "get_accession"),
+    ("PUT", r"/api/v2/seedbank/accessions/(\d+)", "update_accession"),
+    ("DELETE", r"/api/v1/seedbank/accessions/(\d+)", "delete_accession"),
+    ("POST", r"/api/v1/seedbank/accessions/(\d+)/checkIn", "check_in_accession"),
+    (
+        "POST",
+        r"/api/v2/seedbank/accessions/(\d+)/viabilityTests",
+        "create_viability_test",
+    ),
+    ("GET", r"/api/v1/species", "list_species"),
+    ("POST", r"/api/v1/species", "create_species"),
+    ("POST", r"/api/v1/species/bulk", "create_species_bulk"),
+    ("POST", r"/api/v1/nursery/batches", "create_batch"),
+    ("GET", r"/api/v1/nursery/batches", "get_batches"),
+    ("GET", r"/api/v1/nursery/batches/(\d+)", "get_batch"),
+    ("POST", r"/api/v1/nursery/withdrawals", "withdraw"),
+    ("POST", r"/api/v1/search", "search"),
+    ("GET", r"/api/v1/tracking/sites", "list_sites"),
+    ("GET", r"/api/v1/tracking/sites/(\d+)", "get_site"),
+    ("GET", r"/api/v1/tracking/observations", "list_observations"),
+    ("GET", r"/api/v1/tracking/observations/(\d+)", "get_observation"),
+    ("GET", r"/api/v1/tracking/observations/(\d+)/plots", "list_observation_plots"),
+    ("POST", r"/api/v1/tracking/observations/(\d+)/plots/(\d+)/claim", "claim_plot"),
+    ("POST", r"/api/v1/tracking/observations/(\d+)/plots/(\d+)", "complete_plot"),
+    ("POST", r"/api/v1/tracking/observations/adHoc", "complete_ad_hoc"),
+]
+
+# Handlers whose responses have ETags, like the server's reference data endpoints.
+ETAG_HANDLERS = {
+    "get_facility",
+    "get_me",
+    "get_site",
+    "list_facilities",
+    "list_organizations",
+    "list_sites",
+    "list_species",
+}
+
+_COMPILED_ROUTES = [
+    (method, re.compile(pattern + "$"), handler) for method, pattern, handler in ROUTES
+]
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 512
+
+    def __init__(self, address: Tuple[str, int], config: Config):
+        super().__init__(address, StandInRequestHandler)
+        self.config = config
+        self.data = StandInData(config)
+        self.rng = random.Random(config.seed)
+        self.rate_limiter = (
+            RateLimiter(config.rate_limit) if config.rate_limit else None
+        )
+        self.padding = "x" * config.pad_bytes
+        self.counts: Counter = Counter()
+        self.counts_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+    def count(self, key: str):
+        with self.counts_lock:
+            self.counts[key] += 1
+
+    def report(self, file=sys.stdout):
+        """Print the number of responses by route and status."""
+        for key, count in sorted(self.counts.items()):
+            print(f"{count:8d}  {key}", file=file)
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    # Keep connections open between requests like the real server does.
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one packet; otherwise delayed ACKs add ~40ms per request.
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024
+    server: StandInServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.handle_request()
+
+    def do_POST(self):
+        self.handle_request()
+
+    def do_PUT(self):
+        self.handle_request()
+
+    def do_DELETE(self):
+        self.handle_request()
+
+    def handle_request(self):
+        server = self.server
+        config = server.config
+        url = urlsplit(self.path)
+        route = f"{self.command} {route_template(url.path)}"
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+
+        latency = config.route_latency.get(route) or config.route_latency.get(
+            route.split(" ", 1)[1], config.latency
+        )
+        delay = latency.sample(server.rng)
+        if delay:
+            time.sleep(delay)
+
+        if url.path == REALM_PATH + "/protocol/openid-connect/token":
+            form = parse_qs(raw_body.decode())
+            self.respond(route, *self.call(server.data.issue_token, form))
+            return
+
+        if server.rate_limiter and not server.rate_limiter.allow():
+            self.respond_error(route, 429, "Too many requests")
+            return
+        if config.throttle_rate and server.rng.random() < config.throttle_rate:
+            self.respond_error(route, 429, "Too many requests")
+            return
+        if config.error_rate and server.rng.random() < config.error_rate:
+            self.respond_error(route, 500, "Injected failure")
+            return
+        if not self.authenticated():
+            self.respond_error(route, 401, "Not authenticated")
+            return
+
+        for method, pattern, handler_name in _COMPILED_ROUTES:
+            match = pattern.match(url.path)
+            if method == self.command and match:
+                handler = getattr(server.data, handler_name)
+                query = parse_qs(url.query)
+                body = json.loads(raw_body) if raw_body else {}
+                status, payload = self.call(handler, query, body, *match.groups())
+                if (
+                    status == 200
+                    and handler_name == "search"
+                    and "text/csv" in self.headers.get("Accept", "")
+                ):
+                    self.respond_csv(route, payload["results"])
+                else:
+                    self.respond(
+                        route, status, payload, etag=handler_name in ETAG_HANDLERS
+                    )
+                return
+
+        self.respond_error(route, 404, f"No stand-in for {self.command} {url.path}")
+
+    def authenticated(self) -> bool:
+        if "SESSION=" in self.headers.get("Cookie", ""):
+            return True
+        authorization = self.headers.get("Authorization", "")
+        if authorization.startswith("Bearer "):
+            try:
+                claims = read_token_claims(authorization[7:])
+                return claims.get("exp", 0) > time.time()
+            except (IndexError, ValueError):
+                return False
+        return False
+
+    def call(self, handler, *args) -> Tuple[int, Dict]:
+        try:
+            with self.server.data.lock:
+                return 200, handler(*args)
+        except HttpError as ex:
+            return ex.status, {"status": "error", "error": {"message": str(ex)}}
+
+    def respond(self, route: str, status: int, payload: Dict, etag: bool = False):
+        if status == 200:
+            payload = {"status": "ok", **payload}
+            if self.server.padding:
+                payload["padding"] = self.server.padding
+        body = json.dumps(_without_nulls(payload)).encode()
+        if status == 200 and etag:
+            tag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == tag:
+                self.send_body(route, 304, "application/json", b"", tag)
+            else:
+                self.send_body(route, status, "application/json", body, tag)
+        else:
+            self.send_body(route, status, "application/json", body)
+
+    def respond_error(self, route: str, status: int, message: str):
+        self.respond(route, status, {"status": "error", "error": {"message": message}})
+
+    def respond_csv(self, route: str, results: List[Dict]):
+        output = io.StringIO()
+        if results:
+            writer = csv.DictWriter(output, fieldnames=list(results[0].keys()))
+            writer.writeheader()
+            writer.writerows(results)
+        self.send_body(route, 200, "text/csv", output.getvalue().encode())
+
+    def send_body(
+        self,
+        route: str,
+        status: int,
+        content_type: str,
+        body: bytes,
+        etag: Optional[str] = None,
+    ):
+        self.server.count(f"{route} {status}")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _sparse(query: Dict[str, List[str]], elements) -> List[Dict]:
+    """Only include the properties in a fields parameter, as the server's list endpoints do."""
+    fields = {name for value in query.get("fields", []) for name in value.split(",")}
+    if not fields:
+        return list(elements)
+    return [{k: v for k, v in item.items() if k in fields} for item in elements]
+
+
+def _by_ids(query: Dict[str, List[str]], objects: Dict[int, Dict]) -> List[Dict]:
+    """Look up the objects in an id parameter, as the server's multiple-ID endpoints do."""
+    try:
+        ids = {int(item) for value in query.get("id", []) for item in value.split(",")}
+    except ValueError:
+        raise HttpError(400, "IDs must be numeric")
+    if len(ids) > MAX_IDS_PER_REQUEST:
+        raise HttpError(413, f"Request must contain {MAX_IDS_PER_REQUEST} or fewer IDs")
+    return [objects[object_id] for object_id in sorted(ids) if object_id in objects]
+
+
+def _without_nulls(value):
+    """Remove null fields, which the real server leaves out of its responses."""
+    if isinstance(value, dict):
+        return {
+            key: _without_nulls(item) for key, item in value.items() if item is not None
+        }
+    if isinstance(value, list):
+        return [_without_nulls(item) for item in value]
+    return value
+
+
+def run_in_thread(config: Optional[Config] = None, port: int = 0) -> StandInServer:
+    """Start a stand-in server on a background thread. Port 0 picks an unused port.
+
+    Call shutdown() on the returned server to stop it.
+    """
+    server = StandInServer(("127.0.0.1", port), config or Config())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_route_latency(value: str) -> Tuple[str, str]:
+    route, separator, spec = value.rpartition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError("Must be ROUTE=SPEC")
+    LatencyModel(spec)
+    return route, spec
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a stand-in for terraware-server and Keycloak for benchmarking."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Default is 127.0.0.1.")
+    parser.add_argument(
+        "--port",
+        "-p",
+        type=int,
+        default=8080,
+        help="Default is 8080, the same as terraware-server, so the scripts' default "
+        + "server URL works.",
+    )
+    parser.add_argument(
+        "--latency",
+        default="none",
+        help="Latency of every response, e.g., lognormal:20,0.5. Default is none.",
+    )
+    parser.add_argument(
+        "--route-latency",
+        type=parse_route_latency,
+        action="append",
+        default=[],
+        metavar="ROUTE=SPEC",
+        help="Latency of one route. May be specified more than once.",
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of 500 responses."
+    )
+    parser.add_argument(
+        "--throttle-rate", type=float, default=0.0, help="Fraction of 429 responses."
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        help="Requests per second above which requests get 429 responses.",
+    )
+    parser.add_argument("--facilities", type=int, default=2, help="Default is 2.")
+    parser.add_argument(
+        "--devices", type=int, default=3, help="Devices per facility. Default is 3."
+    )
+    parser.add_argument("--species", type=int, default=50, help="Default is 50.")
+    parser.add_argument(
+        "--sites", type=int, default=2, help="Planting sites. Default is 2."
+    )
+    parser.add_argument(
+        "--plots", type=int, default=20, help="Observation plots. Default is 20."
+    )
+    parser.add_argument(
+        "--search-rows",
+        type=int,
+        default=1000,
+        help="Total rows returned by searches, across all pages. Default is 1000.",
+    )
+    parser.add_argument(
+        "--history-interval",
+        type=int,
+        default=300,
+        help="Seconds between timeseries history values. Default is 300.",
+    )
+    parser.add_argument(
+        "--history-max-values",
+        type=int,
+        default=10000,
+        help="Maximum values per timeseries in a history response. Default is 10000.",
+    )
+    parser.add_argument(
+        "--pad-bytes",
+        type=int,
+        default=0,
+        help="Add a field of this many bytes to every successful response.",
+    )
+    parser.add_argument(
+        "--token-lifetime",
+        type=int,
+        default=300,
+        help="Seconds until access tokens expire. Default is 300.",
+    )
+    parser.add_argument(
+        "--seed", type=int, help="Seed for the random number generator."
+    )
+    args = parser.parse_args()
+
+    config = Config(
+        latency=args.latency,
+        route_latency=dict(args.route_latency),
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        rate_limit=args.rate_limit,
+        facilities=args.facilities,
+        devices=args.devices,
+        species=args.species,
+        sites=args.sites,
+        plots=args.plots,
+        search_rows=args.search_rows,
+        history_interval=args.history_interval,
+        history_max_values=args.history_max_values,
+        pad_bytes=args.pad_bytes,
+        token_lifetime=args.token_lifetime,
+        seed=args.seed,
+    )
+    server = StandInServer((args.host, args.port), config)
+    print(f"Listening on {server.url}", flush=True)
+    print(f"Refresh token: {server.data.refresh_token(server.url)}", flush=True)
+
+    # Print the report when stopped by a benchmark harness, not just by control-C.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.report()
+
+
+if __name__ == "__main__":
+    main()
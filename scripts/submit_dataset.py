@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import argparse
+from itertools import islice
+from typing import Callable, Dict
+
+from client import TerrawareClient, add_terraware_args, client_from_args
+from datasets import read_manifest, read_records
+from pipeline import Pipeline, Stage
+
+
+def submit_accession(client: TerrawareClient, record: Dict):
+    return client.create_accession(record["payload"])
+
+
+def submit_ad_hoc(client: TerrawareClient, record: Dict):
+    return client.complete_ad_hoc_observation(record["payload"])
+
+
+def submit_batch(client: TerrawareClient, record: Dict):
+    return client.create_seedling_batch(record["payload"])
+
+
+def submit_plot(client: TerrawareClient, record: Dict):
+    client.claim_observation_plot(record["observationId"], record["plotId"])
+    return client.complete_observation(
+        record["observationId"], record["plotId"], record["payload"]
+    )
+
+
+SUBMITTERS: Dict[str, Callable[[TerrawareClient, Dict], Dict]] = {
+    "accession": submit_accession,
+    "adHoc": submit_ad_hoc,
+    "batch": submit_batch,
+    "plot": submit_plot,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Submit the records of a dataset written by generate_dataset.py."
+    )
+    parser.add_argument("directory", help="Directory containing the dataset.")
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=8,
+        help="Number of concurrent requests. Default is 8.",
+    )
+    parser.add_argument(
+        "--skip", type=int, default=0, help="Skip this many records at the start."
+    )
+    parser.add_argument(
+        "--limit", type=int, help="Submit at most this many records. Default is all."
+    )
+    add_terraware_args(parser)
+    args = parser.parse_args()
+
+    manifest = read_manifest(args.directory)
+    submit = SUBMITTERS[manifest["kind"]]
+    client = client_from_args(args, pool_size=args.workers)
+
+    def on_error(record: Dict, ex: Exception):
+        print(f"Record {record['index']} failed: {ex}")
+
+    records = islice(
+        read_records(args.directory, manifest),
+        args.skip,
+        args.skip + args.limit if args.limit else None,
+    )
+    pipeline = Pipeline(
+        [
+            Stage(
+                manifest["kind"],
+                lambda record: submit(client, record),
+                args.workers,
+                on_error,
+            )
+        ]
+    )
+
+    for _ in pipeline.results(records):
+        pass
+
+    pipeline.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the scripts in this directory.
+
+    ./terraware.py <command> [arguments]
+
+runs one of the scripts with the given arguments, the same as running the script directly.
+A command's module, and the modules it depends on such as requests, are only imported when
+the command runs, so listing the commands is quick.
+
+    ./terraware.py batch [--file FILE] [options]
+
+reads commands from a file, or from standard input, one per line, and runs them all in the
+same process. Modules are imported once and the access token from the first command is
+reused by the rest, which avoids most of the per-command startup cost when running a long
+series of commands. Other options are added to every command, so authentication options
+only need to be given once. If standard input is a terminal, this acts as an interactive
+prompt.
+"""
+
+import argparse
+import importlib
+import shlex
+import sys
+import time
+import traceback
+from typing import List
+
+# Command names, the modules that implement them, and their descriptions. The descriptions
+# are duplicated here so the list can be shown without importing every module.
+COMMANDS = {
+    "accessions": ("create_accessions", "Create test accessions"),
+    "batches": ("create_batches", "Create test seedling batches"),
+    "bench-transports": ("bench_transports", "Compare HTTP libraries' performance"),
+    "edit-accession": ("edit_accession", "Update existing accessions"),
+    "fanout": ("fanout", "Seed data at many facilities using all CPUs"),
+    "generate-dataset": ("generate_dataset", "Generate a reproducible dataset"),
+    "observe": ("observe", "Complete observations of monitoring plots"),
+    "observe-ad-hoc": ("observe_ad_hoc", "Complete ad-hoc observations"),
+    "replay": ("replay", "Replay captured traffic"),
+    "search": ("search", "Run searches"),
+    "simulate": ("simulate", "Simulate a mix of production traffic"),
+    "species": ("create_species", "Add species to an organization"),
+    "standin": ("standin", "Run a stand-in server for benchmarks"),
+    "submit-dataset": ("submit_dataset", "Submit a generated dataset"),
+    "timeseries": ("timeseries", "Generate or import timeseries data"),
+    "withdraw": ("withdraw_to_substrata", "Withdraw plants to planting substrata"),
+}
+
+
+def usage() -> str:
+    lines = [
+        "usage: terraware.py [--timings] <command> [arguments]",
+        "       terraware.py [--timings] batch [--file FILE] [command options]",
+        "",
+        "commands:",
+    ]
+    for name, (_, description) in COMMANDS.items():
+        lines.append(f"  {name:18s}{description}")
+    lines.append("")
+    lines.append("Run terraware.py <command> --help for the command's arguments.")
+    return "\n".join(lines)
+
+
+def run_command(argv: List[str], timings: bool) -> int:
+    """Run a command in this process and return its exit status."""
+    name = argv[0]
+    if name not in COMMANDS:
+        print(f"Unknown command {name}", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    module = importlib.import_module(COMMANDS[name][0])
+    imported = time.perf_counter()
+
+    # The scripts parse their arguments from sys.argv.
+    sys.argv = [f"terraware.py {name}"] + argv[1:]
+    try:
+        module.main()
+        status = 0
+    except SystemExit as ex:
+        status = ex.code if isinstance(ex.code, int) else (1 if ex.code else 0)
+    except KeyboardInterrupt:
+        raise
+    except Exception:
+        traceback.print_exc()
+        status = 1
+
+    if timings:
+        finished = time.perf_counter()
+        print(
+            f"{name}: import {(imported - start) * 1000:.0f}ms, "
+            + f"run {(finished - imported) * 1000:.0f}ms",
+            file=sys.stderr,
+        )
+
+    return status
+
+
+def run_batch(argv: List[str], timings: bool) -> int:
+    """Run commands from a file or standard input. Returns the number that failed."""
+    parser = argparse.ArgumentParser(
+        prog="terraware.py batch",
+        description="Run a series of commands in one process.",
+    )
+    parser.add_argument(
+        "--file",
+        help="File of commands, one per line. Default is to read standard input.",
+    )
+    parser.add_argument(
+        "--stop-on-error",
+        action="store_true",
+        help="Stop at the first command that fails. Default is to run all the commands.",
+    )
+    args, common_args = parser.parse_known_args(argv)
+
+    interactive = args.file is None and sys.stdin.isatty()
+    fp = open(args.file) if args.file else sys.stdin
+    failures = 0
+
+    try:
+        while True:
+            if interactive:
+                try:
+                    line = input("terraware> ")
+                except EOFError:
+                    print()
+                    break
+            else:
+                line = fp.readline()
+                if not line:
+                    break
+
+            words = shlex.split(line, comments=True)
+            if not words:
+                continue
+            if words[0] in ("exit", "quit"):
+                break
+            if words[0] == "help":
+                print(usage())
+                continue
+
+            if run_command(words[:1] + common_args + words[1:], timings):
+                failures += 1
+                if args.stop_on_error:
+                    break
+    finally:
+        if args.file:
+            fp.close()
+
+    return failures
+
+
+def main():
+    start = time.perf_counter()
+    argv = sys.argv[1:]
+
+    timings = "--timings" in argv[:1]
+    if timings:
+        argv = argv[1:]
+
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0
+
+    if argv[0] == "batch":
+        status = 1 if run_batch(argv[1:], timings) else 0
+    else:
+        status = run_command(argv, timings)
+
+    if timings:
+        print(f"total: {(time.perf_counter() - start) * 1000:.0f}ms", file=sys.stderr)
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,50 +2,92 @@
 import argparse
 from datetime import datetime, timezone
 import json
-import random
 import sys
 import time
+
+import requests
+
 from client import add_terraware_args, client_from_args
+from signals import MODELS, SignalModel, create_model, format_value, series_rng
+from spool import DEFAULT_MAX_BYTES, Spool, SpoolDrainer
+from timeseries_import import CsvImporter, parse_mapping
 
 # Default to 30 days of data for new timeseries.
 DEFAULT_SECONDS = 30 * 24 * 60 * 60
 
 
+# Each timeseries has a signal model from signals.py, which can take additional parameters
+# besides min and max.
 timeseries_config = {
     ("OmniSense", "S-11"): {
         "interval": 300,
         "timeseries": {
-            "temperature": {"min": -10, "max": 30},
-            "humidity": {"min": 0, "max": 30},
+            "temperature": {"min": -10, "max": 30, "model": "diurnal"},
+            "humidity": {"min": 0, "max": 30, "model": "diurnal", "peak_hour": 4},
         },
     },
     ("Blue Ion", "LV"): {
         "interval": 30,
         "timeseries": {
-            "system_current": {"min": 60, "max": 120},
-            "system_power": {"min": 100, "max": 5000},
-            "system_voltage": {"min": 53, "max": 56},
-            "relative_state_of_charge": {"min": 80, "max": 100},
-            "state_of_health": {"min": 90, "max": 100},
+            "system_current": {"min": 60, "max": 120, "model": "random_walk"},
+            "system_power": {
+                "min": 100,
+                "max": 5000,
+                "model": "diurnal",
+                "peak_hour": 12,
+                "noise": 0.1,
+                "dropout": 0.0005,
+            },
+            "system_voltage": {"min": 53, "max": 56, "model": "random_walk"},
+            "relative_state_of_charge": {
+                "min": 80,
+                "max": 100,
+                "model": "random_walk",
+                "volatility": 0.005,
+            },
+            "state_of_health": {"min": 90, "max": 100, "model": "step"},
         },
     },
     ("Blue Ion", "LX-HV"): {
         "interval": 30,
         "timeseries": {
-            "BMU Status": {"min": 19070977, "max": 19070977},
-            "current": {"min": -0.5, "max": 0.5},
-            "Cycle Count": {"min": 313, "max": 313},
-            "dc_voltage": {"min": 530, "max": 540},
-            "relative_state_of_charge": {"min": 80, "max": 100},
-            "state_of_health": {"min": 90, "max": 100},
-            "system_power": {"min": 100, "max": 5000},
+            "BMU Status": {"min": 19070977, "max": 19070977, "model": "step"},
+            "current": {"min": -0.5, "max": 0.5, "model": "random_walk"},
+            "Cycle Count": {"min": 313, "max": 313, "model": "counter"},
+            "dc_voltage": {"min": 530, "max": 540, "model": "random_walk"},
+            "relative_state_of_charge": {
+                "min": 80,
+                "max": 100,
+                "model": "random_walk",
+                "volatility": 0.005,
+            },
+            "state_of_health": {"min": 90, "max": 100, "model": "step"},
+            "system_power": {
+                "min": 100,
+                "max": 5000,
+                "model": "diurnal",
+                "peak_hour": 12,
+                "noise": 0.1,
+                "dropout": 0.0005,
+            },
         },
     },
     ("Victron", "Cerbo GX"): {
         "interval": 30,
         "timeseries": {
-            "relative_state_of_charge": {"min": 80, "max": 100},
-            "system_power": {"min": 100, "max": 5000},
+            "relative_state_of_charge": {
+                "min": 80,
+                "max": 100,
+                "model": "random_walk",
+                "volatility": 0.005,
+            },
+            "system_power": {
+                "min": 100,
+                "max": 5000,
+                "model": "diurnal",
+                "peak_hour": 12,
+                "noise": 0.1,
+            },
         },
     },
 }
@@ -69,27 +111,20 @@ def values_for_time_range(
     start_time: int,
     end_time: int,
     interval: int,
-    min_value: float,
-    max_value: float,
+    model: SignalModel,
     size: int = 1000,
 ):
-    multiple = max_value - min_value
-
-    values = []
-    for timestamp in range(start_time, end_time, interval):
-        value = str(random.random() * multiple + min_value)
-        values.append(
-            {
-                "timestamp": isoformat(timestamp),
-                "value": value,
-            }
+    for batch_start in range(start_time, end_time, interval * size):
+        timestamps = list(
+            range(batch_start, min(batch_start + interval * size, end_time), interval)
         )
-        if len(values) >= size:
+        values = [
+            {"timestamp": isoformat(timestamp), "value": format_value(value)}
+            for timestamp, value in zip(timestamps, model.generate(timestamps))
+            if value is not None
+        ]
+        if values:
             yield values
-            values = []
-
-    if values:
-        yield values
 
 
 def timeseries_values_payload(
@@ -98,18 +133,23 @@ def timeseries_values_payload(
     start_time: int,
     end_time: int,
     interval: int,
-    min_value: float,
-    max_value: float,
+    model: SignalModel,
 ):
     return [
         {"deviceId": device["id"], "timeseriesName": name, "values": values}
-        for values in values_for_time_range(
-            start_time, end_time, interval, min_value, max_value
-        )
+        for values in values_for_time_range(start_time, end_time, interval, model)
     ]
 
 
-def record_values_payloads(device, config, latest_times, default_start_time, end_time):
+def record_values_payloads(
+    device,
+    config,
+    latest_times,
+    default_start_time,
+    end_time,
+    seed=None,
+    model_name=None,
+):
     for name, params in config["timeseries"].items():
         # If we're adding to existing values, use the next timestamp after the most
         # recent one.
@@ -119,14 +159,16 @@ def record_values_payloads(device, config, latest_times, default_start_time, end
             timeseries_start_time = default_start_time
 
         if timeseries_start_time <= end_time:
+            model = create_model(
+                params, series_rng(seed, device["id"], name), model_name
+            )
             for element in timeseries_values_payload(
                 device,
                 name,
                 timeseries_start_time,
                 end_time,
                 config["interval"],
-                params["min"],
-                params["max"],
+                model,
             ):
                 yield {"timeseries": [element]}
 
@@ -167,6 +209,148 @@ def get_latest_value_times(client, device):
     }
 
 
+def generate_values(client, args, spool):
+    """Generate random values for every known device at the selected facilities."""
+    if args.device:
+        devices = client.get_devices(args.device, require_all=True)
+    else:
+        if args.facility:
+            facilities = args.facility
+        else:
+            facilities = [facility["id"] for facility in client.list_facilities(["id"])]
+
+        devices = [
+            device
+            for facility_id in facilities
+            for device in client.list_devices(facility_id)
+        ]
+
+    end_time = parse_iso_datetime(args.end_time) if args.end_time else int(time.time())
+    start_time = end_time - args.seconds
+
+    for device in devices:
+        config = timeseries_config.get((device["make"], device["model"]))
+        if not config:
+            if args.verbose:
+                print(f"Skipping unknown device {device['make']} {device['model']}")
+            continue
+
+        if args.verbose:
+            print(f"Device {device['id']} ({device['make']} {device['model']})")
+
+        try:
+            create_missing_timeseries(
+                client, device["id"], config, args.dry_run, args.verbose
+            )
+
+            if args.ignore_existing:
+                latest_times = {}
+            else:
+                latest_times = get_latest_value_times(client, device)
+        except requests.exceptions.ConnectionError:
+            if not spool:
+                raise
+            # Without the server, we can't create timeseries or find out which values it
+            # already has. Only continue the timeseries an earlier run spooled values for:
+            # they were created on the server then, and the spool knows where they left off.
+            spooled_times = spool.latest_times(device["id"])
+            if not spooled_times:
+                print(
+                    f"Server unreachable; skipping device {device['id']}, which has no "
+                    "spooled values to continue from"
+                )
+                continue
+            print(f"Server unreachable; spooling values for device {device['id']}")
+            config = {
+                **config,
+                "timeseries": {
+                    name: params
+                    for name, params in config["timeseries"].items()
+                    if name in spooled_times
+                },
+            }
+            latest_times = {}
+
+        if spool and not args.ignore_existing:
+            # Don't regenerate values that are still waiting in the spool.
+            for name, timestamp in spool.latest_times(device["id"]).items():
+                latest_times[name] = max(timestamp, latest_times.get(name, 0))
+
+        for payload in record_values_payloads(
+            device,
+            config,
+            latest_times,
+            start_time,
+            end_time,
+            args.seed,
+            args.model,
+        ):
+            if args.verbose:
+                for ts in payload["timeseries"]:
+                    print(
+                        f"Timeseries {ts['timeseriesName']}: {len(ts['values'])} values"
+                    )
+            if spool:
+                spool.append(payload)
+            elif not args.dry_run:
+                response = client.record_values(payload)
+                if args.verbose:
+                    print(f"Response: {json.dumps(response)}")
+
+
+def import_csv(client, args, spool):
+    """Import real sensor readings from a CSV file instead of generating values."""
+    mappings = [parse_mapping(spec) for spec in args.map or []]
+    if not mappings:
+        raise Exception("--import requires at least one --map COLUMN=DEVICE_ID:NAME")
+
+    importer = CsvImporter(
+        args.import_file,
+        args.timestamp_column,
+        mappings,
+        batch_values=args.batch_values,
+        workers=args.workers,
+    )
+
+    for device_id in sorted({mapping.device_id for mapping in mappings}):
+        config = {
+            "timeseries": {
+                mapping.timeseries_name: {}
+                for mapping in mappings
+                if mapping.device_id == device_id
+            }
+        }
+        create_missing_timeseries(client, device_id, config, args.dry_run, args.verbose)
+
+    start = time.monotonic()
+    total_values = 0
+    failed_values = 0
+
+    for payload in importer.payloads():
+        num_values = sum(len(ts["values"]) for ts in payload["timeseries"])
+        total_values += num_values
+        if args.verbose:
+            print(f"Payload with {num_values} values")
+        if spool:
+            spool.append(payload)
+        elif not args.dry_run:
+            response = client.record_values(payload)
+            for failure in response.get("failures") or []:
+                failed_values += len(failure["values"])
+                if args.verbose:
+                    print(f"Failure: {failure['message']}")
+
+    elapsed = time.monotonic() - start
+    print(
+        f"Imported {total_values} values in {elapsed:.1f} seconds "
+        f"({total_values / max(elapsed, 0.001):.0f} values/sec)"
+    )
+    if failed_values:
+        print(f"{failed_values} values were not recorded")
+    if importer.bad_rows:
+        print(f"Skipped {importer.bad_rows} rows with unparseable timestamps")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Generate dummy timeseries data.")
     parser.add_argument(
@@ -207,6 +391,75 @@ def main():
         help="Generate this many seconds of initial data for new timeseries. "
         + "Default is 30 days.",
     )
+    parser.add_argument(
+        "--import",
+        dest="import_file",
+        metavar="FILE",
+        help="Import real sensor readings from a CSV file rather than generating random "
+        + "values. The file must have a header row. Use --map to say which columns to import.",
+    )
+    parser.add_argument(
+        "--map",
+        action="append",
+        metavar="COLUMN=DEVICE_ID:NAME",
+        help="With --import, record the values in a CSV column to a device's timeseries. "
+        + "May be specified multiple times.",
+    )
+    parser.add_argument(
+        "--timestamp-column",
+        default="timestamp",
+        help="With --import, the name of the CSV column with ISO 8601 or Unix timestamps. "
+        + "Default is %(default)s.",
+    )
+    parser.add_argument(
+        "--batch-values",
+        type=int,
+        default=10000,
+        help="With --import, maximum number of values per request. Default is %(default)s.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="With --import, number of processes to parse the file. Default is the number "
+        + "of CPUs.",
+    )
+    parser.add_argument(
+        "--model",
+        choices=sorted(MODELS.keys()),
+        help="Generate values for every timeseries using this signal model. Default is to "
+        + "use each timeseries' model from timeseries_config.",
+    )
+    parser.add_argument(
+        "--end-time",
+        help="Generate values up to this ISO 8601 time rather than the current time. Use "
+        + "with --seed and --ignore-existing to generate identical data sets.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Random seed. Runs with the same seed and time range generate the same values.",
+    )
+    parser.add_argument(
+        "--spool",
+        metavar="DIR",
+        help="Write values to a local spool directory first and deliver them from there. "
+        + "Values the server can't accept yet (because it's unreachable or the facility "
+        + "isn't configured) stay in the spool and are retried by later runs.",
+    )
+    parser.add_argument(
+        "--spool-max-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Maximum disk space used by the spool. The oldest values are discarded if "
+        + "it fills up. Default is %(default)s.",
+    )
+    parser.add_argument(
+        "--drain-timeout",
+        type=float,
+        default=60,
+        help="With --spool, how many seconds to keep trying to deliver spooled values "
+        + "before exiting. Default is %(default)s.",
+    )
     parser.add_argument(
         "--verbose", "-v", action="store_true", help="Print payload contents."
     )
@@ -216,54 +469,30 @@ def main():
 
     client = client_from_args(args)
 
-    if args.device:
-        devices = [client.get_device(id) for id in args.device]
+    if args.spool and not args.dry_run:
+        spool = Spool(args.spool, max_bytes=args.spool_max_mb * 1024 * 1024)
+        drainer = SpoolDrainer(client, spool, verbose=args.verbose)
+        drainer.start()
     else:
-        if args.facility:
-            facilities = args.facility
-        else:
-            facilities = [facility["id"] for facility in client.list_facilities()]
+        spool = None
+        drainer = None
 
-        devices = [
-            device
-            for facility_id in facilities
-            for device in client.list_devices(facility_id)
-        ]
-
-    end_time = int(time.time())
-    start_time = end_time - args.seconds
-
-    for device in devices:
-        config = timeseries_config.get((device["make"], device["model"]))
-        if not config:
-            if args.verbose:
-                print(f"Skipping unknown device {device['make']} {device['model']}")
-            continue
+    if args.import_file:
+        import_csv(client, args, spool)
+    else:
+        generate_values(client, args, spool)
 
+    if spool and drainer:
+        drainer.finish(args.drain_timeout)
+        spool.close()
         if args.verbose:
-            print(f"Device {device['id']} ({device['make']} {device['model']})")
-
-        create_missing_timeseries(
-            client, device["id"], config, args.dry_run, args.verbose
-        )
-
-        if args.ignore_existing:
-            latest_times = {}
-        else:
-            latest_times = get_latest_value_times(client, device)
-
-        for payload in record_values_payloads(
-            device, config, latest_times, start_time, end_time
-        ):
-            if args.verbose:
-                for ts in payload["timeseries"]:
-                    print(
-                        f"Timeseries {ts['timeseriesName']}: {len(ts['values'])} values"
-                    )
-            if not args.dry_run:
-                response = client.record_values(payload)
-                if args.verbose:
-                    print(f"Response: {json.dumps(response)}")
+            print(
+                f"Delivered {drainer.values_sent} spooled values in "
+                f"{drainer.requests_sent} requests"
+            )
+        remaining = spool.total_bytes()
+        if remaining:
+            print(f"{remaining} bytes of values remain in the spool for the next run")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,232 @@
+"""
+Import timeseries values from CSV files of real sensor readings.
+
+The input is a "wide" CSV file with a header row, one timestamp column, and one column per
+sensor reading. Each reading column is mapped to a device ID and timeseries name. Files can
+be far larger than memory: they're split into byte ranges that are parsed in parallel by a
+pool of worker processes, and only a bounded number of parsed chunks are held at once.
+
+Quoted values may not contain newlines, since chunk boundaries are found by searching for
+line breaks.
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+import csv
+from datetime import datetime, timezone
+import os
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from spool import MAX_TIMESERIES_PER_REQUEST
+
+DEFAULT_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+class ColumnMapping(NamedTuple):
+    column: str
+    device_id: int
+    timeseries_name: str
+
+
+def parse_mapping(spec: str) -> ColumnMapping:
+    """Parse a mapping of the form COLUMN=DEVICE_ID:TIMESERIES_NAME."""
+    try:
+        column, target = spec.split("=", 1)
+        device_id, timeseries_name = target.split(":", 1)
+        return ColumnMapping(column, int(device_id), timeseries_name)
+    except ValueError:
+        raise ValueError(
+            f"Invalid column mapping '{spec}'; expected COLUMN=DEVICE_ID:TIMESERIES_NAME"
+        )
+
+
+def read_header(path: str) -> Tuple[List[str], int]:
+    """Return the column names and the byte offset where the data rows start."""
+    with open(path, "rb") as fp:
+        header_line = fp.readline()
+        return next(csv.reader([header_line.decode("utf-8-sig")])), fp.tell()
+
+
+def split_ranges(path: str, start: int, chunk_bytes: int) -> Iterator[Tuple[int, int]]:
+    size = os.path.getsize(path)
+    for offset in range(start, size, chunk_bytes):
+        yield offset, min(offset + chunk_bytes, size)
+
+
+def read_lines(path: str, start: int, end: int, data_start: int) -> List[str]:
+    """Read the lines that begin within a byte range of the file.
+
+    A line that straddles the start of the range belongs to the previous range.
+    """
+    with open(path, "rb") as fp:
+        fp.seek(start)
+        if start > data_start:
+            fp.seek(start - 1)
+            fp.readline()
+        lines = []
+        while fp.tell() < end:
+            line = fp.readline()
+            if not line:
+                break
+            lines.append(line.decode("utf-8"))
+        return lines
+
+
+def parse_timestamps(raw_values: List[str]) -> List[Optional[str]]:
+    """Convert a batch of timestamps to ISO 8601 UTC strings.
+
+    Accepts ISO 8601 (timestamps without an offset are treated as UTC) and numeric Unix
+    timestamps in seconds or milliseconds. The format is detected once per batch rather than
+    per value, and values that can't be parsed come back as None.
+    """
+    sample = next((raw for raw in raw_values if raw), "")
+    numeric = sample.replace(".", "", 1).isdigit()
+
+    results: List[Optional[str]] = []
+    for raw in raw_values:
+        try:
+            if numeric:
+                seconds = float(raw)
+                if seconds > 1e11:
+                    seconds /= 1000
+                parsed = datetime.fromtimestamp(seconds, timezone.utc)
+            else:
+                parsed = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+                if parsed.tzinfo is None:
+                    parsed = parsed.replace(tzinfo=timezone.utc)
+            results.append(
+                parsed.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+            )
+        except ValueError:
+            results.append(None)
+    return results
+
+
+def parse_chunk(
+    path: str,
+    start: int,
+    end: int,
+    data_start: int,
+    timestamp_index: int,
+    mappings: List[Tuple[int, int, str]],
+) -> Tuple[Dict[Tuple[int, str], List[Dict[str, str]]], int]:
+    """Parse one byte range of the file into values grouped by (device, timeseries).
+
+    Runs in a worker process. Returns the grouped values and the number of rows that had an
+    unparseable timestamp.
+    """
+    rows = list(csv.reader(read_lines(path, start, end, data_start)))
+    timestamps = parse_timestamps(
+        [row[timestamp_index] if len(row) > timestamp_index else "" for row in rows]
+    )
+
+    values: Dict[Tuple[int, str], List[Dict[str, str]]] = {
+        (device_id, name): [] for _, device_id, name in mappings
+    }
+    bad_rows = 0
+
+    for row, timestamp in zip(rows, timestamps):
+        if timestamp is None:
+            bad_rows += 1
+            continue
+        for index, device_id, name in mappings:
+            if index < len(row):
+                value = row[index].strip()
+                if value:
+                    values[(device_id, name)].append(
+                        {"timestamp": timestamp, "value": value}
+                    )
+
+    return values, bad_rows
+
+
+def payloads_from_values(
+    values: Dict[Tuple[int, str], List[Dict[str, str]]], batch_values: int
+) -> Iterator[Dict]:
+    """Pack grouped values into record_values payloads of at most batch_values values."""
+    entries: List[Dict] = []
+    count = 0
+
+    for (device_id, name), series_values in values.items():
+        for offset in range(0, len(series_values), batch_values):
+            chunk = series_values[offset : offset + batch_values]
+            if entries and (
+                count + len(chunk) > batch_values
+                or len(entries) >= MAX_TIMESERIES_PER_REQUEST
+            ):
+                yield {"timeseries": entries}
+                entries = []
+                count = 0
+            entries.append(
+                {"deviceId": device_id, "timeseriesName": name, "values": chunk}
+            )
+            count += len(chunk)
+
+    if entries:
+        yield {"timeseries": entries}
+
+
+class CsvImporter:
+    """Streams a CSV file through a process pool and yields packed payloads in file order."""
+
+    def __init__(
+        self,
+        path: str,
+        timestamp_column: str,
+        mappings: List[ColumnMapping],
+        batch_values: int = 10000,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        workers: Optional[int] = None,
+    ):
+        self.path = path
+        self.batch_values = batch_values
+        self.chunk_bytes = chunk_bytes
+        self.workers = workers or os.cpu_count() or 1
+        self.bad_rows = 0
+
+        header, self.data_start = read_header(path)
+        columns = {name.strip(): index for index, name in enumerate(header)}
+
+        missing = [
+            name
+            for name in [timestamp_column] + [m.column for m in mappings]
+            if name not in columns
+        ]
+        if missing:
+            raise ValueError(f"Columns not found in {path}: {', '.join(missing)}")
+
+        self.timestamp_index = columns[timestamp_column]
+        self.mappings = [
+            (columns[m.column], m.device_id, m.timeseries_name) for m in mappings
+        ]
+
+    def payloads(self) -> Iterator[Dict]:
+        # Keep a couple of chunks per worker in flight so the workers stay busy without
+        # parsing arbitrarily far ahead of the submitter.
+        max_pending = self.workers * 2
+        pending: List[Future] = []
+
+        with ProcessPoolExecutor(self.workers) as executor:
+            for start, end in split_ranges(
+                self.path, self.data_start, self.chunk_bytes
+            ):
+                pending.append(
+                    executor.submit(
+                        parse_chunk,
+                        self.path,
+                        start,
+                        end,
+                        self.data_start,
+                        self.timestamp_index,
+                        self.mappings,
+                    )
+                )
+                if len(pending) >= max_pending:
+                    yield from self._payloads_for(pending.pop(0))
+
+            while pending:
+                yield from self._payloads_for(pending.pop(0))
+
+    def _payloads_for(self, future: Future) -> Iterator[Dict]:
+        values, bad_rows = future.result()
+        self.bad_rows += bad_rows
+        yield from payloads_from_values(values, self.batch_values)
@@ -0,0 +1,164 @@
+"""
+Interchangeable HTTP libraries for TerrawareClient.
+
+    requests  requests.Session; the default
+    urllib3   urllib3's connection pool directly, skipping requests' per-request overhead
+    http2     httpx, which multiplexes concurrent requests over a single HTTP/2 connection
+              when the server supports it. Requires `pip install 'httpx[http2]'`. HTTP/2 is
+              negotiated via TLS, so plain http:// URLs use HTTP/1.1 unless the server is
+              known to accept HTTP/2 without TLS; see Http2Transport.
+
+Whatever the library, responses are requests.Response objects and network failures raise
+requests.exceptions.ConnectionError, so callers don't need to know which one is in use.
+
+pool_size is the number of connections each transport keeps open. If block is true, it's
+also the maximum number of connections, and requests wait for a free connection rather
+than opening a new one; use that to see how a client behaves behind a load balancer that
+limits connections.
+"""
+
+import abc
+import json
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import requests
+import requests.adapters
+import urllib3
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+class Transport(abc.ABC):
+    @abc.abstractmethod
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        json: Any = None,
+        data: Any = None,
+    ) -> requests.Response:
+        pass
+
+
+class RequestsTransport(Transport):
+    def __init__(self, pool_size: int = 10, block: bool = False):
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, pool_block=block
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, url, headers=None, json=None, data=None):
+        return self.session.request(method, url, headers=headers, json=json, data=data)
+
+
+def _encode_body(
+    headers: Optional[Dict[str, str]], json_body: Any, data: Any
+) -> Tuple[Dict[str, str], Any]:
+    """Return the headers and body to send, the same way requests would encode them."""
+    headers = dict(headers or {})
+    if json_body is not None:
+        headers.setdefault("Content-Type", "application/json")
+        return headers, json.dumps(json_body).encode()
+    if isinstance(data, str):
+        return headers, data.encode()
+    if data is not None and not isinstance(data, bytes) and hasattr(data, "__len__"):
+        # A streamed body such as client._MultipartFile that knows its size.
+        headers.setdefault("Content-Length", str(len(data)))
+    return headers, data
+
+
+def _build_response(
+    url: str, status: int, reason: str, headers: Mapping[str, str], content: bytes
+) -> requests.Response:
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response.reason = reason
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = content
+    return response
+
+
+class Urllib3Transport(Transport):
+    def __init__(self, pool_size: int = 10, block: bool = False):
+        # Follow redirects like requests does, but don't retry failed requests, which
+        # requests also doesn't do by default.
+        retries = urllib3.Retry(
+            total=None, connect=0, read=0, status=0, other=0, redirect=10
+        )
+        self.pool = urllib3.PoolManager(maxsize=pool_size, block=block, retries=retries)
+
+    def request(self, method, url, headers=None, json=None, data=None):
+        headers, body = _encode_body(headers, json, data)
+        try:
+            r = self.pool.request(method, url, headers=headers, body=body)
+        except urllib3.exceptions.HTTPError as ex:
+            raise requests.exceptions.ConnectionError(ex)
+        return _build_response(url, r.status, r.reason or "", r.headers, r.data)
+
+
+class Http2Transport(Transport):
+    def __init__(
+        self, pool_size: int = 10, block: bool = False, prior_knowledge: bool = False
+    ):
+        """If prior_knowledge is true, use HTTP/2 even for http:// URLs.
+
+        Only do that with servers that are known to accept HTTP/2 without TLS; others will
+        reject the requests.
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise Exception(
+                "The http2 transport requires httpx: pip install 'httpx[http2]'"
+            )
+
+        self.httpx = httpx
+        limits = httpx.Limits(
+            max_connections=pool_size if block else None,
+            max_keepalive_connections=pool_size,
+        )
+        self.client = httpx.Client(
+            http1=not prior_knowledge,
+            http2=True,
+            limits=limits,
+            timeout=None,
+            follow_redirects=True,
+        )
+
+    def request(self, method, url, headers=None, json=None, data=None):
+        headers, body = _encode_body(headers, json, data)
+        try:
+            r = self.client.request(method, url, headers=headers, content=body)
+        except self.httpx.TransportError as ex:
+            raise requests.exceptions.ConnectionError(ex)
+        return _build_response(
+            str(r.url), r.status_code, r.reason_phrase, r.headers, r.content
+        )
+
+
+class H2cTransport(Http2Transport):
+    """HTTP/2 without TLS ("h2c") for http:// URLs, using prior knowledge.
+
+    Only use this with servers that are known to accept HTTP/2 on plain connections, such as
+    a local terraware-server with HTTP/2 enabled; others will reject the requests.
+    """
+
+    def __init__(self, pool_size: int = 10, block: bool = False):
+        super().__init__(pool_size, block, prior_knowledge=True)
+
+
+TRANSPORTS = {
+    "h2c": H2cTransport,
+    "http2": Http2Transport,
+    "requests": RequestsTransport,
+    "urllib3": Urllib3Transport,
+}
+
+
+def create_transport(name: str, pool_size: int = 10, block: bool = False) -> Transport:
+    return TRANSPORTS[name](pool_size, block)
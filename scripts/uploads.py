@@ -0,0 +1,79 @@
+"""
+Helpers for the server's file upload endpoints.
+
+Uploads of accessions, seedling batches, and species lists all work the same way: the client
+uploads a CSV file and gets back an upload ID, the server validates and imports the file in
+the background, and the client polls the upload's status. If the file would overwrite
+existing data, the upload waits for the client to say whether to do so.
+"""
+
+import os
+import tempfile
+import time
+from typing import IO, Callable, Dict, Optional, Tuple
+
+AWAITING_USER_ACTION = "Awaiting User Action"
+
+FINISHED_STATUSES = {
+    "Completed",
+    "Invalid",
+    "Processing Failed",
+    "Receiving Failed",
+}
+
+
+def write_and_upload(
+    render: Callable[[IO], None],
+    upload: Callable[[str], int],
+    prefix: str,
+    keep_file: Optional[str] = None,
+) -> Tuple[int, Dict[str, float]]:
+    """Write a CSV file and upload it.
+
+    The file is written to disk rather than memory so its size isn't limited by available
+    memory; it's deleted after uploading unless keep_file is set. Returns the upload ID and
+    how long rendering and uploading took.
+    """
+    timings = {}
+    start = time.monotonic()
+
+    if keep_file:
+        path = keep_file
+    else:
+        fd, path = tempfile.mkstemp(prefix=prefix, suffix=".csv")
+        os.close(fd)
+
+    try:
+        with open(path, "w", newline="", encoding="utf-8") as fp:
+            render(fp)
+        timings["render"] = time.monotonic() - start
+
+        upload_start = time.monotonic()
+        upload_id = upload(path)
+        timings["upload"] = time.monotonic() - upload_start
+    finally:
+        if not keep_file:
+            os.unlink(path)
+
+    return upload_id, timings
+
+
+def wait_for_upload(
+    get_status: Callable[[int], Dict], upload_id: int, poll_interval: float = 1.0
+) -> Dict:
+    """Poll an upload's status until it's finished or needs user action.
+
+    Prints the status whenever it changes. Returns the final status details.
+    """
+    last_status = None
+    while True:
+        details = get_status(upload_id)
+        if details["status"] != last_status:
+            print(f"Upload {upload_id}: {details['status']}")
+            last_status = details["status"]
+        if (
+            details["status"] in FINISHED_STATUSES
+            or details["status"] == AWAITING_USER_ACTION
+        ):
+            return details
+        time.sleep(poll_interval)
@@ -6,11 +6,19 @@ Ensures that all the substrata of a newly-created site are planted.
 """
 
 import argparse
+from collections import Counter
 from datetime import date, datetime, timezone
 import json
 import random
+import sys
+import threading
 import time
-from client import add_terraware_args, client_from_args
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+from client import TerrawareClient, add_terraware_args, client_from_args
+from pipeline import LatencyStats, Pipeline, Stage
 
 
 def isoformat(timestamp: int) -> str:
@@ -40,33 +48,149 @@ def generate_nursery_withdrawal(facility_id, batch_id, planting_site_id, substra
     }
 
 
+def describe_error(ex: Exception) -> str:
+    if isinstance(ex, requests.HTTPError) and ex.response is not None:
+        return f"HTTP {ex.response.status_code}: {ex}"
+    return f"{type(ex).__name__}: {ex}"
+
+
+def generate_withdrawals(
+    batches: List[Dict],
+    planting_site_id: int,
+    substratum_ids: List[int],
+    repeat: int,
+    rate: Optional[float],
+) -> Iterator[Dict]:
+    """Yield withdrawal payloads, cycling through the batches, at up to rate per second."""
+    start = time.monotonic()
+    for index in range(repeat * len(substratum_ids)):
+        if rate:
+            delay = start + index / rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        batch = batches[index % len(batches)]
+        yield generate_nursery_withdrawal(
+            batch["facilityId"],
+            batch["id"],
+            planting_site_id,
+            substratum_ids[index % len(substratum_ids)],
+        )
+
+
+def withdraw(
+    client: TerrawareClient,
+    batches: List[Dict],
+    planting_site_id: int,
+    substratum_ids: List[int],
+    repeat: int,
+    rate: Optional[float],
+    workers: int,
+) -> int:
+    """Withdraw to every substratum repeat times, continuing past errors.
+
+    Returns the number of withdrawals that failed.
+    """
+    stats = LatencyStats("withdrawals")
+    errors: Counter = Counter()
+    lock = threading.Lock()
+
+    def submit(payload: Dict) -> bool:
+        if repeat == 1:
+            print(f"Withdrawing to substratum {payload['substratumId']}")
+
+        start = time.monotonic()
+        try:
+            client.withdraw_seedling_batch(payload)
+            stats.record(time.monotonic() - start)
+            return True
+        except Exception as ex:
+            stats.record(time.monotonic() - start, error=True)
+            with lock:
+                errors[describe_error(ex)] += 1
+            return False
+
+    pipeline = Pipeline([Stage("withdrawals", submit, workers)])
+    succeeded = sum(
+        pipeline.results(
+            generate_withdrawals(
+                batches, planting_site_id, substratum_ids, repeat, rate
+            )
+        )
+    )
+
+    elapsed = pipeline.elapsed
+    print(
+        f"{succeeded} withdrawals succeeded "
+        + f"({succeeded / elapsed if elapsed > 0 else 0:.1f} withdrawals/sec)"
+    )
+    print(stats.summary(elapsed))
+    for description, count in errors.most_common():
+        print(f"{count:6d}  {description}")
+
+    return sum(errors.values())
+
+
 def main():
     parser = argparse.ArgumentParser(
         "Withdraw one plant from a nursery to each substratum at a planting site"
     )
-    parser.add_argument("--batch", "-b", type=int, help="Batch ID to withdraw from.")
+    parser.add_argument(
+        "--batch",
+        "-b",
+        type=int,
+        action="append",
+        required=True,
+        help="Batch ID to withdraw from. May be specified more than once to spread the "
+        + "withdrawals across several batches.",
+    )
     parser.add_argument(
         "--planting-site", "-p", type=int, help="Planting site ID to deliver to."
     )
+    parser.add_argument(
+        "--repeat",
+        "-r",
+        type=int,
+        default=1,
+        help="Withdraw to each substratum this many times. Default is 1.",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="Start at most this many withdrawals per second. Default is to go as fast as "
+        + "the workers can.",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=1,
+        help="Number of concurrent withdrawals. Default is 1.",
+    )
     add_terraware_args(parser)
     args = parser.parse_args()
 
-    client = client_from_args(args)
+    client = client_from_args(args, pool_size=args.workers)
 
-    batch = client.get_seedling_batch(args.batch)
+    batches = client.get_seedling_batches(args.batch, require_all=True)
     planting_site = client.get_planting_site(args.planting_site, depth="Substratum")
+    substratum_ids = [
+        substratum["id"]
+        for stratum in planting_site["strata"]
+        for substratum in stratum["substrata"]
+    ]
 
-    for stratum in planting_site["strata"]:
-        for substratum in stratum["substrata"]:
-            print(f"Withdrawing to substratum {substratum['id']}")
-            client.withdraw_seedling_batch(
-                generate_nursery_withdrawal(
-                    batch["facilityId"],
-                    args.batch,
-                    args.planting_site,
-                    substratum["id"],
-                )
-            )
+    failures = withdraw(
+        client,
+        batches,
+        args.planting_site,
+        substratum_ids,
+        args.repeat,
+        args.rate,
+        args.workers,
+    )
+    if failures:
+        sys.exit(f"{failures} withdrawals failed")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,40 @@
+package com.terraformation.backend.api
+
+import jakarta.ws.rs.WebApplicationException
+import jakarta.ws.rs.core.Response
+
+/** Name of the query string parameter that lists the IDs to fetch from a multiple-ID endpoint. */
+const val MULTIPLE_IDS_PARAMETER = "id"
+
+/** Maximum number of IDs a client can fetch in a single request to a multiple-ID endpoint. */
+const val MAX_MULTIPLE_IDS = 100
+
+/** Description of the `id` parameter on multiple-ID endpoints. */
+const val MULTIPLE_IDS_DESCRIPTION =
+    "IDs to fetch. IDs are comma-separated or the parameter may be repeated. IDs that don't " +
+        "exist or that aren't accessible by the current user are omitted from the response " +
+        "rather than treated as errors."
+
+/** Description of the 413 response from multiple-ID endpoints. */
+const val MULTIPLE_IDS_TOO_LARGE_DESCRIPTION =
+    "The request had more than $MAX_MULTIPLE_IDS IDs. Split the IDs across several requests."
+
+/**
+ * Checks that a request to a multiple-ID endpoint doesn't ask for more than [MAX_MULTIPLE_IDS] IDs,
+ * so that a single request can't tie up a database connection for too long.
+ *
+ * @return The distinct IDs.
+ * @throws WebApplicationException There were too many IDs.
+ */
+fun <T> checkMultipleIds(ids: Collection<T>): Set<T> {
+  val distinctIds = ids.toSet()
+
+  if (distinctIds.size > MAX_MULTIPLE_IDS) {
+    throw WebApplicationException(
+        "Request must contain $MAX_MULTIPLE_IDS or fewer IDs",
+        Response.Status.REQUEST_ENTITY_TOO_LARGE,
+    )
+  }
+
+  return distinctIds
+}
@@ -0,0 +1,31 @@
+package com.terraformation.backend.api
+
+import jakarta.inject.Named
+import jakarta.servlet.http.HttpServletRequest
+import org.springframework.web.filter.ShallowEtagHeaderFilter
+
+/**
+ * Adds ETags to the responses of endpoints that return reference data clients tend to cache, such
+ * as the lists of facilities and species. A client that has a cached copy can send its ETag in an
+ * `If-None-Match` header and get an empty 304 response if the data hasn't changed.
+ *
+ * The ETag is a hash of the response body, so the server still generates the full response; this
+ * saves sending it and having the client parse it again.
+ */
+@Named
+class ReferenceDataEtagFilter : ShallowEtagHeaderFilter() {
+  override fun shouldNotFilter(request: HttpServletRequest): Boolean {
+    return request.method != "GET" || referenceDataPaths.none { it.matches(request.requestURI) }
+  }
+
+  companion object {
+    private val referenceDataPaths =
+        listOf(
+            Regex("/api/v1/facilities(/\\d+)?"),
+            Regex("/api/v1/organizations"),
+            Regex("/api/v1/species"),
+            Regex("/api/v1/tracking/sites(/\\d+)?"),
+            Regex("/api/v1/users/me"),
+        )
+  }
+}
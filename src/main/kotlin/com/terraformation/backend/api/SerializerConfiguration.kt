@@ -1,6 +1,7 @@
 package com.terraformation.backend.api
 
 import com.fasterxml.jackson.databind.module.SimpleModule
+import org.springframework.boot.autoconfigure.jackson.Jackson2ObjectMapperBuilderCustomizer
 import org.springframework.context.annotation.Bean
 import org.springframework.context.annotation.Configuration
 
@@ -18,4 +19,13 @@ class SerializerConfiguration {
         .addDeserializer(ArbitraryJsonObject::class.java, ArbitraryJsonObjectDeserializer())
         .addSerializer(ArbitraryJsonObject::class.java, ArbitraryJsonObjectSerializer())
   }
+
+  /**
+   * Serializes every property of payloads that support [SparseFields] unless a request asks for
+   * specific ones.
+   */
+  @Bean
+  fun sparseFieldsFilterCustomizer(): Jackson2ObjectMapperBuilderCustomizer {
+    return Jackson2ObjectMapperBuilderCustomizer { it.filters(serializeAllFilterProvider()) }
+  }
 }
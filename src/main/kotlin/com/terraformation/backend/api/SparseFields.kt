@@ -0,0 +1,107 @@
+package com.terraformation.backend.api
+
+import com.fasterxml.jackson.databind.ser.FilterProvider
+import com.fasterxml.jackson.databind.ser.impl.SimpleBeanPropertyFilter
+import com.fasterxml.jackson.databind.ser.impl.SimpleFilterProvider
+import kotlin.reflect.KClass
+import kotlin.reflect.full.memberProperties
+import org.springframework.core.MethodParameter
+import org.springframework.http.MediaType
+import org.springframework.http.converter.HttpMessageConverter
+import org.springframework.http.converter.json.MappingJacksonValue
+import org.springframework.http.server.ServerHttpRequest
+import org.springframework.http.server.ServerHttpResponse
+import org.springframework.http.server.ServletServerHttpRequest
+import org.springframework.web.bind.annotation.ControllerAdvice
+import org.springframework.web.servlet.mvc.method.annotation.AbstractMappingJacksonResponseBodyAdvice
+
+/**
+ * ID of the Jackson filter that omits properties a client didn't request. Payload classes that can
+ * be returned by [SparseFields] endpoints are annotated with `@JsonFilter(SPARSE_FIELDS_FILTER)`.
+ */
+const val SPARSE_FIELDS_FILTER = "sparseFields"
+
+/** Name of the query string parameter that lists the requested properties. */
+const val SPARSE_FIELDS_PARAMETER = "fields"
+
+/** Description of the `fields` parameter on list endpoints. */
+const val SPARSE_FIELDS_DESCRIPTION =
+    "If specified, only include these properties in each element of the list, and skip the work " +
+        "of looking up the others. The response's other top-level properties are always " +
+        "included. Properties are comma-separated or the parameter may be repeated."
+
+/**
+ * Marks a list endpoint that accepts a [SPARSE_FIELDS_PARAMETER] query string parameter to limit
+ * the elements of the response to the properties the client needs.
+ *
+ * The endpoint's element payload class must be annotated with `@JsonFilter(SPARSE_FIELDS_FILTER)`,
+ * and the endpoint should call [validateSparseFields] so that unknown property names are rejected
+ * rather than silently producing empty elements.
+ */
+@Retention(AnnotationRetention.RUNTIME)
+@Target(AnnotationTarget.FUNCTION)
+annotation class SparseFields
+
+/**
+ * Filter provider for responses that aren't limited to specific fields. Payload classes with a
+ * `@JsonFilter` annotation can't be serialized without one.
+ */
+fun serializeAllFilterProvider(): FilterProvider =
+    SimpleFilterProvider().setDefaultFilter(SimpleBeanPropertyFilter.serializeAll())
+
+/**
+ * Checks that the requested fields are all properties of a payload class.
+ *
+ * @return The requested fields, or null if no fields were requested, meaning the client wants
+ *   every property.
+ * @throws IllegalArgumentException A field isn't a property of the payload class.
+ */
+fun validateSparseFields(fields: Collection<String>?, payloadClass: KClass<*>): Set<String>? {
+  if (fields.isNullOrEmpty()) {
+    return null
+  }
+
+  val validFields = payloadClass.memberProperties.map { it.name }.toSet()
+  val invalidFields = fields.filter { it !in validFields }
+  if (invalidFields.isNotEmpty()) {
+    throw IllegalArgumentException(
+        "Unknown fields: ${invalidFields.joinToString()}. Valid fields are: " +
+            validFields.sorted().joinToString()
+    )
+  }
+
+  return fields.toSet()
+}
+
+/** Omits the properties a client didn't ask for from the responses of [SparseFields] endpoints. */
+@ControllerAdvice
+class SparseFieldsResponseBodyAdvice : AbstractMappingJacksonResponseBodyAdvice() {
+  override fun supports(
+      returnType: MethodParameter,
+      converterType: Class<out HttpMessageConverter<*>>,
+  ): Boolean {
+    return super.supports(returnType, converterType) &&
+        returnType.hasMethodAnnotation(SparseFields::class.java)
+  }
+
+  override fun beforeBodyWriteInternal(
+      bodyContainer: MappingJacksonValue,
+      contentType: MediaType,
+      returnType: MethodParameter,
+      request: ServerHttpRequest,
+      response: ServerHttpResponse,
+  ) {
+    val fields =
+        (request as? ServletServerHttpRequest)
+            ?.servletRequest
+            ?.getParameterValues(SPARSE_FIELDS_PARAMETER)
+            ?.flatMap { it.split(',') }
+            ?.map { it.trim() }
+            ?.filter { it.isNotEmpty() }
+
+    if (!fields.isNullOrEmpty()) {
+      val filter = SimpleBeanPropertyFilter.filterOutAllExcept(fields.toSet())
+      bodyContainer.filters = SimpleFilterProvider().addFilter(SPARSE_FIELDS_FILTER, filter)
+    }
+  }
+}
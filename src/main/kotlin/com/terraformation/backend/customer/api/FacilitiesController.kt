@@ -1,11 +1,17 @@
 package com.terraformation.backend.customer.api
 
+import com.fasterxml.jackson.annotation.JsonFilter
 import com.fasterxml.jackson.annotation.JsonInclude
 import com.terraformation.backend.api.ApiResponse409
 import com.terraformation.backend.api.ApiResponseSimpleSuccess
 import com.terraformation.backend.api.CustomerEndpoint
+import com.terraformation.backend.api.SPARSE_FIELDS_DESCRIPTION
+import com.terraformation.backend.api.SPARSE_FIELDS_FILTER
+import com.terraformation.backend.api.SPARSE_FIELDS_PARAMETER
 import com.terraformation.backend.api.SimpleSuccessResponsePayload
+import com.terraformation.backend.api.SparseFields
 import com.terraformation.backend.api.SuccessResponsePayload
+import com.terraformation.backend.api.validateSparseFields
 import com.terraformation.backend.auth.currentUser
 import com.terraformation.backend.customer.db.FacilityStore
 import com.terraformation.backend.customer.event.FacilityAlertRequestedEvent
@@ -37,6 +43,7 @@ import org.springframework.web.bind.annotation.PostMapping
 import org.springframework.web.bind.annotation.PutMapping
 import org.springframework.web.bind.annotation.RequestBody
 import org.springframework.web.bind.annotation.RequestMapping
+import org.springframework.web.bind.annotation.RequestParam
 import org.springframework.web.bind.annotation.RestController
 
 @CustomerEndpoint
@@ -50,7 +57,14 @@ class FacilitiesController(
 
   @GetMapping
   @Operation(summary = "Lists all accessible facilities.")
-  fun listAllFacilities(): ListFacilitiesResponse {
+  @SparseFields
+  fun listAllFacilities(
+      @RequestParam(SPARSE_FIELDS_PARAMETER)
+      @Schema(description = SPARSE_FIELDS_DESCRIPTION)
+      fields: List<String>?,
+  ): ListFacilitiesResponse {
+    validateSparseFields(fields, FacilityPayload::class)
+
     val facilities = facilityStore.fetchAll()
 
     val elements = facilities.map { FacilityPayload(it) }
@@ -169,6 +183,7 @@ class FacilitiesController(
   }
 }
 
+@JsonFilter(SPARSE_FIELDS_FILTER)
 @JsonInclude(JsonInclude.Include.NON_NULL)
 data class FacilityPayload(
     val buildCompletedDate: LocalDate?,
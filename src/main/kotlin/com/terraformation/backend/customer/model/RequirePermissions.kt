@@ -29,3 +29,25 @@ fun requirePermissions(
 ) {
   PermissionRequirements(user).func()
 }
+
+/**
+ * Filters a collection of entities down to the ones a user can read, checking permissions once per
+ * group of entities with the same parents rather than once per entity.
+ *
+ * Whether a user can read an entity usually depends only on the entity's parents, e.g., on an
+ * accession's facility and project, and checking it usually requires looking the parents up in the
+ * database. When fetching many entities at once, checking one entity from each group avoids a
+ * database query per entity.
+ *
+ * @param parents Returns the parent IDs of an entity. Entities with the same parent IDs must be
+ *   readable by exactly the same users.
+ * @param canRead Returns true if the user can read an entity.
+ */
+inline fun <T> Collection<T>.filterReadable(
+    parents: (T) -> Any?,
+    canRead: (T) -> Boolean,
+): List<T> {
+  val readableByParents = mutableMapOf<Any?, Boolean>()
+
+  return filter { readableByParents.getOrPut(parents(it)) { canRead(it) } }
+}
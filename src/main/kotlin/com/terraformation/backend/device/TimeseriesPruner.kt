@@ -5,9 +5,17 @@ import com.terraformation.backend.db.default_schema.TimeseriesId
 import com.terraformation.backend.db.default_schema.tables.references.TIMESERIES
 import com.terraformation.backend.db.default_schema.tables.references.TIMESERIES_VALUES
 import com.terraformation.backend.log.perClassLogger
+import io.micrometer.core.instrument.Counter
+import io.micrometer.core.instrument.MeterRegistry
+import io.micrometer.core.instrument.Timer
 import jakarta.inject.Named
+import java.time.Duration
+import java.time.Instant
 import java.time.InstantSource
 import java.time.temporal.ChronoUnit
+import java.util.concurrent.TimeUnit
+import java.util.concurrent.atomic.AtomicInteger
+import java.util.concurrent.atomic.AtomicLong
 import org.jobrunr.jobs.annotations.Recurring
 import org.jooq.DSLContext
 import org.jooq.impl.DSL
@@ -16,26 +24,70 @@ import org.jooq.impl.DSL
 class TimeseriesPruner(
     private val clock: InstantSource,
     private val dslContext: DSLContext,
+    meterRegistry: MeterRegistry,
 ) {
-  /** Only delete this many old values at a time from each timeseries. */
-  var maxRowsToDelete: Int = 10000
+  /** Only delete this many old values from each timeseries each time the job runs. */
+  var maxRowsToDelete: Int = 1000000
+
+  /**
+   * Number of values to delete per statement. This is adjusted after each statement so that
+   * statements take roughly [targetStatementDuration]; see [adjustBatchSize].
+   */
+  var batchSize: Int = 1000
+  var minBatchSize: Int = 100
+  var maxBatchSize: Int = 50000
+
+  /**
+   * How long each delete statement should take. Short statements hold row locks and compete with
+   * inserts of new values for less time, at the cost of more round trips.
+   */
+  var targetStatementDuration: Duration = Duration.ofMillis(250)
+
+  /** Stop deleting after this long. Any remaining backlog is picked up by the next run. */
+  var maxRunDuration: Duration = Duration.ofMinutes(10)
 
   private val log = perClassLogger()
 
+  private val rowsDeletedCounter: Counter =
+      Counter.builder("terraware.timeseries.pruner.rows.deleted")
+          .description("Number of expired timeseries values deleted")
+          .register(meterRegistry)
+  private val statementTimer: Timer =
+      Timer.builder("terraware.timeseries.pruner.statement.duration")
+          .description("Time taken by each batched delete statement")
+          .register(meterRegistry)
+  private val batchSizeGauge =
+      AtomicInteger(batchSize).also {
+        meterRegistry.gauge("terraware.timeseries.pruner.batch.size", it)
+      }
+  private val lagSecondsGauge =
+      AtomicLong().also { meterRegistry.gauge("terraware.timeseries.pruner.lag.seconds", it) }
+  private val backlogGauge =
+      AtomicInteger().also { meterRegistry.gauge("terraware.timeseries.pruner.backlog", it) }
+
   /**
    * Prunes data from the `timeseries_values` table based on per-timeseries retention settings. By
    * default, a timeseries isn't pruned at all; an admin needs to set its `retention_days` column to
    * the number of days of data to retain.
    *
-   * To avoid slamming the database with a gigantic delete operation when a retention limit is first
-   * configured on a timeseries with a lot of existing values, this will only delete up to
-   * [maxRowsToDelete] rows per timeseries each time it runs. Since this job runs repeatedly, the
-   * deletion will gradually catch up to the desired number of retention days.
+   * Values are deleted oldest-first in batches that follow the `(timeseries_id, created_time)`
+   * index, so each statement touches a contiguous range of the index rather than scanning for rows
+   * to delete. A run works through as many batches as it can, up to [maxRowsToDelete] rows per
+   * timeseries and [maxRunDuration] in total, so a large backlog (for example, when a retention
+   * limit is first configured on a timeseries with a lot of existing values) is worked off
+   * gradually over several runs without any single statement slamming the database.
+   *
+   * After each run, the `terraware.timeseries.pruner.lag.seconds` metric is how far behind its
+   * retention setting the furthest-behind timeseries is, and `terraware.timeseries.pruner.backlog`
+   * is how many timeseries still have expired values.
    */
   @Recurring(id = "pruneTimeseriesValues", cron = "8,23,38,53 * * * *")
   fun pruneTimeseriesValues() {
     var totalRowsDeleted = 0
     val timeseriesIdsDeleted = mutableListOf<TimeseriesId>()
+    var maxLag = Duration.ZERO
+    var timeseriesBehind = 0
+    val deadline = clock.instant().plus(maxRunDuration)
 
     log.debug("Scanning for timeseries to prune")
 
@@ -48,29 +100,30 @@ class TimeseriesPruner(
           .fetch()
           .forEach { (timeseriesId, retentionDays) ->
             val minimumCreatedTime = clock.instant().minus(retentionDays.toLong(), ChronoUnit.DAYS)
+
             val rowsDeleted =
-                with(TIMESERIES_VALUES) {
-                  dslContext
-                      .deleteFrom(TIMESERIES_VALUES)
-                      .where(TIMESERIES_ID.eq(timeseriesId))
-                      .and(
-                          CREATED_TIME.`in`(
-                              DSL.select(CREATED_TIME)
-                                  .from(TIMESERIES_VALUES)
-                                  .where(TIMESERIES_ID.eq(timeseriesId))
-                                  .and(CREATED_TIME.lessThan(minimumCreatedTime))
-                                  .orderBy(CREATED_TIME)
-                                  .limit(maxRowsToDelete)
-                          )
-                      )
-                      .execute()
+                if (clock.instant().isBefore(deadline)) {
+                  pruneTimeseries(timeseriesId, minimumCreatedTime, deadline)
+                } else {
+                  0
                 }
 
             if (rowsDeleted > 0) {
               totalRowsDeleted += rowsDeleted
               timeseriesIdsDeleted.add(timeseriesId)
             }
+
+            val lag = fetchLag(timeseriesId, minimumCreatedTime)
+            if (lag != null) {
+              timeseriesBehind++
+              if (lag > maxLag) {
+                maxLag = lag
+              }
+            }
           }
+
+      lagSecondsGauge.set(maxLag.seconds)
+      backlogGauge.set(timeseriesBehind)
     } catch (e: Exception) {
       log.error("Error while pruning timeseries values", e)
     }
@@ -78,5 +131,108 @@ class TimeseriesPruner(
     if (totalRowsDeleted > 0) {
       log.info("Deleted $totalRowsDeleted values from timeseries $timeseriesIdsDeleted")
     }
+    if (timeseriesBehind > 0) {
+      log.info("$timeseriesBehind timeseries still have expired values; maximum lag $maxLag")
+    }
+  }
+
+  /** Deletes expired values from one timeseries in batches. Returns the number deleted. */
+  private fun pruneTimeseries(
+      timeseriesId: TimeseriesId,
+      minimumCreatedTime: Instant,
+      deadline: Instant,
+  ): Int {
+    var rowsDeleted = 0
+
+    while (rowsDeleted < maxRowsToDelete && clock.instant().isBefore(deadline)) {
+      val limit = minOf(batchSize, maxRowsToDelete - rowsDeleted)
+
+      val startTime = System.nanoTime()
+      val batchRowsDeleted = deleteBatch(timeseriesId, minimumCreatedTime, limit)
+      val elapsed = Duration.ofNanos(System.nanoTime() - startTime)
+
+      statementTimer.record(elapsed.toNanos(), TimeUnit.NANOSECONDS)
+      rowsDeletedCounter.increment(batchRowsDeleted.toDouble())
+      rowsDeleted += batchRowsDeleted
+
+      if (batchRowsDeleted == limit) {
+        batchSize = adjustBatchSize(batchSize, elapsed)
+        batchSizeGauge.set(batchSize)
+      } else {
+        // There weren't enough expired values left to fill the batch, so we're caught up.
+        break
+      }
+    }
+
+    return rowsDeleted
+  }
+
+  /**
+   * Deletes up to [limit] of the oldest expired values from a timeseries. The upper bound of the
+   * batch is found by walking the index from the oldest value, which is cheap regardless of how
+   * many values the timeseries has.
+   */
+  private fun deleteBatch(
+      timeseriesId: TimeseriesId,
+      minimumCreatedTime: Instant,
+      limit: Int,
+  ): Int {
+    return with(TIMESERIES_VALUES) {
+      val batchUpperBound =
+          DSL.select(CREATED_TIME)
+              .from(TIMESERIES_VALUES)
+              .where(TIMESERIES_ID.eq(timeseriesId))
+              .and(CREATED_TIME.lessThan(minimumCreatedTime))
+              .orderBy(CREATED_TIME)
+              .offset(limit - 1)
+              .limit(1)
+
+      dslContext
+          .deleteFrom(TIMESERIES_VALUES)
+          .where(TIMESERIES_ID.eq(timeseriesId))
+          .and(CREATED_TIME.lessThan(minimumCreatedTime))
+          .and(
+              CREATED_TIME.lessOrEqual(
+                  DSL.coalesce(DSL.field(batchUpperBound), DSL.value(minimumCreatedTime))
+              )
+          )
+          .execute()
+    }
+  }
+
+  /**
+   * Returns how far behind its retention setting a timeseries is, or null if it has no expired
+   * values.
+   */
+  private fun fetchLag(timeseriesId: TimeseriesId, minimumCreatedTime: Instant): Duration? {
+    val oldestTime =
+        with(TIMESERIES_VALUES) {
+          dslContext
+              .select(CREATED_TIME)
+              .from(TIMESERIES_VALUES)
+              .where(TIMESERIES_ID.eq(timeseriesId))
+              .orderBy(CREATED_TIME)
+              .limit(1)
+              .fetchOne(CREATED_TIME)
+        }
+
+    return if (oldestTime != null && oldestTime < minimumCreatedTime) {
+      Duration.between(oldestTime, minimumCreatedTime)
+    } else {
+      null
+    }
+  }
+
+  /**
+   * Returns the batch size to use for the next statement based on how long the previous one took.
+   * The size is halved if the statement was slower than [targetStatementDuration] and doubled if
+   * it took less than half the target, within the bounds of [minBatchSize] and [maxBatchSize].
+   */
+  fun adjustBatchSize(currentSize: Int, elapsed: Duration): Int {
+    return when {
+      elapsed > targetStatementDuration -> maxOf(minBatchSize, currentSize / 2)
+      elapsed < targetStatementDuration.dividedBy(2) -> minOf(maxBatchSize, currentSize * 2)
+      else -> currentSize
+    }
   }
 }
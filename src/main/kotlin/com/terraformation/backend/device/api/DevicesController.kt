@@ -2,11 +2,16 @@ package com.terraformation.backend.device.api
 
 import com.fasterxml.jackson.annotation.JsonInclude
 import com.terraformation.backend.api.ApiResponse404
+import com.terraformation.backend.api.ApiResponse413
 import com.terraformation.backend.api.ApiResponseSimpleSuccess
 import com.terraformation.backend.api.ArbitraryJsonObject
 import com.terraformation.backend.api.DeviceManagerAppEndpoint
+import com.terraformation.backend.api.MULTIPLE_IDS_DESCRIPTION
+import com.terraformation.backend.api.MULTIPLE_IDS_PARAMETER
+import com.terraformation.backend.api.MULTIPLE_IDS_TOO_LARGE_DESCRIPTION
 import com.terraformation.backend.api.SimpleSuccessResponsePayload
 import com.terraformation.backend.api.SuccessResponsePayload
+import com.terraformation.backend.api.checkMultipleIds
 import com.terraformation.backend.db.default_schema.DeviceId
 import com.terraformation.backend.db.default_schema.FacilityId
 import com.terraformation.backend.db.default_schema.tables.pojos.DevicesRow
@@ -22,6 +27,7 @@ import org.springframework.web.bind.annotation.PathVariable
 import org.springframework.web.bind.annotation.PostMapping
 import org.springframework.web.bind.annotation.PutMapping
 import org.springframework.web.bind.annotation.RequestBody
+import org.springframework.web.bind.annotation.RequestParam
 import org.springframework.web.bind.annotation.RestController
 
 @DeviceManagerAppEndpoint
@@ -59,6 +65,23 @@ class DevicesController(
     return GetDeviceResponsePayload(DeviceConfig(devicesRow))
   }
 
+  @ApiResponse(
+      responseCode = "200",
+      description =
+          "Configurations of the devices that exist and are accessible by the current user.",
+  )
+  @ApiResponse413(MULTIPLE_IDS_TOO_LARGE_DESCRIPTION)
+  @GetMapping("/api/v1/devices")
+  @Operation(summary = "Gets the configurations of several devices at once.")
+  fun getDevices(
+      @RequestParam(MULTIPLE_IDS_PARAMETER)
+      @Schema(description = MULTIPLE_IDS_DESCRIPTION)
+      ids: List<DeviceId>,
+  ): ListDeviceConfigsResponse {
+    val devices = deviceStore.fetchByIds(checkMultipleIds(ids))
+    return ListDeviceConfigsResponse(devices.map { DeviceConfig(it) })
+  }
+
   @ApiResponse(responseCode = "200", description = "Device configuration updated.")
   @ApiResponse404
   @Operation(summary = "Updates the configuration of an existing device.")
@@ -2,6 +2,8 @@ package com.terraformation.backend.device.api
 
 import com.fasterxml.jackson.annotation.JsonInclude
 import com.terraformation.backend.api.ApiResponse200
+import com.terraformation.backend.api.ApiResponse400
+import com.terraformation.backend.api.ApiResponse404
 import com.terraformation.backend.api.ApiResponse413
 import com.terraformation.backend.api.ApiResponseSimpleSuccess
 import com.terraformation.backend.api.DeviceManagerAppEndpoint
@@ -12,11 +14,13 @@ import com.terraformation.backend.api.SuccessOrError
 import com.terraformation.backend.api.SuccessResponsePayload
 import com.terraformation.backend.customer.db.FacilityStore
 import com.terraformation.backend.customer.db.ParentStore
+import com.terraformation.backend.db.TimeseriesNotFoundException
 import com.terraformation.backend.db.default_schema.DeviceId
 import com.terraformation.backend.db.default_schema.FacilityConnectionState
 import com.terraformation.backend.db.default_schema.TimeseriesType
 import com.terraformation.backend.db.default_schema.tables.pojos.TimeseriesRow
 import com.terraformation.backend.device.db.TimeseriesStore
+import com.terraformation.backend.device.model.TimeseriesAggregation
 import com.terraformation.backend.device.model.TimeseriesModel
 import com.terraformation.backend.log.perClassLogger
 import io.swagger.v3.oas.annotations.Operation
@@ -26,6 +30,7 @@ import io.swagger.v3.oas.annotations.responses.ApiResponse
 import jakarta.validation.constraints.Size
 import jakarta.ws.rs.WebApplicationException
 import jakarta.ws.rs.core.Response
+import java.time.Duration
 import java.time.Instant
 import org.springframework.dao.DuplicateKeyException
 import org.springframework.http.ResponseEntity
@@ -72,6 +77,50 @@ class TimeseriesController(
     return ListTimeseriesResponsePayload(timeseries)
   }
 
+  @ApiResponse200
+  @ApiResponse400("The time range or bucket size was invalid.")
+  @ApiResponse404("One of the timeseries does not exist.")
+  @Operation(
+      summary = "Returns the values of one or more timeseries over a time range.",
+      description =
+          "If bucketSeconds is specified, the time range is divided into buckets of that many " +
+              "seconds and each timeseries has at most one value per bucket, so the number of " +
+              "values returned is bounded regardless of the length of the time range. Each " +
+              "bucketed value's timestamp is the start time of its bucket. If bucketSeconds is " +
+              "not specified, all the recorded values in the time range are returned, up to a " +
+              "limit of ${TimeseriesStore.MAX_HISTORY_VALUES} values.",
+  )
+  @PostMapping("/history")
+  fun getTimeseriesHistory(
+      @RequestBody payload: GetTimeseriesHistoryRequestPayload
+  ): GetTimeseriesHistoryResponsePayload {
+    val timeseries =
+        payload.timeseries.map { entry ->
+          timeSeriesStore.fetchOneByName(entry.deviceId, entry.timeseriesName)
+              ?: throw TimeseriesNotFoundException(entry.deviceId, entry.timeseriesName)
+        }
+
+    val history =
+        timeSeriesStore.fetchHistory(
+            timeseries,
+            payload.startTime,
+            payload.endTime,
+            payload.bucketSeconds?.let { Duration.ofSeconds(it) },
+            payload.aggregation ?: TimeseriesAggregation.Last,
+        )
+
+    return GetTimeseriesHistoryResponsePayload(
+        timeseries.map { model ->
+          TimeseriesValuesPayload(
+              model.deviceId,
+              model.name,
+              history[model.id]?.map { TimeseriesValuePayload(it.createdTime, it.value) }
+                  ?: emptyList(),
+          )
+        }
+    )
+  }
+
   @ApiResponse200(
       "Successfully processed the request. Note that this status will be returned even if the " +
           "server was unable to record some of the values. In that case, the failed values will " +
@@ -259,6 +308,43 @@ data class TimeseriesValuePayload(
     val value: String,
 )
 
+data class TimeseriesReferencePayload(
+    val deviceId: DeviceId,
+    val timeseriesName: String,
+)
+
+data class GetTimeseriesHistoryRequestPayload(
+    @Schema(description = "Return values recorded at or after this time.")
+    val startTime: Instant,
+    @Schema(description = "Return values recorded before this time.")
+    val endTime: Instant,
+    val timeseries: List<TimeseriesReferencePayload>,
+    @Schema(
+        description =
+            "If specified, combine the values in each interval of this many seconds into a " +
+                "single value. If not specified, return all the values in the time range."
+    )
+    val bucketSeconds: Long?,
+    @Schema(
+        description =
+            "How to combine the values in each bucket. Average, Maximum, and Minimum may only " +
+                "be used with numeric timeseries. Ignored if bucketSeconds is not specified.",
+        defaultValue = "Last",
+    )
+    val aggregation: TimeseriesAggregation?,
+)
+
+data class GetTimeseriesHistoryResponsePayload(
+    @ArraySchema(
+        arraySchema =
+            Schema(
+                description =
+                    "Values for each requested timeseries, in the same order as the request."
+            )
+    )
+    val timeseries: List<TimeseriesValuesPayload>
+) : SuccessResponsePayload
+
 data class CreateTimeseriesRequestPayload(val timeseries: List<CreateTimeseriesEntry>)
 
 data class RecordTimeseriesValuesRequestPayload(
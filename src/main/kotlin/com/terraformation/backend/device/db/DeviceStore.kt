@@ -1,6 +1,7 @@
 package com.terraformation.backend.device.db
 
 import com.terraformation.backend.auth.currentUser
+import com.terraformation.backend.customer.model.filterReadable
 import com.terraformation.backend.customer.model.requirePermissions
 import com.terraformation.backend.db.DeviceNotFoundException
 import com.terraformation.backend.db.default_schema.DeviceId
@@ -18,6 +19,26 @@ class DeviceStore(private val devicesDao: DevicesDao) {
     return devicesDao.fetchOneById(deviceId) ?: throw DeviceNotFoundException(deviceId)
   }
 
+  /**
+   * Returns the devices with a set of IDs, ordered by ID. Devices that don't exist or that the
+   * current user can't read are omitted from the result rather than treated as errors.
+   *
+   * The devices are fetched in a single query, and permissions are checked once per facility rather
+   * than once per device.
+   */
+  fun fetchByIds(deviceIds: Collection<DeviceId>): List<DevicesRow> {
+    if (deviceIds.isEmpty()) {
+      return emptyList()
+    }
+
+    val user = currentUser()
+
+    return devicesDao
+        .fetchById(*deviceIds.toTypedArray())
+        .sortedBy { it.id }
+        .filterReadable(parents = { it.facilityId }, canRead = { user.canReadDevice(it.id!!) })
+  }
+
   fun fetchByFacilityId(facilityId: FacilityId): List<DevicesRow> {
     if (!currentUser().canReadFacility(facilityId)) {
       return emptyList()
@@ -10,15 +10,19 @@ import com.terraformation.backend.db.default_schema.TimeseriesType
 import com.terraformation.backend.db.default_schema.tables.pojos.TimeseriesRow
 import com.terraformation.backend.db.default_schema.tables.references.TIMESERIES
 import com.terraformation.backend.db.default_schema.tables.references.TIMESERIES_VALUES
+import com.terraformation.backend.device.model.TimeseriesAggregation
 import com.terraformation.backend.device.model.TimeseriesModel
 import com.terraformation.backend.device.model.TimeseriesValueModel
 import jakarta.inject.Named
 import java.math.BigDecimal
 import java.math.RoundingMode
 import java.time.Clock
+import java.time.Duration
 import java.time.Instant
 import org.jooq.DSLContext
+import org.jooq.Field
 import org.jooq.impl.DSL
+import org.jooq.impl.SQLDataType
 
 @Named
 class TimeseriesStore(private val clock: Clock, private val dslContext: DSLContext) {
@@ -157,12 +161,156 @@ class TimeseriesStore(private val clock: Clock, private val dslContext: DSLConte
     }
   }
 
+  /**
+   * Returns the values of a set of timeseries between [startTime] (inclusive) and [endTime]
+   * (exclusive), in ascending time order.
+   *
+   * If [bucketSize] is null, every recorded value is returned. Otherwise the time range is divided
+   * into buckets of that length starting at [startTime], and each timeseries has at most one value
+   * per bucket, computed using [aggregation]. Bucketed values are reported with the bucket's start
+   * time as their timestamp, so the number of values per timeseries is bounded no matter how many
+   * raw values fall in the range.
+   *
+   * @throws IllegalArgumentException The time range was invalid, would have resulted in too many
+   *   values, or asked for a numeric aggregation of a non-numeric timeseries.
+   */
+  fun fetchHistory(
+      timeseries: Collection<TimeseriesModel>,
+      startTime: Instant,
+      endTime: Instant,
+      bucketSize: Duration? = null,
+      aggregation: TimeseriesAggregation = TimeseriesAggregation.Last,
+  ): Map<TimeseriesId, List<TimeseriesValueModel>> {
+    timeseries.map { it.deviceId }.distinct().forEach { requirePermissions { readTimeseries(it) } }
+
+    if (!endTime.isAfter(startTime)) {
+      throw IllegalArgumentException("End time must be after start time")
+    }
+
+    if (timeseries.isEmpty()) {
+      return emptyMap()
+    }
+
+    return if (bucketSize == null) {
+      fetchRawHistory(timeseries.map { it.id }, startTime, endTime)
+    } else {
+      fetchBucketedHistory(timeseries, startTime, endTime, bucketSize, aggregation)
+    }
+  }
+
+  private fun fetchRawHistory(
+      timeseriesIds: Collection<TimeseriesId>,
+      startTime: Instant,
+      endTime: Instant,
+  ): Map<TimeseriesId, List<TimeseriesValueModel>> {
+    val values =
+        with(TIMESERIES_VALUES) {
+          dslContext
+              .selectFrom(TIMESERIES_VALUES)
+              .where(TIMESERIES_ID.`in`(timeseriesIds))
+              .and(CREATED_TIME.ge(startTime))
+              .and(CREATED_TIME.lt(endTime))
+              .orderBy(TIMESERIES_ID, CREATED_TIME)
+              .limit(MAX_HISTORY_VALUES + 1)
+              .fetch { TimeseriesValueModel.ofRecord(it) }
+              .filterNotNull()
+        }
+
+    if (values.size > MAX_HISTORY_VALUES) {
+      throw IllegalArgumentException(
+          "Time range has more than $MAX_HISTORY_VALUES values; use a bucket size or a shorter " +
+              "time range"
+      )
+    }
+
+    return values.groupBy { it.timeseriesId }
+  }
+
+  private fun fetchBucketedHistory(
+      timeseries: Collection<TimeseriesModel>,
+      startTime: Instant,
+      endTime: Instant,
+      bucketSize: Duration,
+      aggregation: TimeseriesAggregation,
+  ): Map<TimeseriesId, List<TimeseriesValueModel>> {
+    val bucketSeconds = bucketSize.seconds
+    if (bucketSeconds < 1) {
+      throw IllegalArgumentException("Bucket size must be at least 1 second")
+    }
+
+    val rangeSeconds = Duration.between(startTime, endTime).seconds
+    if ((rangeSeconds + bucketSeconds - 1) / bucketSeconds > MAX_HISTORY_BUCKETS) {
+      throw IllegalArgumentException(
+          "Time range would have more than $MAX_HISTORY_BUCKETS buckets; use a larger bucket size"
+      )
+    }
+
+    if (
+        aggregation != TimeseriesAggregation.Last &&
+            timeseries.any { it.type != TimeseriesType.Numeric }
+    ) {
+      throw IllegalArgumentException("$aggregation can only be used with numeric timeseries")
+    }
+
+    val decimalPlaces = timeseries.associate { it.id to it.decimalPlaces }
+
+    return with(TIMESERIES_VALUES) {
+      // Literal values rather than bind parameters so the expression in the select list is
+      // textually identical to the one in GROUP BY.
+      val bucketField =
+          DSL.field(
+              "floor((extract(epoch from {0}) - {1}) / {2})",
+              SQLDataType.BIGINT,
+              CREATED_TIME,
+              DSL.inline(startTime.epochSecond),
+              DSL.inline(bucketSeconds),
+          )
+      val numericValue = VALUE.cast(SQLDataType.NUMERIC)
+      val valueField: Field<*> =
+          when (aggregation) {
+            TimeseriesAggregation.Average -> DSL.avg(numericValue)
+            TimeseriesAggregation.Last ->
+                DSL.arrayGet(DSL.arrayAgg(VALUE).orderBy(CREATED_TIME.desc()), 1)
+            TimeseriesAggregation.Maximum -> DSL.max(numericValue)
+            TimeseriesAggregation.Minimum -> DSL.min(numericValue)
+          }
+
+      dslContext
+          .select(TIMESERIES_ID, bucketField, valueField)
+          .from(TIMESERIES_VALUES)
+          .where(TIMESERIES_ID.`in`(decimalPlaces.keys))
+          .and(CREATED_TIME.ge(startTime))
+          .and(CREATED_TIME.lt(endTime))
+          .groupBy(TIMESERIES_ID, bucketField)
+          .orderBy(TIMESERIES_ID, bucketField)
+          .fetch { record ->
+            val timeseriesId = record[TIMESERIES_ID]!!
+            val value =
+                when (val aggregated = record[valueField]) {
+                  is BigDecimal -> formatNumber(aggregated, decimalPlaces[timeseriesId])
+                  else -> aggregated.toString()
+                }
+
+            TimeseriesValueModel(
+                timeseriesId,
+                startTime.plusSeconds(record[bucketField]!! * bucketSeconds),
+                value,
+            )
+          }
+          .groupBy { it.timeseriesId }
+    }
+  }
+
+  private fun formatNumber(value: BigDecimal, decimalPlaces: Int?): String {
+    val rounded = decimalPlaces?.let { value.setScale(it, RoundingMode.HALF_UP) } ?: value
+    return rounded.stripTrailingZeros().toPlainString()
+  }
+
   companion object {
-    /**
-     * When pulling history data from the database, limit each SQL query to this many individual
-     * time slices. Each slice turns into a separate `SELECT` statement, joined together with `UNION
-     * ALL`.
-     */
-    const val MAX_SLICES_PER_HISTORY_QUERY = 500
+    /** Maximum number of buckets per timeseries in a bucketed history query. */
+    const val MAX_HISTORY_BUCKETS = 10000
+
+    /** Maximum total number of values returned by an unbucketed history query. */
+    const val MAX_HISTORY_VALUES = 100000
   }
 }
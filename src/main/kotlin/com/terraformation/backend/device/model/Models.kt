@@ -46,3 +46,11 @@ data class TimeseriesModel(
       latestValue,
   )
 }
+
+/** How to combine the values in each time bucket when fetching timeseries history. */
+enum class TimeseriesAggregation {
+  Average,
+  Last,
+  Maximum,
+  Minimum,
+}
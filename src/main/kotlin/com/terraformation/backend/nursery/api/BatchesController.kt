@@ -9,7 +9,11 @@ import com.terraformation.backend.api.ApiResponse200
 import com.terraformation.backend.api.ApiResponse200Photo
 import com.terraformation.backend.api.ApiResponse404
 import com.terraformation.backend.api.ApiResponse412
+import com.terraformation.backend.api.ApiResponse413
 import com.terraformation.backend.api.ApiResponseSimpleSuccess
+import com.terraformation.backend.api.MULTIPLE_IDS_DESCRIPTION
+import com.terraformation.backend.api.MULTIPLE_IDS_PARAMETER
+import com.terraformation.backend.api.MULTIPLE_IDS_TOO_LARGE_DESCRIPTION
 import com.terraformation.backend.api.NurseryEndpoint
 import com.terraformation.backend.api.PHOTO_MAXHEIGHT_DESCRIPTION
 import com.terraformation.backend.api.PHOTO_MAXWIDTH_DESCRIPTION
@@ -17,6 +21,7 @@ import com.terraformation.backend.api.PHOTO_OPERATION_DESCRIPTION
 import com.terraformation.backend.api.RequestBodyPhotoFile
 import com.terraformation.backend.api.SimpleSuccessResponsePayload
 import com.terraformation.backend.api.SuccessResponsePayload
+import com.terraformation.backend.api.checkMultipleIds
 import com.terraformation.backend.api.getFilename
 import com.terraformation.backend.api.getPlainContentType
 import com.terraformation.backend.api.toResponseEntity
@@ -55,6 +60,7 @@ import org.springframework.web.bind.annotation.PostMapping
 import org.springframework.web.bind.annotation.PutMapping
 import org.springframework.web.bind.annotation.RequestBody
 import org.springframework.web.bind.annotation.RequestMapping
+import org.springframework.web.bind.annotation.RequestParam
 import org.springframework.web.bind.annotation.RequestPart
 import org.springframework.web.bind.annotation.ResponseBody
 import org.springframework.web.bind.annotation.RestController
@@ -76,6 +82,22 @@ class BatchesController(
     return BatchResponsePayload(BatchPayload(row))
   }
 
+  @ApiResponse(
+      responseCode = "200",
+      description = "The batches that exist and are accessible by the current user.",
+  )
+  @ApiResponse413(MULTIPLE_IDS_TOO_LARGE_DESCRIPTION)
+  @GetMapping
+  @Operation(summary = "Gets information about several seedling batches at once.")
+  fun getBatches(
+      @RequestParam(MULTIPLE_IDS_PARAMETER)
+      @Schema(description = MULTIPLE_IDS_DESCRIPTION)
+      ids: List<BatchId>,
+  ): BatchesResponsePayload {
+    val models = batchStore.fetchByIds(checkMultipleIds(ids))
+    return BatchesResponsePayload(models.map { BatchPayload(it) })
+  }
+
   @ApiResponse(
       responseCode = "200",
       description =
@@ -450,6 +472,8 @@ data class BatchPhotoPayload(val id: FileId)
 
 data class BatchResponsePayload(val batch: BatchPayload) : SuccessResponsePayload
 
+data class BatchesResponsePayload(val batches: List<BatchPayload>) : SuccessResponsePayload
+
 data class CreateBatchPhotoResponsePayload(val id: FileId) : SuccessResponsePayload
 
 data class ListBatchPhotosResponsePayload(val photos: List<BatchPhotoPayload>) :
@@ -2,6 +2,7 @@ package com.terraformation.backend.nursery.db
 
 import com.terraformation.backend.auth.currentUser
 import com.terraformation.backend.customer.db.ParentStore
+import com.terraformation.backend.customer.model.filterReadable
 import com.terraformation.backend.customer.model.requirePermissions
 import com.terraformation.backend.db.FacilityNotFoundException
 import com.terraformation.backend.db.FacilityTypeMismatchException
@@ -123,6 +124,18 @@ class BatchStore(
           .div(DSL.sum(BATCHES.TOTAL_GERMINATION_CANDIDATES))
           .cast(Double::class.java)
 
+  /** The total number of seedlings withdrawn by a group of batch withdrawals. */
+  private val totalWithdrawnSumField =
+      DSL.sum(
+          BATCH_WITHDRAWALS.GERMINATING_QUANTITY_WITHDRAWN.plus(
+              BATCH_WITHDRAWALS.ACTIVE_GROWTH_QUANTITY_WITHDRAWN.plus(
+                  BATCH_WITHDRAWALS.HARDENING_OFF_QUANTITY_WITHDRAWN.plus(
+                      BATCH_WITHDRAWALS.READY_QUANTITY_WITHDRAWN
+                  )
+              )
+          )
+      )
+
   /** The aggregate loss rate for a group of batches. */
   private val aggregateLossRateField: Field<Double?> =
       DSL.sum(BATCHES.TOTAL_LOST)
@@ -142,6 +155,59 @@ class BatchStore(
     return ExistingBatchModel(batchesRow, subLocationIds, totalWithdrawn, accessionNumber)
   }
 
+  /**
+   * Returns the batches with a set of IDs, ordered by ID. Batches that don't exist or that the
+   * current user can't read are omitted from the result rather than treated as errors.
+   *
+   * The batches are fetched in a single query, and permissions are checked once per combination of
+   * facility and project rather than once per batch.
+   */
+  fun fetchByIds(batchIds: Collection<BatchId>): List<ExistingBatchModel> {
+    if (batchIds.isEmpty()) {
+      return emptyList()
+    }
+
+    val user = currentUser()
+    val subLocationIdsField =
+        DSL.multiset(
+                DSL.select(BATCH_SUB_LOCATIONS.SUB_LOCATION_ID)
+                    .from(BATCH_SUB_LOCATIONS)
+                    .where(BATCH_SUB_LOCATIONS.BATCH_ID.eq(BATCHES.ID))
+            )
+            .convertFrom { result ->
+              result.map { record -> record[BATCH_SUB_LOCATIONS.SUB_LOCATION_ID]!! }.toSet()
+            }
+    val totalWithdrawnField =
+        DSL.field(
+            DSL.select(totalWithdrawnSumField)
+                .from(BATCH_WITHDRAWALS)
+                .where(BATCH_WITHDRAWALS.BATCH_ID.eq(BATCHES.ID))
+        )
+
+    return dslContext
+        .select(
+            BATCHES.asterisk(),
+            BATCHES.accessions.NUMBER,
+            subLocationIdsField,
+            totalWithdrawnField,
+        )
+        .from(BATCHES)
+        .where(BATCHES.ID.`in`(batchIds))
+        .orderBy(BATCHES.ID)
+        .fetch { record ->
+          ExistingBatchModel(
+              record.into(BATCHES).into(BatchesRow::class.java),
+              record[subLocationIdsField],
+              record[totalWithdrawnField]?.toInt() ?: 0,
+              record[BATCHES.accessions.NUMBER],
+          )
+        }
+        .filterReadable(
+            parents = { it.facilityId to it.projectId },
+            canRead = { user.canReadBatch(it.id) },
+        )
+  }
+
   fun fetchWithdrawalById(withdrawalId: WithdrawalId): ExistingWithdrawalModel {
     requirePermissions { readWithdrawal(withdrawalId) }
 
@@ -1182,17 +1248,7 @@ class BatchStore(
 
   private fun getTotalWithdrawn(batchId: BatchId): Int {
     return dslContext
-        .select(
-            DSL.sum(
-                BATCH_WITHDRAWALS.GERMINATING_QUANTITY_WITHDRAWN.plus(
-                    BATCH_WITHDRAWALS.ACTIVE_GROWTH_QUANTITY_WITHDRAWN.plus(
-                        BATCH_WITHDRAWALS.HARDENING_OFF_QUANTITY_WITHDRAWN.plus(
-                            BATCH_WITHDRAWALS.READY_QUANTITY_WITHDRAWN
-                        )
-                    )
-                )
-            )
-        )
+        .select(totalWithdrawnSumField)
         .from(BATCH_WITHDRAWALS)
         .where(BATCH_WITHDRAWALS.BATCH_ID.eq(batchId))
         .fetchOne()
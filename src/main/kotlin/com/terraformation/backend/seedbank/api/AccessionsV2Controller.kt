@@ -7,9 +7,14 @@ import com.fasterxml.jackson.annotation.JsonValue
 import com.fasterxml.jackson.databind.annotation.JsonDeserialize
 import com.terraformation.backend.api.ApiResponse404
 import com.terraformation.backend.api.ApiResponse409
+import com.terraformation.backend.api.ApiResponse413
+import com.terraformation.backend.api.MULTIPLE_IDS_DESCRIPTION
+import com.terraformation.backend.api.MULTIPLE_IDS_PARAMETER
+import com.terraformation.backend.api.MULTIPLE_IDS_TOO_LARGE_DESCRIPTION
 import com.terraformation.backend.api.SeedBankAppEndpoint
 import com.terraformation.backend.api.SuccessResponsePayload
 import com.terraformation.backend.api.UtcDefaultInstantDeserializer
+import com.terraformation.backend.api.checkMultipleIds
 import com.terraformation.backend.customer.db.FacilityStore
 import com.terraformation.backend.db.default_schema.FacilityId
 import com.terraformation.backend.db.default_schema.ProjectId
@@ -116,6 +121,23 @@ class AccessionsV2Controller(
 
     return GetAccessionResponsePayloadV2(AccessionPayloadV2(accession))
   }
+
+  @ApiResponse(
+      responseCode = "200",
+      description = "The accessions that exist and are accessible by the current user.",
+  )
+  @ApiResponse413(MULTIPLE_IDS_TOO_LARGE_DESCRIPTION)
+  @GetMapping
+  @Operation(summary = "Retrieve several existing accessions at once.")
+  fun getAccessions(
+      @RequestParam(MULTIPLE_IDS_PARAMETER)
+      @Schema(description = MULTIPLE_IDS_DESCRIPTION)
+      ids: List<AccessionId>,
+  ): GetAccessionsResponsePayloadV2 {
+    val accessions = accessionStore.fetchByIds(checkMultipleIds(ids))
+
+    return GetAccessionsResponsePayloadV2(accessions.map { AccessionPayloadV2(it) })
+  }
 }
 
 /**
@@ -464,5 +486,8 @@ data class CreateAccessionResponsePayloadV2(val accession: AccessionPayloadV2) :
 
 data class GetAccessionResponsePayloadV2(val accession: AccessionPayloadV2) : SuccessResponsePayload
 
+data class GetAccessionsResponsePayloadV2(val accessions: List<AccessionPayloadV2>) :
+    SuccessResponsePayload
+
 data class UpdateAccessionResponsePayloadV2(val accession: AccessionPayloadV2) :
     SuccessResponsePayload
@@ -3,6 +3,7 @@ package com.terraformation.backend.seedbank.db
 import com.terraformation.backend.auth.currentUser
 import com.terraformation.backend.customer.db.ParentStore
 import com.terraformation.backend.customer.model.TerrawareUser
+import com.terraformation.backend.customer.model.filterReadable
 import com.terraformation.backend.customer.model.requirePermissions
 import com.terraformation.backend.db.AccessionNotFoundException
 import com.terraformation.backend.db.AccessionSpeciesHasDeliveriesException
@@ -65,6 +66,7 @@ import jakarta.inject.Named
 import java.math.BigDecimal
 import java.time.Clock
 import java.time.LocalDate
+import java.time.ZoneOffset
 import org.jooq.Condition
 import org.jooq.DSLContext
 import org.jooq.Field
@@ -119,6 +121,27 @@ class AccessionStore(
         ?: throw AccessionNotFoundException(accessionId)
   }
 
+  /**
+   * Returns the accessions with a set of IDs, ordered by ID. Accessions that don't exist or that
+   * the current user can't read are omitted from the result rather than treated as errors.
+   *
+   * The accessions are fetched in a single query, and permissions are checked once per combination
+   * of facility and project rather than once per accession.
+   */
+  fun fetchByIds(accessionIds: Collection<AccessionId>): List<AccessionModel> {
+    if (accessionIds.isEmpty()) {
+      return emptyList()
+    }
+
+    val user = currentUser()
+
+    return fetchByCondition(ACCESSIONS.ID.`in`(accessionIds))
+        .filterReadable(
+            parents = { it.facilityId to it.projectId },
+            canRead = { user.canReadAccession(it.id!!) },
+        )
+  }
+
   fun fetchOneByNumber(facilityId: FacilityId, accessionNumber: String): AccessionModel? {
     val model =
         fetchOneByCondition(
@@ -133,6 +156,10 @@ class AccessionStore(
   }
 
   private fun fetchOneByCondition(condition: Condition): AccessionModel? {
+    return fetchByCondition(condition).firstOrNull()
+  }
+
+  private fun fetchByCondition(condition: Condition): List<AccessionModel> {
     // The accession data forms a tree structure. The parent node is the data from the accessions
     // table itself, as well as data in reference tables where a given accession can only have a
     // single value. For example, there is a species table, but an accession only has one species,
@@ -148,86 +175,90 @@ class AccessionStore(
     val collectorsField = collectorsMultiset()
     val viabilityTestsField = viabilityTestStore.viabilityTestsMultiset()
     val withdrawalsField = withdrawalStore.withdrawalsMultiset()
+    val timeZoneField =
+        DSL.coalesce(ACCESSIONS.facilities.TIME_ZONE, ACCESSIONS.facilities.organizations.TIME_ZONE)
 
-    val record =
-        dslContext
-            .select(
-                ACCESSIONS.asterisk(),
-                ACCESSIONS.species.COMMON_NAME,
-                ACCESSIONS.species.SCIENTIFIC_NAME,
-                ACCESSIONS.subLocations.NAME,
-                bagNumbersField,
-                geolocationsField,
-                hasDeliveriesField,
-                photoFilenamesField,
-                collectorsField,
-                viabilityTestsField,
-                withdrawalsField,
+    return dslContext
+        .select(
+            ACCESSIONS.asterisk(),
+            ACCESSIONS.species.COMMON_NAME,
+            ACCESSIONS.species.SCIENTIFIC_NAME,
+            ACCESSIONS.subLocations.NAME,
+            bagNumbersField,
+            geolocationsField,
+            hasDeliveriesField,
+            photoFilenamesField,
+            collectorsField,
+            viabilityTestsField,
+            withdrawalsField,
+            timeZoneField,
+        )
+        .from(ACCESSIONS)
+        .where(condition)
+        .orderBy(ACCESSIONS.ID)
+        .fetch { record ->
+          with(ACCESSIONS) {
+            AccessionModel(
+                id = record[ID],
+                accessionNumber = record[NUMBER],
+                bagNumbers = record[bagNumbersField],
+                collectedDate = record[COLLECTED_DATE],
+                collectedTime = record[COLLECTED_TIME],
+                collectionSiteCity = record[COLLECTION_SITE_CITY],
+                collectionSiteCountryCode = record[COLLECTION_SITE_COUNTRY_CODE],
+                collectionSiteCountrySubdivision = record[COLLECTION_SITE_COUNTRY_SUBDIVISION],
+                collectionSiteLandowner = record[COLLECTION_SITE_LANDOWNER],
+                collectionSiteName = record[COLLECTION_SITE_NAME],
+                collectionSiteNotes = record[COLLECTION_SITE_NOTES],
+                collectionSource = record[COLLECTION_SOURCE_ID],
+                collectors = record[collectorsField],
+                createdTime = record[CREATED_TIME],
+                dryingEndDate = record[DRYING_END_DATE],
+                estimatedSeedCount = record[EST_SEED_COUNT],
+                estimatedWeight =
+                    SeedQuantityModel.of(record[EST_WEIGHT_QUANTITY], record[EST_WEIGHT_UNITS_ID]),
+                facilityId = record[FACILITY_ID],
+                founderId = record[FOUNDER_ID],
+                geolocations = record[geolocationsField],
+                hasDeliveries = record[hasDeliveriesField],
+                latestObservedQuantity =
+                    SeedQuantityModel.of(
+                        record[LATEST_OBSERVED_QUANTITY],
+                        record[LATEST_OBSERVED_UNITS_ID],
+                    ),
+                latestObservedTime = record[LATEST_OBSERVED_TIME],
+                numberOfTrees = record[TREES_COLLECTED_FROM],
+                photoFilenames = record[photoFilenamesField],
+                processingNotes = record[PROCESSING_NOTES],
+                projectId = record[PROJECT_ID],
+                receivedDate = record[RECEIVED_DATE],
+                remaining =
+                    SeedQuantityModel.of(record[REMAINING_QUANTITY], record[REMAINING_UNITS_ID]),
+                source = record[DATA_SOURCE_ID],
+                species = record[species.SCIENTIFIC_NAME],
+                speciesCommonName = record[species.COMMON_NAME],
+                speciesId = record[SPECIES_ID],
+                state = record[STATE_ID]!!,
+                subLocation = record[subLocations.NAME],
+                subsetCount = record[SUBSET_COUNT],
+                subsetWeightQuantity =
+                    SeedQuantityModel.of(
+                        record[SUBSET_WEIGHT_QUANTITY],
+                        record[SUBSET_WEIGHT_UNITS_ID],
+                    ),
+                totalViabilityPercent = record[TOTAL_VIABILITY_PERCENT],
+                totalWithdrawnCount = record[TOTAL_WITHDRAWN_COUNT],
+                totalWithdrawnWeight =
+                    SeedQuantityModel.of(
+                        record[TOTAL_WITHDRAWN_WEIGHT_QUANTITY],
+                        record[TOTAL_WITHDRAWN_WEIGHT_UNITS_ID],
+                    ),
+                viabilityTests = record[viabilityTestsField],
+                withdrawals = record[withdrawalsField],
+                clock = clock.withZone(record[timeZoneField] ?: ZoneOffset.UTC),
             )
-            .from(ACCESSIONS)
-            .where(condition)
-            .fetchOne() ?: return null
-
-    return with(ACCESSIONS) {
-      AccessionModel(
-          id = record[ID],
-          accessionNumber = record[NUMBER],
-          bagNumbers = record[bagNumbersField],
-          collectedDate = record[COLLECTED_DATE],
-          collectedTime = record[COLLECTED_TIME],
-          collectionSiteCity = record[COLLECTION_SITE_CITY],
-          collectionSiteCountryCode = record[COLLECTION_SITE_COUNTRY_CODE],
-          collectionSiteCountrySubdivision = record[COLLECTION_SITE_COUNTRY_SUBDIVISION],
-          collectionSiteLandowner = record[COLLECTION_SITE_LANDOWNER],
-          collectionSiteName = record[COLLECTION_SITE_NAME],
-          collectionSiteNotes = record[COLLECTION_SITE_NOTES],
-          collectionSource = record[COLLECTION_SOURCE_ID],
-          collectors = record[collectorsField],
-          createdTime = record[CREATED_TIME],
-          dryingEndDate = record[DRYING_END_DATE],
-          estimatedSeedCount = record[EST_SEED_COUNT],
-          estimatedWeight =
-              SeedQuantityModel.of(record[EST_WEIGHT_QUANTITY], record[EST_WEIGHT_UNITS_ID]),
-          facilityId = record[FACILITY_ID],
-          founderId = record[FOUNDER_ID],
-          geolocations = record[geolocationsField],
-          hasDeliveries = record[hasDeliveriesField],
-          latestObservedQuantity =
-              SeedQuantityModel.of(
-                  record[LATEST_OBSERVED_QUANTITY],
-                  record[LATEST_OBSERVED_UNITS_ID],
-              ),
-          latestObservedTime = record[LATEST_OBSERVED_TIME],
-          numberOfTrees = record[TREES_COLLECTED_FROM],
-          photoFilenames = record[photoFilenamesField],
-          processingNotes = record[PROCESSING_NOTES],
-          projectId = record[PROJECT_ID],
-          receivedDate = record[RECEIVED_DATE],
-          remaining = SeedQuantityModel.of(record[REMAINING_QUANTITY], record[REMAINING_UNITS_ID]),
-          source = record[DATA_SOURCE_ID],
-          species = record[species.SCIENTIFIC_NAME],
-          speciesCommonName = record[species.COMMON_NAME],
-          speciesId = record[SPECIES_ID],
-          state = record[STATE_ID]!!,
-          subLocation = record[subLocations.NAME],
-          subsetCount = record[SUBSET_COUNT],
-          subsetWeightQuantity =
-              SeedQuantityModel.of(
-                  record[SUBSET_WEIGHT_QUANTITY],
-                  record[SUBSET_WEIGHT_UNITS_ID],
-              ),
-          totalViabilityPercent = record[TOTAL_VIABILITY_PERCENT],
-          totalWithdrawnCount = record[TOTAL_WITHDRAWN_COUNT],
-          totalWithdrawnWeight =
-              SeedQuantityModel.of(
-                  record[TOTAL_WITHDRAWN_WEIGHT_QUANTITY],
-                  record[TOTAL_WITHDRAWN_WEIGHT_UNITS_ID],
-              ),
-          viabilityTests = record[viabilityTestsField],
-          withdrawals = record[withdrawalsField],
-          clock = getClock(record[ID]!!),
-      )
-    }
+          }
+        }
   }
 
   fun create(accession: AccessionModel): AccessionModel {
@@ -1333,10 +1364,6 @@ class AccessionStore(
     return stats ?: throw IllegalStateException("Unable to calculate statistics")
   }
 
-  fun getClock(accessionId: AccessionId): Clock {
-    return clock.withZone(parentStore.getEffectiveTimeZone(accessionId))
-  }
-
   /**
    * Runs a function on each accession in the database. Usually used for data migrations.
    *
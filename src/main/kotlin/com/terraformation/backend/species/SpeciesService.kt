@@ -41,45 +41,38 @@ class SpeciesService(
 ) {
   /** Creates a new species and checks it for potential problems. */
   fun createSpecies(model: NewSpeciesModel): SpeciesId {
-    return dslContext.transactionResult { _ ->
-      val speciesDetails: GbifTaxonModel? by lazy {
-        gbifStore.fetchOneByScientificName(model.scientificName)
-      }
-      val gbifSource: SpeciesDataSourceModel by lazy {
-        SpeciesDataSourceModel(
-            externalDatasetStore.getDatasetDate(ExternalDatasetType.GBIF),
-            ExternalDatasetType.GBIF,
-        )
-      }
-      val commonNameSource =
-          if (
-              model.commonName != null &&
-                  speciesDetails?.vernacularNames?.any { it.name == model.commonName } == true
-          ) {
-            gbifSource
-          } else {
-            null
-          }
-      val familyNameSource =
-          if (model.familyName != null && speciesDetails?.familyName == model.familyName) {
-            gbifSource
-          } else {
-            null
-          }
-
-      val populatedModel =
-          model.copy(commonNameSource = commonNameSource, familyNameSource = familyNameSource)
+    return dslContext.transactionResult { _ -> createSpeciesInTransaction(model) }
+  }
 
-      val speciesId = speciesStore.createSpecies(populatedModel)
-      speciesChecker.checkSpecies(speciesId)
+  /**
+   * Creates a list of species in a single transaction and checks them for potential problems.
+   * Species whose scientific names are already in use in their organizations, or that appear more
+   * than once in the list, are skipped rather than causing the whole list to fail.
+   *
+   * @return The IDs of the new species in the same order as the models, with null for species
+   *   that were skipped because their names were duplicates.
+   */
+  fun createSpeciesBulk(models: List<NewSpeciesModel>): List<SpeciesId?> {
+    return dslContext.transactionResult { _ ->
+      val usedNames =
+          models
+              .groupBy { it.organizationId }
+              .mapValues { (organizationId, orgModels) ->
+                speciesStore
+                    .fetchExistingScientificNames(
+                        organizationId,
+                        orgModels.map { it.scientificName }.toSet(),
+                    )
+                    .toMutableSet()
+              }
 
-      if (model.projectIds.isNotEmpty()) {
-        projectSpeciesStore.assignProjects(mapOf(speciesId to model.projectIds))
-      } else {
-        projectSpeciesStore.resetNativities(speciesId)
+      models.map { model ->
+        if (usedNames.getValue(model.organizationId).add(model.scientificName)) {
+          createSpeciesInTransaction(model)
+        } else {
+          null
+        }
       }
-
-      speciesId
     }
   }
 
@@ -168,6 +161,47 @@ class SpeciesService(
     }
   }
 
+  private fun createSpeciesInTransaction(model: NewSpeciesModel): SpeciesId {
+    val speciesDetails: GbifTaxonModel? by lazy {
+      gbifStore.fetchOneByScientificName(model.scientificName)
+    }
+    val gbifSource: SpeciesDataSourceModel by lazy {
+      SpeciesDataSourceModel(
+          externalDatasetStore.getDatasetDate(ExternalDatasetType.GBIF),
+          ExternalDatasetType.GBIF,
+      )
+    }
+    val commonNameSource =
+        if (
+            model.commonName != null &&
+                speciesDetails?.vernacularNames?.any { it.name == model.commonName } == true
+        ) {
+          gbifSource
+        } else {
+          null
+        }
+    val familyNameSource =
+        if (model.familyName != null && speciesDetails?.familyName == model.familyName) {
+          gbifSource
+        } else {
+          null
+        }
+
+    val populatedModel =
+        model.copy(commonNameSource = commonNameSource, familyNameSource = familyNameSource)
+
+    val speciesId = speciesStore.createSpecies(populatedModel)
+    speciesChecker.checkSpecies(speciesId)
+
+    if (model.projectIds.isNotEmpty()) {
+      projectSpeciesStore.assignProjects(mapOf(speciesId to model.projectIds))
+    } else {
+      projectSpeciesStore.resetNativities(speciesId)
+    }
+
+    return speciesId
+  }
+
   private fun resetNativitiesIfRenamed(
       changedFrom: ExistingSpeciesModel,
       changedTo: ExistingSpeciesModel,
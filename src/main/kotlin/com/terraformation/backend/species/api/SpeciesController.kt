@@ -1,14 +1,21 @@
 package com.terraformation.backend.species.api
 
+import com.fasterxml.jackson.annotation.JsonFilter
 import com.fasterxml.jackson.annotation.JsonInclude
 import com.terraformation.backend.api.ApiResponse404
 import com.terraformation.backend.api.ApiResponse409
+import com.terraformation.backend.api.ApiResponse413
 import com.terraformation.backend.api.ApiResponseSimpleSuccess
 import com.terraformation.backend.api.DuplicateNameException
 import com.terraformation.backend.api.ResourceInUseException
+import com.terraformation.backend.api.SPARSE_FIELDS_DESCRIPTION
+import com.terraformation.backend.api.SPARSE_FIELDS_FILTER
+import com.terraformation.backend.api.SPARSE_FIELDS_PARAMETER
 import com.terraformation.backend.api.SeedBankAppEndpoint
 import com.terraformation.backend.api.SimpleSuccessResponsePayload
+import com.terraformation.backend.api.SparseFields
 import com.terraformation.backend.api.SuccessResponsePayload
+import com.terraformation.backend.api.validateSparseFields
 import com.terraformation.backend.customer.db.SimpleUserStore
 import com.terraformation.backend.customer.model.SimpleUserModel
 import com.terraformation.backend.db.ScientificNameExistsException
@@ -41,6 +48,9 @@ import io.swagger.v3.oas.annotations.media.ArraySchema
 import io.swagger.v3.oas.annotations.media.Schema
 import io.swagger.v3.oas.annotations.responses.ApiResponse
 import io.swagger.v3.oas.annotations.responses.ApiResponses
+import jakarta.validation.constraints.Size
+import jakarta.ws.rs.WebApplicationException
+import jakarta.ws.rs.core.Response
 import java.math.BigDecimal
 import java.time.Instant
 import org.springframework.dao.DataIntegrityViolationException
@@ -66,6 +76,7 @@ class SpeciesController(
 ) {
   @GetMapping
   @Operation(summary = "Lists all the species available in an organization.")
+  @SparseFields
   fun listSpecies(
       @RequestParam
       @Schema(description = "Organization whose species should be listed.")
@@ -76,9 +87,18 @@ class SpeciesController(
               "Only list species that are currently used in the organization's inventory, accessions or planting sites."
       )
       inUse: Boolean?,
+      @RequestParam(SPARSE_FIELDS_PARAMETER)
+      @Schema(description = SPARSE_FIELDS_DESCRIPTION)
+      fields: List<String>?,
   ): ListSpeciesResponsePayload {
-    val problems = speciesStore.findAllProblems(organizationId)
-    val species = speciesStore.findAllSpecies(organizationId, inUse ?: false)
+    val requestedFields = validateSparseFields(fields, SpeciesResponseElement::class)
+    val problems =
+        if (requestedFields == null || "problems" in requestedFields) {
+          speciesStore.findAllProblems(organizationId)
+        } else {
+          emptyMap()
+        }
+    val species = speciesStore.findAllSpecies(organizationId, inUse ?: false, requestedFields)
     val overriddenByUserIds = species.flatMap { model ->
       model.projects.mapNotNull { it.overriddenBy }
     }
@@ -109,6 +129,42 @@ class SpeciesController(
     }
   }
 
+  @ApiResponse(
+      responseCode = "200",
+      description =
+          "Species created. Species whose names already exist are skipped, not treated as errors.",
+  )
+  @ApiResponse413(
+      "The request had more than ${CreateSpeciesBulkRequestPayload.MAX_SPECIES} species."
+  )
+  @Operation(
+      summary = "Creates multiple new species.",
+      description =
+          "All the species are created in a single transaction. The response includes the result " +
+              "for each species in the same order as the request.",
+  )
+  @PostMapping("/bulk")
+  fun createSpeciesBulk(
+      @RequestBody payload: CreateSpeciesBulkRequestPayload
+  ): CreateSpeciesBulkResponsePayload {
+    val maxSpecies = CreateSpeciesBulkRequestPayload.MAX_SPECIES
+
+    if (payload.species.size > maxSpecies) {
+      throw WebApplicationException(
+          "Request must contain $maxSpecies or fewer species",
+          Response.Status.REQUEST_ENTITY_TOO_LARGE,
+      )
+    }
+
+    val speciesIds = speciesService.createSpeciesBulk(payload.species.map { it.toNew() })
+
+    return CreateSpeciesBulkResponsePayload(
+        payload.species.zip(speciesIds) { species, speciesId ->
+          CreateSpeciesBulkResultElement(species.scientificName, speciesId)
+        }
+    )
+  }
+
   @ApiResponse(responseCode = "200", description = "Species retrieved.")
   @ApiResponse404
   @GetMapping("/{speciesId}")
@@ -329,6 +385,7 @@ data class SpeciesProjectElement(
   )
 }
 
+@JsonFilter(SPARSE_FIELDS_FILTER)
 @JsonInclude(JsonInclude.Include.NON_NULL)
 data class SpeciesResponseElement(
     val averageWoodDensity: BigDecimal?,
@@ -566,6 +623,51 @@ data class OverrideSpeciesProjectDataRequestPayload(
 
 data class CreateSpeciesResponsePayload(val id: SpeciesId) : SuccessResponsePayload
 
+data class CreateSpeciesBulkRequestPayload(
+    @Size(max = MAX_SPECIES) val species: List<CreateSpeciesRequestPayload>,
+) {
+  companion object {
+    const val MAX_SPECIES = 1000
+  }
+}
+
+enum class CreateSpeciesBulkResult {
+  Created,
+  Duplicate,
+}
+
+@JsonInclude(JsonInclude.Include.NON_NULL)
+data class CreateSpeciesBulkResultElement(
+    @Schema(description = "ID of the new species. Absent if the species was not created.")
+    val id: SpeciesId?,
+    val result: CreateSpeciesBulkResult,
+    val scientificName: String,
+) {
+  constructor(
+      scientificName: String,
+      speciesId: SpeciesId?,
+  ) : this(
+      id = speciesId,
+      result =
+          if (speciesId != null) {
+            CreateSpeciesBulkResult.Created
+          } else {
+            CreateSpeciesBulkResult.Duplicate
+          },
+      scientificName = scientificName,
+  )
+}
+
+data class CreateSpeciesBulkResponsePayload(
+    @ArraySchema(
+        arraySchema =
+            Schema(
+                description = "Result for each requested species, in the same order as the request."
+            )
+    )
+    val results: List<CreateSpeciesBulkResultElement>,
+) : SuccessResponsePayload
+
 data class GetSpeciesResponsePayload(val species: SpeciesResponseElement) : SuccessResponsePayload
 
 data class ListSpeciesResponsePayload(val species: List<SpeciesResponseElement>) :
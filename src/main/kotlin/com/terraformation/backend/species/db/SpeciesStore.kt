@@ -295,9 +295,16 @@ class SpeciesStore(
         ?.value1() ?: 0
   }
 
+  /**
+   * Returns an organization's species.
+   *
+   * @param fields If non-null, only these properties of the models need to be populated. The
+   *   others may be left empty, which saves looking up the sets of values stored in child tables.
+   */
   fun findAllSpecies(
       organizationId: OrganizationId,
       inUse: Boolean = false,
+      fields: Set<String>? = null,
   ): List<ExistingSpeciesModel> {
     requirePermissions { readOrganization(organizationId) }
 
@@ -308,14 +315,27 @@ class SpeciesStore(
           DSL.noCondition()
         }
 
+    fun <T> ifRequested(name: String, field: Field<T>): Field<T>? =
+        if (fields == null || name in fields) field else null
+
+    val ecosystemTypesField = ifRequested("ecosystemTypes", speciesEcosystemTypesMultiset)
+    val growthFormsField = ifRequested("growthForms", speciesGrowthFormsMultiset)
+    val plantMaterialSourcingMethodsField =
+        ifRequested("plantMaterialSourcingMethods", speciesPlantMaterialSourcingMethodsMultiset)
+    val projectsField = ifRequested("projects", projectSpeciesMultiset)
+    val successionalGroupsField =
+        ifRequested("successionalGroups", speciesSuccessionalGroupsMultiset)
+
     return dslContext
         .select(
-            SPECIES.asterisk(),
-            projectSpeciesMultiset,
-            speciesEcosystemTypesMultiset,
-            speciesGrowthFormsMultiset,
-            speciesPlantMaterialSourcingMethodsMultiset,
-            speciesSuccessionalGroupsMultiset,
+            listOfNotNull(
+                SPECIES.asterisk(),
+                projectsField,
+                ecosystemTypesField,
+                growthFormsField,
+                plantMaterialSourcingMethodsField,
+                successionalGroupsField,
+            )
         )
         .from(SPECIES)
         .where(SPECIES.ORGANIZATION_ID.eq(organizationId))
@@ -325,11 +345,11 @@ class SpeciesStore(
         .fetch {
           ExistingSpeciesModel.of(
               it,
-              speciesEcosystemTypesMultiset,
-              speciesGrowthFormsMultiset,
-              speciesPlantMaterialSourcingMethodsMultiset,
-              projectSpeciesMultiset,
-              speciesSuccessionalGroupsMultiset,
+              ecosystemTypesField,
+              growthFormsField,
+              plantMaterialSourcingMethodsField,
+              projectsField,
+              successionalGroupsField,
           )
         }
   }
@@ -345,6 +365,29 @@ class SpeciesStore(
     )
   }
 
+  /**
+   * Returns which of a list of scientific names are already used by non-deleted species in an
+   * organization.
+   */
+  fun fetchExistingScientificNames(
+      organizationId: OrganizationId,
+      scientificNames: Collection<String>,
+  ): Set<String> {
+    requirePermissions { readOrganization(organizationId) }
+
+    if (scientificNames.isEmpty()) {
+      return emptySet()
+    }
+
+    return dslContext
+        .select(SPECIES.SCIENTIFIC_NAME)
+        .from(SPECIES)
+        .where(SPECIES.ORGANIZATION_ID.eq(organizationId))
+        .and(SPECIES.SCIENTIFIC_NAME.`in`(scientificNames))
+        .and(SPECIES.DELETED_TIME.isNull)
+        .fetchSet(SPECIES.SCIENTIFIC_NAME.asNonNullable())
+  }
+
   /**
    * Returns a list of IDs of species that haven't yet been checked for possible suggested edits.
    */
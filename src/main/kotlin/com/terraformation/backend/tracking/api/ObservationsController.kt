@@ -1,5 +1,6 @@
 package com.terraformation.backend.tracking.api
 
+import com.fasterxml.jackson.annotation.JsonFilter
 import com.fasterxml.jackson.annotation.JsonInclude
 import com.terraformation.backend.api.ApiResponse200
 import com.terraformation.backend.api.ApiResponse200Photo
@@ -10,13 +11,18 @@ import com.terraformation.backend.api.PHOTO_MAXHEIGHT_DESCRIPTION
 import com.terraformation.backend.api.PHOTO_MAXWIDTH_DESCRIPTION
 import com.terraformation.backend.api.PHOTO_OPERATION_DESCRIPTION
 import com.terraformation.backend.api.RequestBodyPhotoFile
+import com.terraformation.backend.api.SPARSE_FIELDS_DESCRIPTION
+import com.terraformation.backend.api.SPARSE_FIELDS_FILTER
+import com.terraformation.backend.api.SPARSE_FIELDS_PARAMETER
 import com.terraformation.backend.api.SimpleSuccessResponsePayload
+import com.terraformation.backend.api.SparseFields
 import com.terraformation.backend.api.SuccessResponsePayload
 import com.terraformation.backend.api.TrackingEndpoint
 import com.terraformation.backend.api.getFilename
 import com.terraformation.backend.api.getPlainContentType
 import com.terraformation.backend.api.gpxResponse
 import com.terraformation.backend.api.toResponseEntity
+import com.terraformation.backend.api.validateSparseFields
 import com.terraformation.backend.db.SRID
 import com.terraformation.backend.db.default_schema.FileBatchId
 import com.terraformation.backend.db.default_schema.FileId
@@ -50,7 +56,6 @@ import com.terraformation.backend.tracking.db.ObservationStore
 import com.terraformation.backend.tracking.db.PlantingSiteStore
 import com.terraformation.backend.tracking.model.AssignedPlotDetails
 import com.terraformation.backend.tracking.model.ExistingObservationModel
-import com.terraformation.backend.tracking.model.ExistingPlantingSiteModel
 import com.terraformation.backend.tracking.model.NewObservationModel
 import com.terraformation.backend.tracking.model.NewObservedPlotCoordinatesModel
 import com.terraformation.backend.tracking.model.ObservationPlotCounts
@@ -109,6 +114,7 @@ class ObservationsController(
 
   @GetMapping
   @Operation(summary = "Gets a list of observations of planting sites.")
+  @SparseFields
   fun listObservations(
       @RequestParam
       @Schema(
@@ -127,23 +133,47 @@ class ObservationsController(
       @RequestParam(defaultValue = "false")
       @Parameter(description = "If true, return ad-hoc observations instead of scheduled ones.")
       isAdHoc: Boolean = false,
+      @RequestParam(SPARSE_FIELDS_PARAMETER)
+      @Schema(description = SPARSE_FIELDS_DESCRIPTION)
+      fields: List<String>?,
   ): ListObservationsResponsePayload {
+    val requestedFields = validateSparseFields(fields, ObservationPayload::class)
+    val needSiteNames = requestedFields == null || "plantingSiteName" in requestedFields
+    // The deprecated requestedSubzoneIds property is an alias for requestedSubstratumIds.
+    val modelFields =
+        if (requestedFields != null && "requestedSubzoneIds" in requestedFields) {
+          requestedFields + "requestedSubstratumIds"
+        } else {
+          requestedFields
+        }
+
     val observations: Collection<ExistingObservationModel>
-    val plantingSites: Map<PlantingSiteId, ExistingPlantingSiteModel>
+    val siteNames: Map<PlantingSiteId, String>
     val plotCounts: Map<ObservationId, ObservationPlotCounts>
 
+    // Plot counts are always needed for the response's totals.
     if (plantingSiteId != null) {
-      observations = observationStore.fetchObservationsByPlantingSite(plantingSiteId, isAdHoc)
-      plantingSites =
-          mapOf(
-              plantingSiteId to
-                  plantingSiteStore.fetchSiteById(plantingSiteId, PlantingSiteDepth.Site)
-          )
+      observations =
+          observationStore.fetchObservationsByPlantingSite(plantingSiteId, isAdHoc, modelFields)
+      siteNames =
+          if (needSiteNames) {
+            val site = plantingSiteStore.fetchSiteById(plantingSiteId, PlantingSiteDepth.Site)
+            mapOf(plantingSiteId to site.name)
+          } else {
+            emptyMap()
+          }
       plotCounts = observationStore.countPlots(plantingSiteId, isAdHoc)
     } else if (organizationId != null) {
-      observations = observationStore.fetchObservationsByOrganization(organizationId, isAdHoc)
-      plantingSites =
-          plantingSiteStore.fetchSitesByOrganizationId(organizationId).associateBy { it.id }
+      observations =
+          observationStore.fetchObservationsByOrganization(organizationId, isAdHoc, modelFields)
+      siteNames =
+          if (needSiteNames) {
+            plantingSiteStore.fetchSitesByOrganizationId(organizationId).associate {
+              it.id to it.name
+            }
+          } else {
+            emptyMap()
+          }
       plotCounts = observationStore.countPlots(organizationId, isAdHoc)
     } else {
       throw BadRequestException("Must specify organizationId or plantingSiteId")
@@ -153,7 +183,7 @@ class ObservationsController(
       ObservationPayload(
           observation,
           plotCounts[observation.id],
-          plantingSites[observation.plantingSiteId]!!.name,
+          if (needSiteNames) siteNames[observation.plantingSiteId]!! else "",
       )
     }
 
@@ -719,6 +749,7 @@ class ObservationsController(
 }
 
 // response payload
+@JsonFilter(SPARSE_FIELDS_FILTER)
 data class ObservationPayload(
     @Schema(description = "Date this observation is scheduled to end.") //
     val endDate: LocalDate,
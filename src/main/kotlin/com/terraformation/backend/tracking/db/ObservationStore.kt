@@ -158,36 +158,57 @@ class ObservationStore(
         ?: throw ObservationNotFoundException(observationId)
   }
 
+  /**
+   * @param fields If non-null, only these properties of the models need to be populated. The
+   *   requested substratum IDs are only looked up if they're included.
+   */
   fun fetchObservationsByOrganization(
       organizationId: OrganizationId,
       isAdHoc: Boolean = false,
+      fields: Set<String>? = null,
   ): List<ExistingObservationModel> {
     requirePermissions { readOrganization(organizationId) }
 
+    val substratumIdsField = requestedSubstratumIdsFieldFor(fields)
+
     return dslContext
-        .select(OBSERVATIONS.asterisk(), requestedSubstratumIdsField)
+        .select(listOfNotNull(OBSERVATIONS.asterisk(), substratumIdsField))
         .from(OBSERVATIONS)
         .where(OBSERVATIONS.plantingSites.ORGANIZATION_ID.eq(organizationId))
         .and(OBSERVATIONS.IS_AD_HOC.eq(isAdHoc))
         .orderBy(OBSERVATIONS.START_DATE, OBSERVATIONS.ID)
-        .fetch { ObservationModel.of(it, requestedSubstratumIdsField) }
+        .fetch { ObservationModel.of(it, substratumIdsField) }
   }
 
+  /**
+   * @param fields If non-null, only these properties of the models need to be populated. The
+   *   requested substratum IDs are only looked up if they're included.
+   */
   fun fetchObservationsByPlantingSite(
       plantingSiteId: PlantingSiteId,
       isAdHoc: Boolean = false,
+      fields: Set<String>? = null,
   ): List<ExistingObservationModel> {
     requirePermissions { readPlantingSite(plantingSiteId) }
 
+    val substratumIdsField = requestedSubstratumIdsFieldFor(fields)
+
     return dslContext
-        .select(OBSERVATIONS.asterisk(), requestedSubstratumIdsField)
+        .select(listOfNotNull(OBSERVATIONS.asterisk(), substratumIdsField))
         .from(OBSERVATIONS)
         .where(OBSERVATIONS.PLANTING_SITE_ID.eq(plantingSiteId))
         .and(OBSERVATIONS.IS_AD_HOC.eq(isAdHoc))
         .orderBy(OBSERVATIONS.START_DATE, OBSERVATIONS.ID)
-        .fetch { ObservationModel.of(it, requestedSubstratumIdsField) }
+        .fetch { ObservationModel.of(it, substratumIdsField) }
   }
 
+  private fun requestedSubstratumIdsFieldFor(fields: Set<String>?): Field<Set<SubstratumId>>? =
+      if (fields == null || "requestedSubstratumIds" in fields) {
+        requestedSubstratumIdsField
+      } else {
+        null
+      }
+
   fun fetchObservationPlotDetails(observationId: ObservationId): List<AssignedPlotDetails> {
     requirePermissions { readObservation(observationId) }
 
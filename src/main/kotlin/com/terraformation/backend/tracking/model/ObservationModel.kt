@@ -45,7 +45,7 @@ data class ObservationModel<ID : ObservationId?>(
 
     fun of(
         record: Record,
-        requestedSubstratumIdsField: Field<Set<SubstratumId>>,
+        requestedSubstratumIdsField: Field<Set<SubstratumId>>?,
     ): ExistingObservationModel {
       return ObservationModel(
           completedTime = record[OBSERVATIONS.COMPLETED_TIME],
@@ -55,7 +55,7 @@ data class ObservationModel<ID : ObservationId?>(
           observationType = record[OBSERVATIONS.OBSERVATION_TYPE_ID]!!,
           plantingSiteHistoryId = record[OBSERVATIONS.PLANTING_SITE_HISTORY_ID],
           plantingSiteId = record[OBSERVATIONS.PLANTING_SITE_ID]!!,
-          requestedSubstratumIds = record[requestedSubstratumIdsField],
+          requestedSubstratumIds = requestedSubstratumIdsField?.let { record[it] } ?: emptySet(),
           startDate = record[OBSERVATIONS.START_DATE]!!,
           state = record[OBSERVATIONS.STATE_ID]!!,
           upcomingNotificationSentTime = record[OBSERVATIONS.UPCOMING_NOTIFICATION_SENT_TIME],
@@ -0,0 +1,69 @@
+package com.terraformation.backend.api
+
+import jakarta.servlet.http.HttpServlet
+import jakarta.servlet.http.HttpServletRequest
+import jakarta.servlet.http.HttpServletResponse
+import org.junit.jupiter.api.Assertions.assertEquals
+import org.junit.jupiter.api.Assertions.assertNotNull
+import org.junit.jupiter.api.Assertions.assertNull
+import org.junit.jupiter.api.Test
+import org.springframework.mock.web.MockFilterChain
+import org.springframework.mock.web.MockHttpServletRequest
+import org.springframework.mock.web.MockHttpServletResponse
+
+class ReferenceDataEtagFilterTest {
+  private val filter = ReferenceDataEtagFilter()
+
+  @Test
+  fun `adds ETag to reference data responses`() {
+    val response = get("/api/v1/facilities")
+
+    assertNotNull(response.getHeader("ETag"), "ETag")
+    assertEquals(RESPONSE_BODY, response.contentAsString, "Response body")
+  }
+
+  @Test
+  fun `returns 304 if client has the current version`() {
+    val etag = get("/api/v1/species").getHeader("ETag")!!
+
+    val response = get("/api/v1/species", etag)
+
+    assertEquals(304, response.status, "Status")
+    assertEquals("", response.contentAsString, "Response body")
+  }
+
+  @Test
+  fun `returns full response if client has an outdated version`() {
+    val response = get("/api/v1/tracking/sites/1", "\"outdated\"")
+
+    assertEquals(200, response.status, "Status")
+    assertEquals(RESPONSE_BODY, response.contentAsString, "Response body")
+  }
+
+  @Test
+  fun `does not add ETag to other endpoints`() {
+    assertNull(get("/api/v1/facilities/1/devices").getHeader("ETag"), "Facility devices")
+    assertNull(get("/api/v2/seedbank/accessions/1").getHeader("ETag"), "Accession")
+  }
+
+  private fun get(path: String, ifNoneMatch: String? = null): MockHttpServletResponse {
+    val request = MockHttpServletRequest("GET", path)
+    ifNoneMatch?.let { request.addHeader("If-None-Match", it) }
+    val response = MockHttpServletResponse()
+
+    filter.doFilter(request, response, MockFilterChain(JsonServlet()))
+
+    return response
+  }
+
+  private class JsonServlet : HttpServlet() {
+    override fun doGet(req: HttpServletRequest, resp: HttpServletResponse) {
+      resp.contentType = "application/json"
+      resp.writer.write(RESPONSE_BODY)
+    }
+  }
+
+  companion object {
+    private const val RESPONSE_BODY = """{"status":"ok"}"""
+  }
+}
@@ -0,0 +1,79 @@
+package com.terraformation.backend.customer.api
+
+import com.terraformation.backend.api.ControllerIntegrationTest
+import com.terraformation.backend.db.default_schema.FacilityType
+import com.terraformation.backend.db.default_schema.Role
+import org.junit.jupiter.api.BeforeEach
+import org.junit.jupiter.api.Nested
+import org.junit.jupiter.api.Test
+import org.springframework.test.web.servlet.get
+
+class FacilitiesControllerTest : ControllerIntegrationTest() {
+  @BeforeEach
+  fun setUp() {
+    insertOrganization()
+    insertOrganizationUser(role = Role.Admin)
+  }
+
+  @Nested
+  inner class ListAllFacilities {
+    @Test
+    fun `only includes requested fields`() {
+      val seedBankId = insertFacility(type = FacilityType.SeedBank)
+      val nurseryId = insertFacility(type = FacilityType.Nursery)
+
+      mockMvc
+          .get("/api/v1/facilities?fields=id,type")
+          .andExpectJson(
+              """
+                {
+                  "facilities": [
+                    {
+                      "id": $seedBankId,
+                      "type": "Seed Bank"
+                    },
+                    {
+                      "id": $nurseryId,
+                      "type": "Nursery"
+                    }
+                  ],
+                  "status": "ok"
+                }
+              """
+                  .trimIndent(),
+              strict = true,
+          )
+    }
+
+    @Test
+    fun `includes all fields if none are requested`() {
+      val facilityId = insertFacility(name = "Seed Bank Name")
+
+      mockMvc
+          .get("/api/v1/facilities")
+          .andExpectJson(
+              """
+                {
+                  "facilities": [
+                    {
+                      "id": $facilityId,
+                      "name": "Seed Bank Name",
+                      "organizationId": ${inserted.organizationId},
+                      "type": "Seed Bank"
+                    }
+                  ],
+                  "status": "ok"
+                }
+              """
+                  .trimIndent()
+          )
+    }
+
+    @Test
+    fun `rejects unknown fields`() {
+      insertFacility()
+
+      mockMvc.get("/api/v1/facilities?fields=id,bogus").andExpect { status { isBadRequest() } }
+    }
+  }
+}
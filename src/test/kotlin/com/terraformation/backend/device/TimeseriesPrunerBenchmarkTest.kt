@@ -0,0 +1,171 @@
+package com.terraformation.backend.device
+
+import com.terraformation.backend.RunsAsUser
+import com.terraformation.backend.TestClock
+import com.terraformation.backend.customer.model.TerrawareUser
+import com.terraformation.backend.db.DatabaseTest
+import com.terraformation.backend.db.default_schema.TimeseriesId
+import com.terraformation.backend.db.default_schema.tables.references.ORGANIZATIONS
+import com.terraformation.backend.db.default_schema.tables.references.TIMESERIES_VALUES
+import com.terraformation.backend.db.default_schema.tables.references.USERS
+import com.terraformation.backend.device.db.TimeseriesStore
+import com.terraformation.backend.getEnvOrSkipTest
+import com.terraformation.backend.log.perClassLogger
+import com.terraformation.backend.mockUser
+import io.micrometer.core.instrument.simple.SimpleMeterRegistry
+import io.mockk.every
+import java.time.Duration
+import java.time.Instant
+import java.util.concurrent.Executors
+import java.util.concurrent.atomic.AtomicBoolean
+import org.junit.jupiter.api.AfterEach
+import org.junit.jupiter.api.BeforeEach
+import org.junit.jupiter.api.Test
+import org.springframework.transaction.annotation.Propagation
+import org.springframework.transaction.annotation.Transactional
+
+/**
+ * Measures how fast [TimeseriesPruner] works through a large backlog and how much it slows down
+ * concurrent inserts of new timeseries values.
+ *
+ * This is a benchmark rather than a correctness test, so it is skipped unless the
+ * `TEST_TIMESERIES_PRUNER_BENCHMARK_ROWS` environment variable is set to the number of expired
+ * values to seed, e.g., 20000000. Unlike other database tests, it commits its data so that the
+ * pruner and the inserts can run concurrently on separate connections; it deletes the data
+ * afterwards, but it should be run by itself rather than as part of the full test suite.
+ */
+@Transactional(propagation = Propagation.NOT_SUPPORTED)
+class TimeseriesPrunerBenchmarkTest : DatabaseTest(), RunsAsUser {
+  override val user: TerrawareUser = mockUser()
+
+  private val log = perClassLogger()
+
+  private val clock = TestClock()
+  private val pruner by lazy { TimeseriesPruner(clock, dslContext, SimpleMeterRegistry()) }
+  private val store by lazy { TimeseriesStore(clock, dslContext) }
+
+  private val numTimeseries = 10
+  private val valueInterval = Duration.ofSeconds(30)
+
+  @BeforeEach
+  fun setUp() {
+    every { user.canReadTimeseries(any()) } returns true
+    every { user.canUpdateTimeseries(any()) } returns true
+
+    insertOrganization()
+    insertFacility()
+    insertDevice()
+  }
+
+  @AfterEach
+  fun cleanUp() {
+    // Deleting the organization cascades to the facility, device, timeseries, and values.
+    dslContext
+        .deleteFrom(ORGANIZATIONS)
+        .where(ORGANIZATIONS.ID.`in`(inserted.organizationIds))
+        .execute()
+    dslContext.deleteFrom(USERS).where(USERS.ID.`in`(inserted.userIds)).execute()
+  }
+
+  @Test
+  fun `prune large backlog while recording new values`() {
+    val totalRows = getEnvOrSkipTest("TEST_TIMESERIES_PRUNER_BENCHMARK_ROWS").toLong()
+    val rowsPerTimeseries = totalRows / numTimeseries
+
+    // All the seeded values are older than the retention period.
+    val seededDuration = valueInterval.multipliedBy(rowsPerTimeseries)
+    clock.instant = Instant.EPOCH.plus(seededDuration).plus(Duration.ofDays(2))
+
+    val timeseriesIds = List(numTimeseries) { insertTimeseries(retentionDays = 1) }
+    val liveTimeseriesId = insertTimeseries()
+
+    val seedStart = System.nanoTime()
+    timeseriesIds.forEach { seedValues(it, rowsPerTimeseries) }
+    log.info("Seeded $totalRows values in ${elapsedSince(seedStart)}")
+
+    val baselineLatencies = recordValues(liveTimeseriesId, Instant.EPOCH, 1000)
+    log.info("Insert latency without pruning: ${summarize(baselineLatencies)}")
+
+    val pruning = AtomicBoolean(true)
+    val executor = Executors.newSingleThreadExecutor()
+    val concurrentLatencies =
+        executor.submit<List<Duration>> {
+          val latencies = mutableListOf<Duration>()
+          var nextTime = Instant.EPOCH.plus(Duration.ofDays(1))
+          while (pruning.get()) {
+            latencies.addAll(recordValues(liveTimeseriesId, nextTime, 100))
+            nextTime = nextTime.plus(Duration.ofDays(1))
+          }
+          latencies
+        }
+
+    val pruneStart = System.nanoTime()
+    do {
+      pruner.pruneTimeseriesValues()
+    } while (
+        dslContext.fetchExists(
+            TIMESERIES_VALUES,
+            TIMESERIES_VALUES.TIMESERIES_ID.`in`(timeseriesIds),
+        )
+    )
+    val pruneTime = elapsedSince(pruneStart)
+    pruning.set(false)
+
+    log.info(
+        "Pruned $totalRows values in $pruneTime " +
+            "(${totalRows * 1000 / maxOf(1, pruneTime.toMillis())} rows/sec); " +
+            "final batch size ${pruner.batchSize}"
+    )
+    log.info("Insert latency during pruning: ${summarize(concurrentLatencies.get())}")
+
+    executor.shutdown()
+  }
+
+  private fun seedValues(timeseriesId: TimeseriesId, count: Long) {
+    val chunkSize = 1000000L
+    for (start in 0 until count step chunkSize) {
+      val end = minOf(count, start + chunkSize) - 1
+      dslContext.execute(
+          "INSERT INTO timeseries_values (timeseries_id, created_time, value) " +
+              "SELECT ?, to_timestamp(n * ?), (n % 100)::text FROM generate_series(?, ?) AS n",
+          timeseriesId.value,
+          valueInterval.seconds,
+          start,
+          end,
+      )
+    }
+  }
+
+  /** Mimics the database work done by the record values endpoint for each value. */
+  private fun recordValues(
+      timeseriesId: TimeseriesId,
+      startTime: Instant,
+      count: Int,
+  ): List<Duration> {
+    val deviceId = inserted.deviceId
+    return user.run {
+      List(count) { index ->
+        val timestamp = startTime.plus(valueInterval.multipliedBy(index.toLong()))
+        val start = System.nanoTime()
+        store.checkExistingValues(timeseriesId, listOf(timestamp))
+        store.insertValue(deviceId, timeseriesId, "$index", timestamp)
+        elapsedSince(start)
+      }
+    }
+  }
+
+  private fun summarize(latencies: List<Duration>): String {
+    if (latencies.isEmpty()) {
+      return "no samples"
+    }
+
+    val sorted = latencies.sorted()
+    fun percentile(p: Int) = sorted[minOf(sorted.size - 1, sorted.size * p / 100)].toMillis()
+
+    return "${sorted.size} inserts, p50 ${percentile(50)}ms, p99 ${percentile(99)}ms, " +
+        "max ${sorted.last().toMillis()}ms"
+  }
+
+  private fun elapsedSince(startNanos: Long): Duration =
+      Duration.ofNanos(System.nanoTime() - startNanos)
+}
@@ -7,8 +7,11 @@ import com.terraformation.backend.db.DatabaseTest
 import com.terraformation.backend.db.default_schema.tables.records.TimeseriesValuesRecord
 import com.terraformation.backend.db.default_schema.tables.references.TIMESERIES_VALUES
 import com.terraformation.backend.mockUser
+import io.micrometer.core.instrument.simple.SimpleMeterRegistry
+import java.time.Duration
 import java.time.Instant
 import java.time.temporal.ChronoUnit
+import org.junit.jupiter.api.Assertions.assertEquals
 import org.junit.jupiter.api.BeforeEach
 import org.junit.jupiter.api.Test
 
@@ -16,7 +19,8 @@ class TimeseriesPrunerTest : DatabaseTest(), RunsAsUser {
   override val user: TerrawareUser = mockUser()
 
   private val clock = TestClock()
-  private val pruner by lazy { TimeseriesPruner(clock, dslContext) }
+  private val meterRegistry = SimpleMeterRegistry()
+  private val pruner by lazy { TimeseriesPruner(clock, dslContext, meterRegistry) }
 
   @BeforeEach
   fun setUp() {
@@ -73,6 +77,58 @@ class TimeseriesPrunerTest : DatabaseTest(), RunsAsUser {
     assertTableEquals(List(7) { TimeseriesValuesRecord(timeseriesId, daysAgo(it), "1") })
   }
 
+  @Test
+  fun `deletes backlog in multiple batches`() {
+    val timeseriesId = insertTimeseries(retentionDays = 5)
+    List(20) { index -> insertTimeseriesValue(createdTime = daysAgo(index)) }
+
+    pruner.batchSize = 2
+    pruner.minBatchSize = 2
+    pruner.maxBatchSize = 2
+    pruner.pruneTimeseriesValues()
+
+    assertTableEquals(List(6) { TimeseriesValuesRecord(timeseriesId, daysAgo(it), "1") })
+    assertEquals(
+        14.0,
+        meterRegistry.get("terraware.timeseries.pruner.rows.deleted").counter().count(),
+        "Rows deleted metric",
+    )
+  }
+
+  @Test
+  fun `reports lag of timeseries that could not be fully pruned`() {
+    insertTimeseries(retentionDays = 5)
+    List(10) { index -> insertTimeseriesValue(createdTime = daysAgo(index)) }
+
+    pruner.maxRowsToDelete = 2
+    pruner.pruneTimeseriesValues()
+
+    // Oldest remaining value is 7 days old; retention is 5 days.
+    assertEquals(
+        Duration.ofDays(2).seconds.toDouble(),
+        meterRegistry.get("terraware.timeseries.pruner.lag.seconds").gauge().value(),
+        "Lag metric",
+    )
+    assertEquals(
+        1.0,
+        meterRegistry.get("terraware.timeseries.pruner.backlog").gauge().value(),
+        "Backlog metric",
+    )
+  }
+
+  @Test
+  fun `adjustBatchSize shrinks slow batches and grows fast ones within limits`() {
+    pruner.targetStatementDuration = Duration.ofMillis(100)
+    pruner.minBatchSize = 10
+    pruner.maxBatchSize = 1000
+
+    assertEquals(50, pruner.adjustBatchSize(100, Duration.ofMillis(150)), "Slow batch")
+    assertEquals(10, pruner.adjustBatchSize(15, Duration.ofMillis(150)), "Slow batch at minimum")
+    assertEquals(200, pruner.adjustBatchSize(100, Duration.ofMillis(10)), "Fast batch")
+    assertEquals(1000, pruner.adjustBatchSize(800, Duration.ofMillis(10)), "Fast batch at maximum")
+    assertEquals(100, pruner.adjustBatchSize(100, Duration.ofMillis(75)), "Batch near target")
+  }
+
   private fun daysSinceEpoch(days: Int) = Instant.EPOCH.plus(days.toLong(), ChronoUnit.DAYS)
 
   private fun daysAgo(days: Int) = clock.instant().minus(days.toLong(), ChronoUnit.DAYS)
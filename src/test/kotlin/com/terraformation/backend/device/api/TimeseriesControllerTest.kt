@@ -5,12 +5,15 @@ import com.terraformation.backend.api.SuccessOrError
 import com.terraformation.backend.customer.db.FacilityStore
 import com.terraformation.backend.customer.db.ParentStore
 import com.terraformation.backend.customer.model.TerrawareUser
+import com.terraformation.backend.db.TimeseriesNotFoundException
 import com.terraformation.backend.db.default_schema.DeviceId
 import com.terraformation.backend.db.default_schema.FacilityConnectionState
 import com.terraformation.backend.db.default_schema.TimeseriesId
 import com.terraformation.backend.db.default_schema.TimeseriesType
 import com.terraformation.backend.device.db.TimeseriesStore
+import com.terraformation.backend.device.model.TimeseriesAggregation
 import com.terraformation.backend.device.model.TimeseriesModel
+import com.terraformation.backend.device.model.TimeseriesValueModel
 import com.terraformation.backend.mockUser
 import io.mockk.Runs
 import io.mockk.every
@@ -19,11 +22,13 @@ import io.mockk.mockk
 import io.mockk.runs
 import io.mockk.verify
 import java.lang.RuntimeException
+import java.time.Duration
 import java.time.Instant
 import org.junit.jupiter.api.Assertions.assertEquals
 import org.junit.jupiter.api.Assertions.assertNull
 import org.junit.jupiter.api.BeforeEach
 import org.junit.jupiter.api.Test
+import org.junit.jupiter.api.assertThrows
 import org.springframework.dao.DuplicateKeyException
 import org.springframework.http.ResponseEntity
 
@@ -170,6 +175,71 @@ internal class TimeseriesControllerTest : RunsAsUser {
     assertEquals(expected, response)
   }
 
+  @Test
+  fun `getTimeseriesHistory returns values in requested order`() {
+    val ts1 = timeseriesModel(tsId1, deviceId1, "ts1")
+    val ts2 = timeseriesModel(tsId2, deviceId1, "ts2")
+    val startTime = Instant.EPOCH
+    val endTime = Instant.ofEpochSecond(3600)
+
+    every { timeseriesStore.fetchOneByName(deviceId1, "ts1") } returns ts1
+    every { timeseriesStore.fetchOneByName(deviceId1, "ts2") } returns ts2
+    every {
+      timeseriesStore.fetchHistory(
+          listOf(ts2, ts1),
+          startTime,
+          endTime,
+          Duration.ofMinutes(10),
+          TimeseriesAggregation.Maximum,
+      )
+    } returns mapOf(tsId1 to listOf(TimeseriesValueModel(tsId1, startTime, "5")))
+
+    val response =
+        controller.getTimeseriesHistory(
+            GetTimeseriesHistoryRequestPayload(
+                startTime,
+                endTime,
+                listOf(
+                    TimeseriesReferencePayload(deviceId1, "ts2"),
+                    TimeseriesReferencePayload(deviceId1, "ts1"),
+                ),
+                600,
+                TimeseriesAggregation.Maximum,
+            )
+        )
+
+    val expected =
+        GetTimeseriesHistoryResponsePayload(
+            listOf(
+                TimeseriesValuesPayload(deviceId1, "ts2", emptyList()),
+                TimeseriesValuesPayload(
+                    deviceId1,
+                    "ts1",
+                    listOf(TimeseriesValuePayload(startTime, "5")),
+                ),
+            )
+        )
+
+    assertEquals(expected, response)
+  }
+
+  @Test
+  fun `getTimeseriesHistory throws exception if timeseries does not exist`() {
+    every { timeseriesStore.fetchOneByName(deviceId1, "ts1") } returns null
+
+    assertThrows<TimeseriesNotFoundException> {
+      controller.getTimeseriesHistory(
+          GetTimeseriesHistoryRequestPayload(
+              Instant.EPOCH,
+              Instant.ofEpochSecond(60),
+              listOf(TimeseriesReferencePayload(deviceId1, "ts1")),
+              null,
+              null,
+          )
+      )
+    }
+  }
+
   private fun timeseriesModel(
       id: TimeseriesId,
       deviceId: DeviceId = DeviceId(id.value),
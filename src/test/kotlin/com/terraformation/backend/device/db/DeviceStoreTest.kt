@@ -0,0 +1,72 @@
+package com.terraformation.backend.device.db
+
+import com.terraformation.backend.RunsAsUser
+import com.terraformation.backend.customer.model.TerrawareUser
+import com.terraformation.backend.db.DatabaseTest
+import com.terraformation.backend.db.default_schema.DeviceId
+import com.terraformation.backend.mockUser
+import io.mockk.every
+import org.junit.jupiter.api.Assertions.assertEquals
+import org.junit.jupiter.api.BeforeEach
+import org.junit.jupiter.api.Nested
+import org.junit.jupiter.api.Test
+
+internal class DeviceStoreTest : DatabaseTest(), RunsAsUser {
+  override val user: TerrawareUser = mockUser()
+
+  private val store: DeviceStore by lazy { DeviceStore(devicesDao) }
+
+  @BeforeEach
+  fun setUp() {
+    insertOrganization()
+
+    every { user.canReadDevice(any()) } returns true
+  }
+
+  @Nested
+  inner class FetchByIds {
+    @Test
+    fun `returns devices in ID order`() {
+      insertFacility()
+      val deviceId1 = insertDevice()
+      val deviceId2 = insertDevice()
+      val deviceId3 = insertDevice()
+
+      assertEquals(
+          listOf(deviceId1, deviceId2, deviceId3),
+          store.fetchByIds(listOf(deviceId3, deviceId1, deviceId2)).map { it.id },
+      )
+    }
+
+    @Test
+    fun `omits devices that do not exist`() {
+      insertFacility()
+      val deviceId = insertDevice()
+
+      assertEquals(listOf(deviceId), store.fetchByIds(listOf(DeviceId(-1), deviceId)).map { it.id })
+    }
+
+    @Test
+    fun `omits devices at facilities the user cannot read`() {
+      insertFacility()
+      val readableDeviceId1 = insertDevice()
+      val readableDeviceId2 = insertDevice()
+      insertFacility()
+      val unreadableDeviceId = insertDevice()
+
+      every { user.canReadDevice(unreadableDeviceId) } returns false
+
+      assertEquals(
+          listOf(readableDeviceId1, readableDeviceId2),
+          store
+              .fetchByIds(listOf(unreadableDeviceId, readableDeviceId2, readableDeviceId1))
+              .map { it.id },
+      )
+    }
+
+    @Test
+    fun `returns empty list if no IDs are requested`() {
+      assertEquals(emptyList<DeviceId>(), store.fetchByIds(emptyList()).map { it.id })
+    }
+  }
+}
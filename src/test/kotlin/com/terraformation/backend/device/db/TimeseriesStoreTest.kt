@@ -12,6 +12,7 @@ import com.terraformation.backend.db.default_schema.tables.pojos.TimeseriesRow
 import com.terraformation.backend.db.default_schema.tables.pojos.TimeseriesValuesRow
 import com.terraformation.backend.db.default_schema.tables.records.TimeseriesValuesRecord
 import com.terraformation.backend.db.default_schema.tables.references.TIMESERIES_VALUES
+import com.terraformation.backend.device.model.TimeseriesAggregation
 import com.terraformation.backend.device.model.TimeseriesModel
 import com.terraformation.backend.device.model.TimeseriesValueModel
 import com.terraformation.backend.mockUser
@@ -291,4 +292,101 @@ internal class TimeseriesStoreTest : DatabaseTest(), RunsAsUser {
     val actual = store.fetchByDeviceId(deviceId)
     assertEquals(expected, actual)
   }
+
+  @Test
+  fun `fetchHistory returns raw values in time range`() {
+    val model = insertTimeseriesWithValues("1", "2", "3", "4")
+
+    val expected =
+        mapOf(
+            model.id to
+                listOf(
+                    TimeseriesValueModel(model.id, Instant.ofEpochSecond(60), "2"),
+                    TimeseriesValueModel(model.id, Instant.ofEpochSecond(120), "3"),
+                )
+        )
+
+    val actual =
+        store.fetchHistory(listOf(model), Instant.ofEpochSecond(60), Instant.ofEpochSecond(180))
+
+    assertEquals(expected, actual)
+  }
+
+  @Test
+  fun `fetchHistory aggregates values in buckets`() {
+    val model = insertTimeseriesWithValues("1", "5", "2", "8", "4")
+    val startTime = Instant.EPOCH
+    val endTime = Instant.ofEpochSecond(300)
+    val bucketSize = Duration.ofMinutes(2)
+
+    fun history(aggregation: TimeseriesAggregation) =
+        store.fetchHistory(listOf(model), startTime, endTime, bucketSize, aggregation)[model.id]
+
+    fun values(vararg values: String) =
+        values.mapIndexed { index, value ->
+          TimeseriesValueModel(model.id, Instant.ofEpochSecond(index * 120L), value)
+        }
+
+    assertEquals(values("5", "8", "4"), history(TimeseriesAggregation.Last), "Last")
+    assertEquals(values("5", "8", "4"), history(TimeseriesAggregation.Maximum), "Maximum")
+    assertEquals(values("1", "2", "4"), history(TimeseriesAggregation.Minimum), "Minimum")
+    assertEquals(values("3", "5", "4"), history(TimeseriesAggregation.Average), "Average")
+  }
+
+  @Test
+  fun `fetchHistory throws exception if numeric aggregation is requested for text timeseries`() {
+    val model = insertTimeseriesWithValues("a", "b", type = TimeseriesType.Text)
+
+    assertThrows<IllegalArgumentException> {
+      store.fetchHistory(
+          listOf(model),
+          Instant.EPOCH,
+          Instant.ofEpochSecond(300),
+          Duration.ofMinutes(1),
+          TimeseriesAggregation.Average,
+      )
+    }
+  }
+
+  @Test
+  fun `fetchHistory throws exception if there would be too many buckets`() {
+    val model = insertTimeseriesWithValues("1")
+
+    assertThrows<IllegalArgumentException> {
+      store.fetchHistory(
+          listOf(model),
+          Instant.EPOCH,
+          Instant.ofEpochSecond(TimeseriesStore.MAX_HISTORY_BUCKETS + 1L),
+          Duration.ofSeconds(1),
+      )
+    }
+  }
+
+  @Test
+  fun `fetchHistory throws exception if user has no permission to read timeseries`() {
+    val model = insertTimeseriesWithValues("1")
+
+    every { user.canReadTimeseries(any()) } returns false
+
+    assertThrows<TimeseriesNotFoundException> {
+      store.fetchHistory(listOf(model), Instant.EPOCH, Instant.ofEpochSecond(60))
+    }
+  }
+
+  /** Inserts a timeseries with values recorded one minute apart starting at the epoch. */
+  private fun insertTimeseriesWithValues(
+      vararg values: String,
+      type: TimeseriesType = TimeseriesType.Numeric,
+  ): TimeseriesModel {
+    val row = timeseriesRow.copy(typeId = type)
+    timeseriesDao.insert(row)
+
+    val records =
+        values.mapIndexed { index, value ->
+          TimeseriesValuesRecord(row.id, Instant.ofEpochSecond(index * 60L), value)
+        }
+    dslContext.insertInto(TIMESERIES_VALUES).set(records).execute()
+
+    return TimeseriesModel(row.id!!, deviceId, row.name!!, type, row.decimalPlaces, row.units)
+  }
 }
@@ -1,6 +1,8 @@
 package com.terraformation.backend.nursery.db.batchStore
 
+import com.terraformation.backend.db.default_schema.FacilityType
 import com.terraformation.backend.db.default_schema.SeedTreatment
+import com.terraformation.backend.db.nursery.BatchId
 import com.terraformation.backend.db.nursery.BatchSubstrate
 import com.terraformation.backend.db.nursery.WithdrawalPurpose
 import com.terraformation.backend.db.nursery.tables.pojos.BatchesRow
@@ -8,6 +10,7 @@ import com.terraformation.backend.nursery.model.BatchWithdrawalModel
 import com.terraformation.backend.nursery.model.ExistingBatchModel
 import com.terraformation.backend.nursery.model.ExistingWithdrawalModel
 import io.mockk.every
+import io.mockk.verify
 import java.time.Instant
 import java.time.LocalDate
 import org.junit.jupiter.api.Assertions.assertEquals
@@ -98,6 +101,40 @@ internal class BatchStoreFetchTest : BatchStoreTest() {
     assertEquals(expected, actual)
   }
 
+  @Test
+  fun `fetchByIds returns the same models as fetchOneById`() {
+    val accessionId = insertAccession(facilityId = facilityId, number = "2023-01-01")
+    val batchId1 = insertBatch(BatchesRow(accessionId = accessionId), speciesId = speciesId)
+    val subLocationId = insertSubLocation()
+    insertBatchSubLocation()
+    insertNurseryWithdrawal()
+    insertBatchWithdrawal(germinatingQuantityWithdrawn = 1, readyQuantityWithdrawn = 2)
+    val batchId2 = insertBatch(speciesId = speciesId)
+
+    val expected = listOf(store.fetchOneById(batchId1), store.fetchOneById(batchId2))
+
+    assertEquals(setOf(subLocationId), expected[0].subLocationIds, "Sub-location IDs")
+    assertEquals(3, expected[0].totalWithdrawn, "Total withdrawn")
+    assertEquals(expected, store.fetchByIds(listOf(batchId2, batchId1)))
+  }
+
+  @Test
+  fun `fetchByIds omits inaccessible and nonexistent batches and checks each facility once`() {
+    val batchId1 = insertBatch(speciesId = speciesId)
+    val batchId2 = insertBatch(speciesId = speciesId)
+    val otherFacilityId = insertFacility(type = FacilityType.Nursery)
+    val inaccessibleBatchId = insertBatch(facilityId = otherFacilityId, speciesId = speciesId)
+
+    every { user.canReadBatch(inaccessibleBatchId) } returns false
+
+    val actual =
+        store.fetchByIds(listOf(batchId1, batchId2, inaccessibleBatchId, BatchId(Long.MAX_VALUE)))
+
+    assertEquals(listOf(batchId1, batchId2), actual.map { it.id })
+    verify(exactly = 1) { user.canReadBatch(batchId1) }
+    verify(exactly = 0) { user.canReadBatch(batchId2) }
+  }
+
   @Test
   fun `fetchWithdrawalById populates all fields for withdrawal and undo withdrawal`() {
     insertPlantingSite()
@@ -5,6 +5,7 @@ import com.terraformation.backend.db.ProjectInDifferentOrganizationException
 import com.terraformation.backend.db.default_schema.FacilityType
 import com.terraformation.backend.db.default_schema.Role
 import com.terraformation.backend.db.nursery.tables.pojos.BatchesRow
+import com.terraformation.backend.db.seedbank.AccessionId
 import com.terraformation.backend.db.seedbank.CollectionSource
 import com.terraformation.backend.db.seedbank.DataSource
 import com.terraformation.backend.db.seedbank.ViabilityTestType
@@ -330,6 +331,19 @@ internal class AccessionStoreDatabaseTest : AccessionStoreTest() {
     )
   }
 
+  @Test
+  fun `fetchByIds returns accessions in ID order and omits nonexistent ones`() {
+    val accession1 = store.create(accessionModel(bagNumbers = setOf("1"), collectors = listOf("A")))
+    val accession2 = store.create(accessionModel(bagNumbers = setOf("2")))
+
+    val fetched =
+        store.fetchByIds(listOf(accession2.id!!, AccessionId(Long.MAX_VALUE), accession1.id!!))
+
+    assertEquals(listOf(accession1.id, accession2.id), fetched.map { it.id }, "IDs")
+    assertEquals(listOf(setOf("1"), setOf("2")), fetched.map { it.bagNumbers }, "Bag numbers")
+    assertEquals(listOf(listOf("A"), emptyList()), fetched.map { it.collectors }, "Collectors")
+  }
+
   @Test
   fun `dryRun does not persist changes`() {
     val initial = store.create(accessionModel(species = "Initial Species"))
@@ -4,6 +4,7 @@ import com.terraformation.backend.db.AccessionNotFoundException
 import com.terraformation.backend.db.FacilityNotFoundException
 import com.terraformation.backend.db.OrganizationNotFoundException
 import com.terraformation.backend.db.default_schema.Role
+import org.junit.jupiter.api.Assertions.assertEquals
 import org.junit.jupiter.api.Assertions.assertNotNull
 import org.junit.jupiter.api.Test
 import org.junit.jupiter.api.assertThrows
@@ -20,6 +21,17 @@ internal class AccessionStorePermissionTest : AccessionStoreTest() {
     assertThrows<AccessionNotFoundException> { store.fetchOneById(initial.id!!) }
   }
 
+  @Test
+  fun `fetchByIds omits accessions the user does not have permission to read`() {
+    val readableId = store.create(accessionModel()).id!!
+    insertOrganization()
+    val unreadableId = insertAccession(facilityId = insertFacility())
+
+    val fetched = store.fetchByIds(listOf(unreadableId, readableId))
+
+    assertEquals(listOf(readableId), fetched.map { it.id })
+  }
+
   @Test
   fun `fetchHistory throws exception if user does not have permission`() {
     val initial = store.create(accessionModel())
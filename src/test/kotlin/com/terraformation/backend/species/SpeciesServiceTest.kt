@@ -44,6 +44,7 @@ import java.time.ZoneOffset
 import java.time.ZonedDateTime
 import org.junit.jupiter.api.Assertions.assertEquals
 import org.junit.jupiter.api.Assertions.assertNotNull
+import org.junit.jupiter.api.Assertions.assertNull
 import org.junit.jupiter.api.BeforeEach
 import org.junit.jupiter.api.Nested
 import org.junit.jupiter.api.Test
@@ -217,6 +218,58 @@ internal class SpeciesServiceTest : DatabaseTest(), RunsAsUser {
     }
   }
 
+  @Nested
+  inner class CreateSpeciesBulk {
+    @Test
+    fun `creates species and returns IDs in request order`() {
+      val speciesIds =
+          service.createSpeciesBulk(
+              listOf(
+                  NewSpeciesModel(organizationId = organizationId, scientificName = "Species 1"),
+                  NewSpeciesModel(organizationId = organizationId, scientificName = "Species 2"),
+              )
+          )
+
+      assertEquals(
+          listOf("Species 1", "Species 2"),
+          speciesIds.map { speciesStore.fetchSpeciesById(it!!).scientificName },
+          "Scientific names of created species",
+      )
+      speciesIds.forEach { speciesId -> verify { speciesChecker.checkSpecies(speciesId!!) } }
+    }
+
+    @Test
+    fun `skips names that already exist or are repeated in the request`() {
+      insertSpecies("Existing")
+
+      val speciesIds =
+          service.createSpeciesBulk(
+              listOf(
+                  NewSpeciesModel(organizationId = organizationId, scientificName = "Existing"),
+                  NewSpeciesModel(organizationId = organizationId, scientificName = "New"),
+                  NewSpeciesModel(organizationId = organizationId, scientificName = "New"),
+              )
+          )
+
+      assertNull(speciesIds[0], "Existing name")
+      assertNotNull(speciesIds[1], "New name")
+      assertNull(speciesIds[2], "Repeated name")
+      assertEquals(2, speciesStore.countSpecies(organizationId), "Number of species")
+    }
+
+    @Test
+    fun `reuses previously deleted species`() {
+      val deletedSpeciesId = insertSpecies("Deleted", deletedTime = Instant.EPOCH)
+
+      val speciesIds =
+          service.createSpeciesBulk(
+              listOf(NewSpeciesModel(organizationId = organizationId, scientificName = "Deleted"))
+          )
+
+      assertEquals(listOf(deletedSpeciesId), speciesIds)
+    }
+  }
+
   @Nested
   inner class UpdateSpecies {
     @Test
@@ -0,0 +1,56 @@
+package com.terraformation.backend.species.api
+
+import com.terraformation.backend.api.ControllerIntegrationTest
+import org.junit.jupiter.api.BeforeEach
+import org.junit.jupiter.api.Nested
+import org.junit.jupiter.api.Test
+import org.springframework.test.web.servlet.get
+
+class SpeciesControllerTest : ControllerIntegrationTest() {
+  @BeforeEach
+  fun setUp() {
+    insertOrganization()
+    insertOrganizationUser()
+  }
+
+  @Nested
+  inner class ListSpecies {
+    @Test
+    fun `only includes requested fields`() {
+      val speciesId1 = insertSpecies(scientificName = "Species one", commonName = "Common one")
+      val speciesId2 = insertSpecies(scientificName = "Species two")
+
+      mockMvc
+          .get(
+              "/api/v1/species?organizationId=${inserted.organizationId}" +
+                  "&fields=id&fields=scientificName"
+          )
+          .andExpectJson(
+              """
+                {
+                  "species": [
+                    {
+                      "id": $speciesId1,
+                      "scientificName": "Species one"
+                    },
+                    {
+                      "id": $speciesId2,
+                      "scientificName": "Species two"
+                    }
+                  ],
+                  "status": "ok"
+                }
+              """
+                  .trimIndent(),
+              strict = true,
+          )
+    }
+
+    @Test
+    fun `rejects unknown fields`() {
+      mockMvc
+          .get("/api/v1/species?organizationId=${inserted.organizationId}&fields=bogus")
+          .andExpect { status { isBadRequest() } }
+    }
+  }
+}
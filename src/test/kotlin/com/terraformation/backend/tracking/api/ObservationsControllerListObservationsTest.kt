@@ -0,0 +1,92 @@
+package com.terraformation.backend.tracking.api
+
+import com.terraformation.backend.db.default_schema.OrganizationId
+import com.terraformation.backend.db.tracking.ObservationId
+import com.terraformation.backend.db.tracking.ObservationState
+import com.terraformation.backend.db.tracking.ObservationType
+import com.terraformation.backend.db.tracking.PlantingSiteId
+import com.terraformation.backend.tracking.db.ObservationStore
+import com.terraformation.backend.tracking.db.PlantingSiteStore
+import com.terraformation.backend.tracking.model.ExistingObservationModel
+import io.mockk.every
+import io.mockk.mockk
+import io.mockk.verify
+import java.time.LocalDate
+import org.junit.jupiter.api.Assertions.assertEquals
+import org.junit.jupiter.api.BeforeEach
+import org.junit.jupiter.api.Test
+
+/**
+ * Checks which lookups [ObservationsController.listObservations] skips when only some fields are
+ * requested. The shape of the responses is covered by [ObservationsControllerTest].
+ */
+internal class ObservationsControllerListObservationsTest {
+  private val observationStore: ObservationStore = mockk()
+  private val plantingSiteStore: PlantingSiteStore = mockk()
+
+  private val controller =
+      ObservationsController(
+          mockk(),
+          mockk(),
+          mockk(),
+          observationStore,
+          mockk(),
+          plantingSiteStore,
+      )
+
+  private val organizationId = OrganizationId(1)
+  private val plantingSiteId = PlantingSiteId(2)
+  private val observation =
+      ExistingObservationModel(
+          endDate = LocalDate.of(2023, 1, 31),
+          id = ObservationId(3),
+          isAdHoc = false,
+          observationType = ObservationType.Monitoring,
+          plantingSiteId = plantingSiteId,
+          startDate = LocalDate.of(2023, 1, 1),
+          state = ObservationState.InProgress,
+      )
+
+  @BeforeEach
+  fun setUp() {
+    every { observationStore.countPlots(organizationId, false) } returns emptyMap()
+    every { observationStore.countPlots(plantingSiteId, false) } returns emptyMap()
+    every { observationStore.fetchObservationsByOrganization(organizationId, false, any()) } returns
+        listOf(observation)
+    every { observationStore.fetchObservationsByPlantingSite(plantingSiteId, false, any()) } returns
+        listOf(observation)
+  }
+
+  @Test
+  fun `does not look up planting sites if their names are not requested`() {
+    val byOrganization =
+        controller.listObservations(organizationId = organizationId, fields = listOf("id"))
+    val byPlantingSite =
+        controller.listObservations(plantingSiteId = plantingSiteId, fields = listOf("id"))
+
+    verify(exactly = 0) { plantingSiteStore.fetchSiteById(any(), any(), any()) }
+    verify(exactly = 0) { plantingSiteStore.fetchSitesByOrganizationId(any(), any(), any()) }
+
+    assertEquals(
+        listOf("", ""),
+        (byOrganization.observations + byPlantingSite.observations).map { it.plantingSiteName },
+        "Placeholder names",
+    )
+  }
+
+  @Test
+  fun `requests substratum IDs from the store for deprecated requestedSubzoneIds field`() {
+    controller.listObservations(
+        organizationId = organizationId,
+        fields = listOf("id", "requestedSubzoneIds"),
+    )
+
+    verify {
+      observationStore.fetchObservationsByOrganization(
+          organizationId,
+          false,
+          setOf("id", "requestedSubzoneIds", "requestedSubstratumIds"),
+      )
+    }
+  }
+}
@@ -0,0 +1,114 @@
+package com.terraformation.backend.tracking.api
+
+import com.terraformation.backend.api.ControllerIntegrationTest
+import org.junit.jupiter.api.BeforeEach
+import org.junit.jupiter.api.Nested
+import org.junit.jupiter.api.Test
+import org.springframework.test.web.servlet.get
+
+class ObservationsControllerTest : ControllerIntegrationTest() {
+  @BeforeEach
+  fun setUp() {
+    insertOrganization()
+    insertOrganizationUser()
+    insertPlantingSite(name = "Site name")
+  }
+
+  @Nested
+  inner class ListObservations {
+    @Test
+    fun `only includes requested fields`() {
+      val observationId = insertObservation()
+
+      mockMvc
+          .get(
+              "/api/v1/tracking/observations?organizationId=${inserted.organizationId}" +
+                  "&fields=id,plantingSiteName"
+          )
+          .andExpectJson(
+              """
+                {
+                  "observations": [
+                    {
+                      "id": $observationId,
+                      "plantingSiteName": "Site name"
+                    }
+                  ],
+                  "totalIncompletePlots": 0,
+                  "totalUnclaimedPlots": 0,
+                  "status": "ok"
+                }
+              """
+                  .trimIndent(),
+              strict = true,
+          )
+    }
+
+    @Test
+    fun `omits planting site names if they are not requested`() {
+      val observationId = insertObservation()
+
+      mockMvc
+          .get("/api/v1/tracking/observations?plantingSiteId=${inserted.plantingSiteId}&fields=id")
+          .andExpectJson(
+              """
+                {
+                  "observations": [
+                    {
+                      "id": $observationId
+                    }
+                  ],
+                  "totalIncompletePlots": 0,
+                  "totalUnclaimedPlots": 0,
+                  "status": "ok"
+                }
+              """
+                  .trimIndent(),
+              strict = true,
+          )
+    }
+
+    @Test
+    fun `looks up requested substrata for deprecated requestedSubzoneIds field`() {
+      val observationId = insertObservation()
+      insertStratum()
+      val substratumId = insertSubstratum()
+      insertObservationRequestedSubstratum()
+
+      mockMvc
+          .get(
+              "/api/v1/tracking/observations?organizationId=${inserted.organizationId}" +
+                  "&fields=id,requestedSubzoneIds"
+          )
+          .andExpectJson(
+              """
+                {
+                  "observations": [
+                    {
+                      "id": $observationId,
+                      "requestedSubzoneIds": [$substratumId]
+                    }
+                  ],
+                  "totalIncompletePlots": 0,
+                  "totalUnclaimedPlots": 0,
+                  "status": "ok"
+                }
+              """
+                  .trimIndent(),
+              strict = true,
+          )
+    }
+
+    @Test
+    fun `rejects unknown fields`() {
+      insertObservation()
+
+      mockMvc
+          .get(
+              "/api/v1/tracking/observations?organizationId=${inserted.organizationId}" +
+                  "&fields=id,bogus"
+          )
+          .andExpect { status { isBadRequest() } }
+    }
+  }
+}
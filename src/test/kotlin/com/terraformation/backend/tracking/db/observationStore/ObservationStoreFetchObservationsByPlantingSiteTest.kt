@@ -2,6 +2,7 @@ package com.terraformation.backend.tracking.db.observationStore
 
 import com.terraformation.backend.db.tracking.ObservationState
 import com.terraformation.backend.db.tracking.ObservationType
+import com.terraformation.backend.db.tracking.SubstratumId
 import com.terraformation.backend.tracking.db.PlantingSiteNotFoundException
 import com.terraformation.backend.tracking.model.ExistingObservationModel
 import io.mockk.every
@@ -100,6 +101,33 @@ class ObservationStoreFetchObservationsByPlantingSiteTest : BaseObservationStore
     )
   }
 
+  @Test
+  fun `only looks up requested substratum IDs if they are in the requested fields`() {
+    val observationId = insertObservation()
+    insertStratum()
+    val substratumId = insertSubstratum()
+    insertObservationRequestedSubstratum()
+
+    assertEquals(
+        listOf(observationId to emptySet<SubstratumId>()),
+        store.fetchObservationsByPlantingSite(plantingSiteId, fields = setOf("id")).map {
+          it.id to it.requestedSubstratumIds
+        },
+        "Substratum IDs not requested",
+    )
+
+    assertEquals(
+        listOf(observationId to setOf(substratumId)),
+        store
+            .fetchObservationsByPlantingSite(
+                plantingSiteId,
+                fields = setOf("id", "requestedSubstratumIds"),
+            )
+            .map { it.id to it.requestedSubstratumIds },
+        "Substratum IDs requested",
+    )
+  }
+
   @Test
   fun `throws exception if no permission to read planting site`() {
     every { user.canReadPlantingSite(plantingSiteId) } returns false